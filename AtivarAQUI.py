@@ -10,21 +10,39 @@ st.set_page_config(
 
 try:
     # Tenta importar com utils (VS Code)
-    from utils.Login import pagina_login, verificar_autenticacao, fazer_logout
-    from utils.Realizar_Cadastros import pagina_principal
-    from utils.Lista_inscritos import pagina_lista_inscritos
-    from utils.Registro_Todas_Unidades import pagina_registro_todas_unidades
+    from utils.carregador_paginas import carregar_pagina, importar_modulo
+    from utils.perfilador import perfilar
+    from utils.configuracao_log import configurar_logging, iniciar_rerun, finalizar_rerun
+    from utils.memoria_sessoes import registrar_memoria_sessao
+    from utils.api_contagens import iniciar_api_contagens, API_NA_PARTIDA
 except ImportError:
     try:
         # Tenta importar sem utils (Streamlit Cloud)
-        from Login import pagina_login, verificar_autenticacao, fazer_logout
-        from Realizar_Cadastros import pagina_principal
-        from Lista_inscritos import pagina_lista_inscritos
-        from Registro_Todas_Unidades import pagina_registro_todas_unidades
+        from carregador_paginas import carregar_pagina, importar_modulo
+        from perfilador import perfilar
+        from configuracao_log import configurar_logging, iniciar_rerun, finalizar_rerun
+        from memoria_sessoes import registrar_memoria_sessao
+        from api_contagens import iniciar_api_contagens, API_NA_PARTIDA
     except ImportError as e:
         st.error(f"Erro crítico: Não foi possível importar os módulos. Erro: {e}")
         st.stop()
 
+# Apenas o login é importado na partida; as páginas (e suas dependências)
+# são importadas por carregar_pagina() na primeira vez em que são abertas
+configurar_logging()
+# Endpoint JSON das contagens (uma vez por processo; ver utils/api_contagens.py).
+# Sem INTERCLASSE_API_NA_PARTIDA ele só é iniciado depois do login, em main_app()
+if API_NA_PARTIDA:
+    iniciar_api_contagens()
+try:
+    _login = importar_modulo("Login")
+    pagina_login = _login.pagina_login
+    verificar_autenticacao = _login.verificar_autenticacao
+    fazer_logout = _login.fazer_logout
+except ImportError as e:
+    st.error(f"Erro crítico: Não foi possível importar os módulos. Erro: {e}")
+    st.stop()
+
 def main_app():
     """Aplicação principal após login"""
     
@@ -76,14 +94,14 @@ def main_app():
             if st.button("🚪 Sair", use_container_width=True, type="secondary"):
                 fazer_logout()
     
-    # Renderiza a página selecionada ATUALIZADA
-    # Esta lógica está PERFEITA.
-    if st.session_state.pagina_atual == "Cadastro":
-        pagina_principal()
-    elif st.session_state.pagina_atual == "Lista":
-        pagina_lista_inscritos()
-    elif st.session_state.pagina_atual == "TodasUnidades":
-        pagina_registro_todas_unidades()
+    # Vigia de alterações da planilha e endpoint de contagens (uma thread por processo, iniciadas no primeiro acesso)
+    importar_modulo("vigia_planilha").iniciar_vigia_planilha()
+    iniciar_api_contagens()
+    
+    # Renderiza a página selecionada (o módulo da página é importado na primeira visita).
+    # Com o perfilador ativo, a execução da página é amostrada e guardada para análise.
+    with perfilar(st.session_state.pagina_atual, st.session_state.user_info.get('unidade')):
+        carregar_pagina(st.session_state.pagina_atual)()
 
 def main():
     """Função principal que controla o fluxo de autenticação"""
@@ -94,11 +112,17 @@ def main():
     if 'autenticado' not in st.session_state:
         st.session_state.autenticado = False
     
-    # Verifica se o usuário está logado
-    if not st.session_state.autenticado and not st.session_state.logged_in:
-        pagina_login()
-    else:
-        main_app()
+    # Mede a duração do rerun (vai para o log estruturado, mesmo com st.rerun/st.stop)
+    iniciar_rerun(st.session_state)
+    try:
+        # Verifica se o usuário está logado
+        if not st.session_state.autenticado and not st.session_state.logged_in:
+            pagina_login()
+        else:
+            main_app()
+    finally:
+        finalizar_rerun(st.session_state)
+        registrar_memoria_sessao()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
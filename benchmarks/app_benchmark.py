@@ -0,0 +1,18 @@
+# benchmarks/app_benchmark.py
+# Script executado pelo AppTest: abre uma página já autenticada. A planilha
+# falsa é instalada pelo processo que chama o AppTest (bench_paginas.py).
+import os
+import streamlit as st
+from utils.carregador_paginas import carregar_pagina
+
+st.session_state.setdefault('autenticado', True)
+st.session_state.setdefault('logged_in', True)
+st.session_state.setdefault('admin_autenticado', True)
+st.session_state.setdefault('user_info', {
+    'unidade': os.environ.get('BENCH_UNIDADE', 'Unidade 01'),
+    'nome': 'Coordenador Sintético',
+    'email': 'coord1@exemplo.com',
+})
+st.session_state.setdefault('pagina_atual', os.environ.get('BENCH_PAGINA', 'Cadastro'))
+
+carregar_pagina(st.session_state.pagina_atual)()
@@ -0,0 +1,157 @@
+# benchmarks/bench_paginas.py
+"""
+Benchmark das páginas com dados sintéticos e uma planilha falsa em memória.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_paginas --alunos 5000 --inscricoes 8000
+    python -m benchmarks.bench_paginas --salvar-baseline
+    python -m benchmarks.bench_paginas --tolerancia 1.3   # falha se 30% mais lento que a baseline
+
+Para cada página mede a execução a frio (caches vazios) e a quente (reexecuções
+com os caches preenchidos) usando o AppTest do Streamlit. Os resultados são
+comparados com a baseline salva para a mesma escala; benchmarks/baseline.json
+traz a baseline da escala padrão.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.dados_sinteticos import gerar_planilha_sintetica
+from benchmarks.fake_sheets import FakeSpreadsheet, instalar_planilha_falsa
+
+SCRIPT_APP = str(Path(__file__).resolve().parent / 'app_benchmark.py')
+BASELINE_PADRAO = Path(__file__).resolve().parent / 'baseline.json'
+PAGINAS = ['Cadastro', 'Lista', 'TodasUnidades']
+
+def chave_escala(args):
+    """Identifica a escala do teste; a baseline só é comparada com a mesma escala"""
+    return (f"u{args.unidades}-t{args.turmas}-a{args.alunos}-i{args.inscricoes}"
+            f"-m{args.modalidades}-l{args.latencia_ms:g}")
+
+def limpar_caches():
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+def medir_pagina(pagina, planilha, repeticoes, timeout):
+    """Executa a página uma vez a frio e `repeticoes` vezes a quente"""
+    os.environ['BENCH_PAGINA'] = pagina
+    limpar_caches()
+    instalar_planilha_falsa(planilha)
+
+    app = AppTest.from_file(SCRIPT_APP, default_timeout=timeout)
+
+    chamadas_antes = planilha.total_chamadas()
+    inicio = time.perf_counter()
+    app.run()
+    frio_ms = (time.perf_counter() - inicio) * 1000
+    chamadas_frio = planilha.total_chamadas() - chamadas_antes
+
+    if app.exception:
+        raise RuntimeError(f"Página {pagina} falhou: {app.exception[0].value}")
+
+    tempos_quente = []
+    chamadas_antes = planilha.total_chamadas()
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        app.run()
+        tempos_quente.append((time.perf_counter() - inicio) * 1000)
+
+    return {
+        'frio_ms': round(frio_ms, 1),
+        'quente_ms': round(statistics.median(tempos_quente), 1) if tempos_quente else None,
+        'chamadas_api_frio': chamadas_frio,
+        'chamadas_api_quente': planilha.total_chamadas() - chamadas_antes,
+    }
+
+def comparar_com_baseline(resultados, baseline, tolerancia):
+    """Retorna a lista de regressões (página, métrica, atual, baseline)
+
+    Os tempos dependem da máquina e usam a tolerância; o número de chamadas à
+    API falsa é determinístico e qualquer aumento já é regressão.
+    """
+    regressoes = []
+    for pagina, atual in resultados.items():
+        referencia = baseline.get(pagina)
+        if not referencia:
+            continue
+        for metrica in ('frio_ms', 'quente_ms'):
+            if atual.get(metrica) is None or not referencia.get(metrica):
+                continue
+            if atual[metrica] > referencia[metrica] * tolerancia:
+                regressoes.append((pagina, metrica, atual[metrica], referencia[metrica]))
+        for metrica in ('chamadas_api_frio', 'chamadas_api_quente'):
+            if metrica not in referencia:
+                continue
+            if atual[metrica] > referencia[metrica]:
+                regressoes.append((pagina, metrica, atual[metrica], referencia[metrica]))
+    return regressoes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das páginas do sistema de inscrição")
+    parser.add_argument('--unidades', type=int, default=5)
+    parser.add_argument('--turmas', type=int, default=8)
+    parser.add_argument('--alunos', type=int, default=2000)
+    parser.add_argument('--inscricoes', type=int, default=3000)
+    parser.add_argument('--modalidades', type=int, default=10)
+    parser.add_argument('--latencia-ms', type=float, default=0.0,
+                        help="Latência simulada por chamada à API falsa")
+    parser.add_argument('--repeticoes', type=int, default=5, help="Reexecuções a quente por página")
+    parser.add_argument('--paginas', nargs='+', default=PAGINAS, choices=PAGINAS)
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PADRAO)
+    parser.add_argument('--salvar-baseline', action='store_true')
+    parser.add_argument('--tolerancia', type=float, default=1.25,
+                        help="Fator acima da baseline considerado regressão (1.25 = 25%%)")
+    parser.add_argument('--timeout', type=float, default=120.0)
+    args = parser.parse_args(argv)
+
+    abas = gerar_planilha_sintetica(args.unidades, args.turmas, args.alunos, args.inscricoes, args.modalidades)
+    os.environ['BENCH_UNIDADE'] = abas['INSCRITOS-ECOMMERCE'][1][0]
+
+    resultados = {}
+    for pagina in args.paginas:
+        # Uma planilha nova por página: escritas de uma página não afetam a outra
+        planilha = FakeSpreadsheet(abas, latencia_ms=args.latencia_ms)
+        resultados[pagina] = medir_pagina(pagina, planilha, args.repeticoes, args.timeout)
+
+    escala = chave_escala(args)
+    print(f"Escala: {escala}")
+    print(f"{'Página':<15}{'Frio (ms)':>12}{'Quente (ms)':>14}{'API frio':>10}{'API quente':>12}")
+    for pagina, r in resultados.items():
+        print(f"{pagina:<15}{r['frio_ms']:>12}{r['quente_ms']:>14}"
+              f"{r['chamadas_api_frio']:>10}{r['chamadas_api_quente']:>12}")
+
+    baselines = json.loads(args.baseline.read_text(encoding='utf-8')) if args.baseline.exists() else {}
+
+    if args.salvar_baseline:
+        baselines[escala] = resultados
+        args.baseline.write_text(json.dumps(baselines, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"Baseline salva em {args.baseline}")
+        return 0
+
+    if escala not in baselines:
+        print("Nenhuma baseline para esta escala (use --salvar-baseline).")
+        return 0
+
+    regressoes = comparar_com_baseline(resultados, baselines[escala], args.tolerancia)
+    for pagina, metrica, atual, referencia in regressoes:
+        if metrica.startswith('chamadas'):
+            print(f"REGRESSÃO: {pagina} {metrica} = {atual} (baseline {referencia})")
+        else:
+            print(f"REGRESSÃO: {pagina} {metrica} = {atual} ms (baseline {referencia} ms, tolerância x{args.tolerancia})")
+    if not regressoes:
+        print(f"Sem regressões em relação à baseline ({args.baseline.name}).")
+    return 1 if regressoes else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+# benchmarks/dados_sinteticos.py
+import random
+from datetime import datetime, timedelta
+
+MODALIDADES_BASE = ['Futsal', 'Vôlei', 'Basquete', 'Handebol', 'Xadrez', 'Tênis de Mesa',
+                    'Queimada', 'Atletismo', 'Natação', 'Judô', 'Dama', 'Ping Pong']
+
+def gerar_planilha_sintetica(unidades=5, turmas=8, alunos=2000, inscricoes=3000, modalidades=10,
+                             limite_vagas=200, semente=42):
+    """
+    Gera o conteúdo das abas usadas pelas páginas, no mesmo formato devolvido
+    por get_all_values() (lista de linhas, com o cabeçalho na primeira).
+    A escala é configurável: unidades, turmas por unidade, alunos em
+    INSCRITOS-ECOMMERCE, inscrições em INSCRITOS-UNIDADE e modalidades.
+    """
+    rnd = random.Random(semente)
+
+    nomes_unidades = [f"Unidade {i + 1:02d}" for i in range(unidades)]
+    nomes_turmas = [f"{serie}º {letra}" for serie in range(1, 10) for letra in 'ABCDEF'][:turmas]
+    nomes_modalidades = [
+        MODALIDADES_BASE[i % len(MODALIDADES_BASE)] + ('' if i < len(MODALIDADES_BASE) else f" {i // len(MODALIDADES_BASE) + 1}")
+        for i in range(modalidades)
+    ]
+
+    # INSCRITOS-ECOMMERCE: Unidade, Nome do Aluno, RA, Turma do Aluno
+    linhas_alunos = [['Unidade', 'Nome do Aluno', 'RA', 'Turma do Aluno']]
+    for i in range(alunos):
+        linhas_alunos.append([
+            rnd.choice(nomes_unidades),
+            f"Aluno Sintético {i:06d}",
+            str(100000 + i),
+            rnd.choice(nomes_turmas),
+        ])
+
+    # MODALIDADES: Genero, Modalidade, Unidade, Tem_Vaga, Limite_Vagas, Inscritos, Vagas_Restantes
+    linhas_modalidades = [['Genero', 'Modalidade', 'Unidade', 'Tem_Vaga', 'Limite_Vagas', 'Inscritos', 'Vagas_Restantes']]
+    for unidade in nomes_unidades:
+        for modalidade in nomes_modalidades:
+            for genero in ('M', 'F'):
+                linhas_modalidades.append([genero, modalidade, unidade, 'SIM', str(limite_vagas), '0', str(limite_vagas)])
+
+    # INSCRITOS-UNIDADE: até 3 modalidades distintas por aluno
+    linhas_inscritos = [['Unidade', 'Nome Aluno', 'RA Aluno', 'Turma Aluno', 'Genero Modalidade',
+                         'Modalidade', 'Unidade Modalidade', 'Data/Hora', 'Usuario']]
+    modalidades_por_aluno = {}
+    inicio = datetime(2025, 3, 1, 8, 0, 0)
+    tentativas = 0
+    while len(linhas_inscritos) - 1 < inscricoes and tentativas < inscricoes * 10:
+        tentativas += 1
+        unidade, nome, ra, turma = rnd.choice(linhas_alunos[1:])
+        ja_inscrito = modalidades_por_aluno.setdefault(ra, set())
+        modalidade = rnd.choice(nomes_modalidades)
+        if len(ja_inscrito) >= 3 or modalidade in ja_inscrito:
+            continue
+        ja_inscrito.add(modalidade)
+        momento = inicio + timedelta(seconds=len(linhas_inscritos) * 37)
+        linhas_inscritos.append([
+            unidade, nome, ra, turma, rnd.choice(('M', 'F')), modalidade, unidade,
+            momento.strftime("%d/%m/%Y %H:%M:%S"), "Coordenador Sintético",
+        ])
+
+    # AUTORIZADOS: Unidade, Nome, Coluna_C, Email, Telefone, Senha, (G2 = senha admin)
+    linhas_autorizados = [['Unidade', 'Nome', 'Coluna_C', 'Email', 'Telefone', 'Senha', 'Admin']]
+    for i, unidade in enumerate(nomes_unidades):
+        linhas_autorizados.append([unidade, f"Coordenador {i + 1}", '', f"coord{i + 1}@exemplo.com", '', '',
+                                   'admin' if i == 0 else ''])
+
+    return {
+        'INSCRITOS-ECOMMERCE': linhas_alunos,
+        'MODALIDADES': linhas_modalidades,
+        'INSCRITOS-UNIDADE': linhas_inscritos,
+        'AUTORIZADOS': linhas_autorizados,
+        'REGISTROS-EXCLUIDOS': [['Unidade', 'Nome Aluno', 'RA Aluno', 'Turma Aluno', 'Genero Modalidade',
+                                 'Modalidade', 'Unidade Modalidade', 'Data/Hora', 'Usuario',
+                                 'Excluido Por', 'Data Exclusao']],
+        'LOGIN': [['Unidade', 'Nome', 'Email', 'Data/Hora', 'Status']],
+    }
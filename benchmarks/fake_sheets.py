@@ -0,0 +1,227 @@
+# benchmarks/fake_sheets.py
+import re
+import sys
+import time
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+
+def _coluna_para_indice(letras):
+    """Converte letras de coluna (A, B, ..., AA) em índice começando em 1"""
+    indice = 0
+    for letra in letras:
+        indice = indice * 26 + (ord(letra.upper()) - ord('A') + 1)
+    return indice
+
+def _interpretar_intervalo(intervalo):
+    """
+    Interpreta um intervalo A1 simples ('A2:I10', 'C:C', 'A5', 'Aba'!A1:B2).
+    Retorna (linha_ini, linha_fim, col_ini, col_fim), com None para 'sem limite'.
+    """
+    if '!' in intervalo:
+        intervalo = intervalo.split('!', 1)[1]
+    partes = intervalo.split(':')
+    padrao = re.compile(r'^([A-Za-z]*)(\d*)$')
+    col_ini_txt, lin_ini_txt = padrao.match(partes[0]).groups()
+    col_fim_txt, lin_fim_txt = padrao.match(partes[-1]).groups()
+    return (
+        int(lin_ini_txt) if lin_ini_txt else 1,
+        int(lin_fim_txt) if lin_fim_txt else None,
+        _coluna_para_indice(col_ini_txt) if col_ini_txt else 1,
+        _coluna_para_indice(col_fim_txt) if col_fim_txt else None,
+    )
+
+class _Celula:
+    def __init__(self, valor):
+        self.value = valor
+
+class FakeWorksheet:
+    """Imitação em memória de gspread.Worksheet com os métodos usados pela aplicação"""
+
+    def __init__(self, planilha, title, valores):
+        self._planilha = planilha
+        self.title = title
+        self.id = id(self)
+        self._valores = [list(linha) for linha in valores]
+
+    # Leituras ------------------------------------------------------------
+    def get_all_values(self, **kwargs):
+        self._planilha._registrar(self.title, 'get_all_values')
+        return [list(linha) for linha in self._valores]
+
+    def get(self, intervalo=None, **kwargs):
+        self._planilha._registrar(self.title, 'get')
+        if intervalo is None:
+            return [list(linha) for linha in self._valores]
+        return self._recortar(intervalo)
+
+    def batch_get(self, intervalos, **kwargs):
+        self._planilha._registrar(self.title, 'batch_get')
+        return [self._recortar(intervalo) for intervalo in intervalos]
+
+    def row_values(self, linha, **kwargs):
+        self._planilha._registrar(self.title, 'row_values')
+        if 1 <= linha <= len(self._valores):
+            return list(self._valores[linha - 1])
+        return []
+
+    def col_values(self, coluna, **kwargs):
+        self._planilha._registrar(self.title, 'col_values')
+        return [linha[coluna - 1] if len(linha) >= coluna else '' for linha in self._valores]
+
+    def acell(self, rotulo, **kwargs):
+        self._planilha._registrar(self.title, 'acell')
+        valores = self._recortar(rotulo)
+        return _Celula(valores[0][0] if valores and valores[0] else None)
+
+    @property
+    def row_count(self):
+        return len(self._valores)
+
+    # Escritas ------------------------------------------------------------
+    def append_row(self, valores, **kwargs):
+        return self.append_rows([valores], **kwargs)
+
+    def append_rows(self, linhas, **kwargs):
+        self._planilha._registrar(self.title, 'append_rows')
+        primeira = len(self._valores) + 1
+        self._valores.extend(list(linha) for linha in linhas)
+        ultima = len(self._valores)
+        self._planilha._marcar_alteracao()
+        return {'updates': {'updatedRange': f"'{self.title}'!A{primeira}:I{ultima}",
+                            'updatedRows': len(linhas)}}
+
+    def update(self, intervalo, valores, **kwargs):
+        self._planilha._registrar(self.title, 'update')
+        linha_ini, _, col_ini, _ = _interpretar_intervalo(intervalo)
+        for deslocamento, linha_valores in enumerate(valores):
+            numero_linha = linha_ini + deslocamento
+            while len(self._valores) < numero_linha:
+                self._valores.append([])
+            linha = self._valores[numero_linha - 1]
+            while len(linha) < col_ini - 1 + len(linha_valores):
+                linha.append('')
+            linha[col_ini - 1:col_ini - 1 + len(linha_valores)] = list(linha_valores)
+        self._planilha._marcar_alteracao()
+        return {'updatedRange': intervalo}
+
+    def batch_update(self, dados, **kwargs):
+        self._planilha._registrar(self.title, 'batch_update')
+        for item in dados:
+            self.update(item['range'], item['values'])
+        return {}
+
+    def update_cell(self, linha, coluna, valor):
+        self._planilha._registrar(self.title, 'update_cell')
+        while len(self._valores) < linha:
+            self._valores.append([])
+        while len(self._valores[linha - 1]) < coluna:
+            self._valores[linha - 1].append('')
+        self._valores[linha - 1][coluna - 1] = valor
+        self._planilha._marcar_alteracao()
+
+    def delete_rows(self, inicio, fim=None):
+        self._planilha._registrar(self.title, 'delete_rows')
+        fim = fim or inicio
+        del self._valores[inicio - 1:fim]
+        self._planilha._marcar_alteracao()
+
+    def clear(self):
+        self._planilha._registrar(self.title, 'clear')
+        self._valores = []
+        self._planilha._marcar_alteracao()
+
+    # Auxiliares ----------------------------------------------------------
+    def _recortar(self, intervalo):
+        linha_ini, linha_fim, col_ini, col_fim = _interpretar_intervalo(intervalo)
+        linhas = self._valores[linha_ini - 1:linha_fim]
+        recorte = [linha[col_ini - 1:col_fim] for linha in linhas]
+        # A API omite linhas vazias no final do intervalo
+        while recorte and not any(recorte[-1]):
+            recorte.pop()
+        return recorte
+
+class FakeSpreadsheet:
+    """Imitação em memória de gspread.Spreadsheet; conta chamadas por aba e operação"""
+
+    def __init__(self, abas, latencia_ms=0.0):
+        self.latencia_ms = latencia_ms
+        self.chamadas = Counter()
+        self._lock = threading.Lock()
+        self._modificado_em = datetime.now(timezone.utc)
+        self._abas = {titulo: FakeWorksheet(self, titulo, valores) for titulo, valores in abas.items()}
+
+    def _registrar(self, aba, operacao):
+        with self._lock:
+            self.chamadas[(aba, operacao)] += 1
+        if self.latencia_ms:
+            time.sleep(self.latencia_ms / 1000)
+
+    def _marcar_alteracao(self):
+        self._modificado_em = datetime.now(timezone.utc)
+
+    def worksheet(self, titulo):
+        import gspread
+        if titulo not in self._abas:
+            raise gspread.WorksheetNotFound(titulo)
+        return self._abas[titulo]
+
+    def worksheets(self, **kwargs):
+        return list(self._abas.values())
+
+    def add_worksheet(self, title, rows=1000, cols=26, **kwargs):
+        self._abas[title] = FakeWorksheet(self, title, [])
+        return self._abas[title]
+
+    def batch_update(self, corpo):
+        # Só os pedidos usados pela aplicação: deleteDimension de linhas
+        self._registrar('*', 'batch_update')
+        abas_por_id = {aba.id: aba for aba in self._abas.values()}
+        for pedido in corpo.get('requests', []):
+            intervalo = pedido['deleteDimension']['range']
+            aba = abas_por_id[intervalo['sheetId']]
+            del aba._valores[intervalo['startIndex']:intervalo['endIndex']]
+        self._marcar_alteracao()
+        return {'replies': [{} for _ in corpo.get('requests', [])]}
+
+    def values_batch_get(self, intervalos, **kwargs):
+        self._registrar('*', 'values_batch_get')
+        resultado = []
+        for intervalo in intervalos:
+            titulo = intervalo.split('!', 1)[0].strip("'") if '!' in intervalo else intervalo.strip("'")
+            aba = self._abas.get(titulo)
+            valores = aba._recortar(intervalo) if aba and '!' in intervalo else (aba._valores if aba else [])
+            resultado.append({'range': intervalo, 'values': [list(linha) for linha in valores]})
+        return {'valueRanges': resultado}
+
+    def get_lastUpdateTime(self):
+        self._registrar('*', 'get_lastUpdateTime')
+        return self._modificado_em.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+    @property
+    def lastUpdateTime(self):
+        return self.get_lastUpdateTime()
+
+    def total_chamadas(self):
+        return sum(self.chamadas.values())
+
+def instalar_planilha_falsa(planilha):
+    """
+    Substitui get_workbook de utils.sheets pela planilha em memória, inclusive
+    nos módulos que já fizeram `from utils.sheets import *`. O get_ws real
+    continua em uso (com seu cache), então load_full_sheet_as_df e as escritas
+    passam pelo mesmo caminho da aplicação até chegar na imitação.
+    """
+    import utils.sheets as sheets
+
+    def get_workbook():
+        return planilha
+
+    sheets.get_workbook = get_workbook
+    sheets.get_ws.cache_clear()
+    for nome, modulo in list(sys.modules.items()):
+        if modulo is None or not nome.startswith('utils.'):
+            continue
+        if getattr(modulo, 'get_workbook', None) is not None:
+            modulo.get_workbook = get_workbook
+    return planilha
@@ -0,0 +1,34 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+# Lidos na importação dos módulos: diário e logs em pasta temporária, sem endpoint nem vigia
+PASTA_TEMPORARIA = tempfile.mkdtemp()
+os.environ.setdefault('INTERCLASSE_DIARIO', os.path.join(PASTA_TEMPORARIA, 'diario.sqlite3'))
+os.environ.setdefault('INTERCLASSE_LOG_DIR', os.path.join(PASTA_TEMPORARIA, 'logs'))
+os.environ.setdefault('INTERCLASSE_API_PORTA', '0')
+os.environ.setdefault('INTERCLASSE_VIGIA', '0')
+
+import streamlit as st
+
+from benchmarks.dados_sinteticos import gerar_planilha_sintetica
+from benchmarks.fake_sheets import FakeSpreadsheet, instalar_planilha_falsa
+
+SCRIPT_APP = str(RAIZ / 'benchmarks' / 'app_benchmark.py')
+
+@pytest.fixture
+def planilha():
+    """Planilha falsa pequena, instalada com os caches vazios"""
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    abas = gerar_planilha_sintetica(unidades=2, turmas=2, alunos=60, inscricoes=80, modalidades=4)
+    os.environ['BENCH_UNIDADE'] = abas['INSCRITOS-ECOMMERCE'][1][0]
+    return instalar_planilha_falsa(FakeSpreadsheet(abas))
@@ -0,0 +1,77 @@
+# tests/test_agregados.py
+from datetime import datetime
+
+from utils import agregados
+
+def _oferecer(planilha, *linhas):
+    """Acrescenta combinações à aba MODALIDADES (Genero, Modalidade, Unidade, Tem_Vaga, Limite_Vagas)"""
+    ws = planilha.worksheet('MODALIDADES')
+    ws._valores.extend([genero, modalidade, unidade, tem_vaga, str(limite), '0', str(limite)]
+                       for genero, modalidade, unidade, tem_vaga, limite in linhas)
+
+def _linha(resumo, unidade, modalidade, genero):
+    selecao = resumo[(resumo['Unidade'] == unidade) & (resumo['Modalidade'] == modalidade) &
+                     (resumo['Genero'] == genero)]
+    assert len(selecao) == 1
+    return selecao.iloc[0]
+
+def test_resumo_traz_todas_as_combinacoes_oferecidas(planilha):
+    unidade = planilha.worksheet('MODALIDADES').get_all_values()[1][2]
+    _oferecer(planilha, ('M', 'Modalidade Nova', unidade, 'SIM', 12),
+              ('F', 'Modalidade Fechada', unidade, 'NÃO', 12))
+
+    resumo = agregados.obter_resumo_inscricoes()
+    oferecidas = planilha.worksheet('MODALIDADES').get_all_values()[1:]
+    assert {(u, m, g) for g, m, u, *_ in oferecidas} <= set(zip(resumo['Unidade'], resumo['Modalidade'], resumo['Genero']))
+
+    nova = _linha(resumo, unidade, 'Modalidade Nova', 'M')
+    assert (nova['Inscricoes'], nova['Alunos_Unicos'], nova['Limite_Vagas']) == (0, 0, 12)
+    assert nova['Tem_Vaga'] and nova['Vagas_Restantes'] == 12
+    fechada = _linha(resumo, unidade, 'Modalidade Fechada', 'F')
+    assert not fechada['Tem_Vaga'] and fechada['Vagas_Restantes'] == 0
+    assert resumo['Inscricoes'].sum() == len(planilha.worksheet('INSCRITOS-UNIDADE').get_all_values()) - 1
+
+def test_inscricoes_no_diario_descontam_vagas(planilha, monkeypatch):
+    from utils import diario_inscricoes
+    from utils.modalidades import carregar_modalidades_atualizadas
+    monkeypatch.setattr(diario_inscricoes, 'acordar_envio', lambda: None)
+    with diario_inscricoes.conectar_diario() as conexao:
+        conexao.execute("DELETE FROM diario")
+    unidade = planilha.worksheet('MODALIDADES').get_all_values()[1][2]
+    _oferecer(planilha, ('M', 'Modalidade Nova', unidade, 'SIM', 12))
+
+    dados = list(planilha.worksheet('INSCRITOS-UNIDADE').get_all_values()[1])
+    dados[0], dados[2], dados[4], dados[5] = unidade, 'RA-PENDENTE', 'M', 'Modalidade Nova'
+    dados[7] = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+    assert agregados.obter_resumo_inscricoes() is not None
+    assert diario_inscricoes.enfileirar_inscricoes([dados])[0] == 1
+
+    nova = _linha(agregados.obter_resumo_inscricoes(), unidade, 'Modalidade Nova', 'M')
+    assert (nova['Inscricoes'], nova['Reservadas'], nova['Vagas_Restantes']) == (0, 1, 11)
+    df_modalidades = carregar_modalidades_atualizadas()
+    linha = df_modalidades[(df_modalidades['Unidade'] == unidade) &
+                           (df_modalidades['Modalidade'] == 'Modalidade Nova')].iloc[0]
+    assert (linha['Inscritos'], linha['Vagas_Restantes']) == (0, 11)
+
+    # Enviada à planilha, a inscrição passa de reservada a inscrita
+    assert diario_inscricoes.enviar_lote() == 1
+    nova = _linha(agregados.obter_resumo_inscricoes(), unidade, 'Modalidade Nova', 'M')
+    assert (nova['Inscricoes'], nova['Reservadas'], nova['Vagas_Restantes']) == (1, 0, 11)
+
+def test_regras_de_elegibilidade_acompanham_as_reservas(planilha, monkeypatch):
+    from utils import diario_inscricoes
+    from utils.elegibilidade import regras_atuais
+    monkeypatch.setattr(diario_inscricoes, 'acordar_envio', lambda: None)
+    with diario_inscricoes.conectar_diario() as conexao:
+        conexao.execute("DELETE FROM diario")
+    unidade = planilha.worksheet('MODALIDADES').get_all_values()[1][2]
+    _oferecer(planilha, ('M', 'Modalidade Nova', unidade, 'SIM', 1))
+
+    regras = regras_atuais()
+    posicao = regras['chaves'][(unidade, 'Modalidade Nova', 'M')]
+    assert regras['vagas'][posicao] == 1
+    dados = list(planilha.worksheet('INSCRITOS-UNIDADE').get_all_values()[1])
+    dados[0], dados[2], dados[4], dados[5] = unidade, 'RA-PENDENTE', 'M', 'Modalidade Nova'
+    dados[7] = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+    assert diario_inscricoes.enfileirar_inscricoes([dados])[0] == 1
+    assert regras_atuais()['vagas'][posicao] == 0
@@ -0,0 +1,65 @@
+# tests/test_api_contagens.py
+import json
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from utils import api_contagens
+
+@pytest.fixture
+def servidor(monkeypatch):
+    monkeypatch.setattr(api_contagens, 'API_TOKEN_METRICAS', 'segredo')
+    monkeypatch.setattr(api_contagens, 'API_ORIGENS', {'https://placar.exemplo.com'})
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), api_contagens.ManipuladorContagens)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{servidor.server_address[1]}"
+    servidor.shutdown()
+    servidor.server_close()
+
+def _consultar(url, cabecalhos=None):
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=cabecalhos or {})) as resposta:
+            return resposta.status, resposta.headers
+    except urllib.error.HTTPError as erro:
+        return erro.code, erro.headers
+
+def test_metrics_exige_token(servidor):
+    assert _consultar(f"{servidor}/metrics")[0] == 401
+    assert _consultar(f"{servidor}/metrics", {'Authorization': 'Bearer outro'})[0] == 401
+    assert _consultar(f"{servidor}/metrics", {'Authorization': 'Bearer segredo'})[0] == 200
+
+def test_cors_so_para_origens_liberadas(servidor):
+    _, cabecalhos = _consultar(f"{servidor}/saude", {'Origin': 'https://qualquer.exemplo.com'})
+    assert cabecalhos.get('Access-Control-Allow-Origin') is None
+    _, cabecalhos = _consultar(f"{servidor}/saude", {'Origin': 'https://placar.exemplo.com'})
+    assert cabecalhos.get('Access-Control-Allow-Origin') == 'https://placar.exemplo.com'
+
+def test_contagens_respondem_304_ao_repetir_o_etag(planilha, servidor):
+    from utils.agregados import obter_resumo_inscricoes
+    api_contagens._respostas.clear()
+    obter_resumo_inscricoes()
+
+    status, cabecalhos = _consultar(f"{servidor}/contagens")
+    assert status == 200
+    etag = cabecalhos['ETag']
+    status, cabecalhos = _consultar(f"{servidor}/contagens", {'If-None-Match': etag})
+    assert status == 304
+    assert cabecalhos['ETag'] == etag
+
+def test_contagens_trazem_modalidades_sem_inscricao(planilha, servidor):
+    from utils.agregados import obter_resumo_inscricoes
+    api_contagens._respostas.clear()
+    modalidades = planilha.worksheet('MODALIDADES')
+    unidade = modalidades.get_all_values()[1][2]
+    modalidades._valores.append(['F', 'Modalidade Nova', unidade, 'SIM', '10', '0', '10'])
+    obter_resumo_inscricoes()
+
+    with urllib.request.urlopen(f"{servidor}/contagens?unidade={urllib.parse.quote(unidade)}") as resposta:
+        corpo = json.loads(resposta.read())
+    nova = [m for m in corpo['unidades'][unidade]['modalidades'] if m['modalidade'] == 'Modalidade Nova']
+    assert nova == [{'modalidade': 'Modalidade Nova', 'genero': 'F', 'inscricoes': 0, 'alunos_unicos': 0,
+                     'limite_vagas': 10, 'tem_vaga': True, 'vagas_restantes': 10}]
@@ -0,0 +1,18 @@
+# tests/test_cache_compartilhado.py
+import pytest
+
+from utils.cache_compartilhado import CacheCompartilhado, CacheSQLite
+
+def test_backend_incompleto_falha_ao_ser_criado():
+    class CacheSoVersao(CacheCompartilhado):
+        def obter_versao(self, aba):
+            return 0
+
+    with pytest.raises(TypeError):
+        CacheSoVersao()
+
+def test_backend_sqlite_implementa_a_interface(tmp_path):
+    cache = CacheSQLite(str(tmp_path / 'cache.sqlite3'))
+    assert cache.incrementar_versao('MODALIDADES') == cache.obter_versao('MODALIDADES')
+    cache.gravar_snapshot('MODALIDADES', 1, [['a', 'b']])
+    assert cache.ler_snapshot('MODALIDADES', 1) == [['a', 'b']]
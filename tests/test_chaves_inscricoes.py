@@ -0,0 +1,62 @@
+# tests/test_chaves_inscricoes.py
+import threading
+
+from utils.sheets import (ABA_INSCRICOES_ATIVA, chaves_inscricoes, excluir_registro_inscricao,
+                          localizar_linha_inscricao)
+
+def _linhas(planilha):
+    return planilha.worksheet(ABA_INSCRICOES_ATIVA).get_all_values()[1:]
+
+def _com_repetidas(planilha):
+    """Acrescenta duas inscrições idênticas (mesmo RA, modalidade e data/hora) ao fim da aba"""
+    ws = planilha.worksheet(ABA_INSCRICOES_ATIVA)
+    repetida = list(ws.get_all_values()[1])
+    repetida[2], repetida[5] = 'RA-REPETIDO', 'Modalidade Teste'
+    ws._valores.extend([list(repetida), list(repetida)])
+    planilha._marcar_alteracao()
+    return repetida
+
+def test_linhas_repetidas_recebem_chaves_distintas(planilha):
+    _com_repetidas(planilha)
+    chaves = chaves_inscricoes(_linhas(planilha))
+    assert len(set(chaves)) == len(chaves)
+    assert chaves[-1] == f"{chaves[-2]}-1"
+
+def test_chaves_continuam_localizando_depois_de_exclusoes(planilha):
+    repetida = _com_repetidas(planilha)
+    linhas = _linhas(planilha)
+    chaves = chaves_inscricoes(linhas)
+    assert localizar_linha_inscricao(chaves[10]) == 12
+
+    # Exclui uma linha acima e a primeira das repetidas: as chaves já emitidas continuam valendo
+    assert excluir_registro_inscricao(chaves[0], linhas[0], 'teste')
+    assert excluir_registro_inscricao(chaves[-2], repetida, 'teste')
+    assert localizar_linha_inscricao(chaves[0]) is None
+    assert localizar_linha_inscricao(chaves[10]) == 11
+    linha_restante = localizar_linha_inscricao(chaves[-1])
+    assert linha_restante == len(linhas) - 1
+    assert _linhas(planilha)[linha_restante - 2][2] == 'RA-REPETIDO'
+
+    assert excluir_registro_inscricao(chaves[-1], repetida, 'teste')
+    assert not any(linha[2] == 'RA-REPETIDO' for linha in _linhas(planilha))
+    assert localizar_linha_inscricao(chaves[10]) == 11
+
+def test_exclusoes_simultaneas_apagam_as_linhas_certas(planilha):
+    linhas = _linhas(planilha)
+    chaves = chaves_inscricoes(linhas)
+    localizar_linha_inscricao(chaves[0])
+    alvos = list(range(0, 20, 2))
+    resultados = []
+
+    def excluir(posicao):
+        resultados.append(excluir_registro_inscricao(chaves[posicao], linhas[posicao], 'teste'))
+
+    threads = [threading.Thread(target=excluir, args=(posicao,)) for posicao in alvos]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert resultados == [True] * len(alvos)
+    restantes = _linhas(planilha)
+    assert restantes == [linha for i, linha in enumerate(linhas) if i not in alvos]
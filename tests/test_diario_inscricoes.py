@@ -0,0 +1,85 @@
+# tests/test_diario_inscricoes.py
+from datetime import datetime
+
+from utils import diario_inscricoes
+from utils.sheets import ABA_INSCRICOES_ATIVA, PREFIXO_ARQUIVO_INSCRICOES, get_ws, load_full_sheet_as_df
+
+def _contar_par(ra, modalidade, aba=ABA_INSCRICOES_ATIVA):
+    df = load_full_sheet_as_df(aba)
+    return int(((df.iloc[:, 2].astype(str).str.strip() == ra) &
+                (df.iloc[:, 5].astype(str).str.strip() == modalidade)).sum())
+
+def _nova_inscricao(planilha, ra, data_hora=None):
+    """Linha no formato da aba, com a Data/Hora de agora (como as do cadastro)"""
+    dados = list(planilha.worksheet(ABA_INSCRICOES_ATIVA).get_all_values()[1])
+    dados[2], dados[5] = ra, 'Modalidade Teste'
+    dados[7] = data_hora or datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+    return dados
+
+def _esvaziar_diario(monkeypatch):
+    monkeypatch.setattr(diario_inscricoes, 'acordar_envio', lambda: None)
+    with diario_inscricoes.conectar_diario() as conexao:
+        conexao.execute("DELETE FROM diario")
+
+def test_append_que_falha_depois_de_gravar_nao_duplica(planilha, monkeypatch):
+    _esvaziar_diario(monkeypatch)
+    dados = _nova_inscricao(planilha, 'RA-TESTE-AMBIGUO')
+    assert diario_inscricoes.enfileirar_inscricoes([dados])[0] == 1
+    assert _contar_par('RA-TESTE-AMBIGUO', 'Modalidade Teste') == 0
+
+    # A planilha grava as linhas, mas a resposta se perde (timeout)
+    ws = get_ws(ABA_INSCRICOES_ATIVA)
+    append_original = ws.append_rows
+    def append_com_timeout(linhas, **kwargs):
+        append_original(linhas, **kwargs)
+        raise TimeoutError("Tempo esgotado aguardando a resposta")
+    monkeypatch.setattr(ws, 'append_rows', append_com_timeout)
+    assert diario_inscricoes.enviar_lote() == 0
+    monkeypatch.setattr(ws, 'append_rows', append_original)
+
+    # A nova tentativa encontra a linha já gravada e não envia de novo
+    with diario_inscricoes.conectar_diario() as conexao:
+        conexao.execute("UPDATE diario SET proxima_tentativa = 0")
+    assert diario_inscricoes.enviar_lote() == 0
+    assert _contar_par('RA-TESTE-AMBIGUO', 'Modalidade Teste') == 1
+    with diario_inscricoes.conectar_diario() as conexao:
+        status = conexao.execute("SELECT status FROM diario WHERE ra = 'RA-TESTE-AMBIGUO'").fetchone()[0]
+    assert status == 'duplicado'
+
+def test_inscricao_de_temporada_encerrada_vai_para_o_arquivo(planilha, monkeypatch):
+    _esvaziar_diario(monkeypatch)
+    ano_anterior = datetime.now().year - 1
+    dados = _nova_inscricao(planilha, 'RA-TESTE-ARQUIVO', f"15/06/{ano_anterior} 10:00:00")
+    assert diario_inscricoes.enfileirar_inscricoes([dados])[0] == 1
+
+    assert diario_inscricoes.enviar_lote() == 1
+    aba_arquivo = f"{PREFIXO_ARQUIVO_INSCRICOES}{ano_anterior}"
+    assert _contar_par('RA-TESTE-ARQUIVO', 'Modalidade Teste') == 0
+    assert _contar_par('RA-TESTE-ARQUIVO', 'Modalidade Teste', aba_arquivo) == 1
+    assert planilha.worksheet(aba_arquivo).get_all_values()[0] == planilha.worksheet(ABA_INSCRICOES_ATIVA).get_all_values()[0]
+
+def test_temporada_ativa_lida_a_cada_envio(planilha, monkeypatch):
+    _esvaziar_diario(monkeypatch)
+    ano_anterior = datetime.now().year - 1
+    monkeypatch.setenv('INTERCLASSE_TEMPORADA', str(ano_anterior))
+    dados = _nova_inscricao(planilha, 'RA-TESTE-TEMPORADA', f"15/06/{ano_anterior} 10:00:00")
+    diario_inscricoes.enfileirar_inscricoes([dados])
+
+    assert diario_inscricoes.enviar_lote() == 1
+    assert _contar_par('RA-TESTE-TEMPORADA', 'Modalidade Teste') == 1
+
+def test_envio_nao_rele_a_aba_a_cada_lote(planilha, monkeypatch):
+    _esvaziar_diario(monkeypatch)
+    ras = ('RA-LOTE-1', 'RA-LOTE-2', 'RA-LOTE-3')
+    inscricoes = [_nova_inscricao(planilha, ra) for ra in ras]
+    # A primeira reserva monta a guarda (uma leitura das colunas RA e Modalidade)
+    assert diario_inscricoes.enfileirar_inscricoes(inscricoes[:1])[0] == 1
+    leituras_antes = planilha.chamadas.copy()
+    assert diario_inscricoes.enviar_lote() == 1
+    for dados in inscricoes[1:]:
+        assert diario_inscricoes.enfileirar_inscricoes([dados])[0] == 1
+        assert diario_inscricoes.enviar_lote() == 1
+    # Duplicidade conferida na guarda, em memória: nenhuma leitura da aba
+    for operacao in ('get_all_values', 'batch_get', 'get'):
+        assert planilha.chamadas[(ABA_INSCRICOES_ATIVA, operacao)] == leituras_antes[(ABA_INSCRICOES_ATIVA, operacao)]
+    assert all(_contar_par(ra, 'Modalidade Teste') == 1 for ra in ras)
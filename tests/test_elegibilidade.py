@@ -0,0 +1,97 @@
+# tests/test_elegibilidade.py
+import numpy as np
+import pytest
+
+from utils.elegibilidade import avaliar_elegibilidade, compilar_regras, modalidades_elegiveis
+from utils.sheets import LIMITE_MODALIDADES_POR_ALUNO, marcar_aba_alterada, obter_versao_aba
+
+UNIDADE = 'Unidade Teste'
+# Genero, Modalidade, Tem_Vaga, Limite_Vagas, Turmas_Permitidas: cada linha exercita uma regra
+OFERTAS = [
+    ('M', 'Futsal', 'SIM', 10, ''),
+    ('F', 'Vôlei', 'SIM', 10, ''),
+    ('M / F', 'Xadrez', 'SIM', 10, ''),
+    ('M', 'Basquete', 'SIM', 10, '1A, 1B'),
+    ('M', 'Handebol', 'NÃO', 10, ''),
+    ('M', 'Judô', 'SIM', 1, ''),
+]
+# RA, Turma, modalidades em que já está inscrito
+ALUNOS = [
+    ('RA-LIVRE', '1A', ()),
+    ('RA-OUTRA-TURMA', '2A', ()),
+    ('RA-NO-LIMITE', '1B', ('Atletismo', 'Natação', 'Dama')),
+    ('RA-NO-FUTSAL', '1A', ('Futsal',)),
+]
+
+@pytest.fixture
+def regras(planilha):
+    """Regras compiladas de uma aba MODALIDADES pequena, só com a unidade de teste"""
+    ws = planilha.worksheet('MODALIDADES')
+    ws._valores[:] = [['Genero', 'Modalidade', 'Unidade', 'Tem_Vaga', 'Limite_Vagas', 'Inscritos',
+                       'Vagas_Restantes', 'Turmas_Permitidas']]
+    ws._valores.extend([genero, modalidade, UNIDADE, tem_vaga, str(limite), '0', str(limite), turmas]
+                       for genero, modalidade, tem_vaga, limite, turmas in OFERTAS)
+    planilha._marcar_alteracao()
+    return compilar_regras(obter_versao_aba('MODALIDADES'))
+
+def _avaliar(regras, vagas_utilizadas=None, genero='M'):
+    ras, turmas, registradas = zip(*ALUNOS)
+    return avaliar_elegibilidade(regras, UNIDADE, ras, turmas, dict(zip(ras, registradas)),
+                                 vagas_utilizadas, genero)
+
+def _celulas(elegibilidade, regra):
+    """(RA, modalidade) bloqueados pela regra"""
+    linhas, colunas = np.nonzero(elegibilidade['bloqueios'][regra])
+    return {(ALUNOS[i][0], elegibilidade['nomes'][k]) for i, k in zip(linhas, colunas)}
+
+def _todos(*modalidades):
+    return {(ra, modalidade) for ra, _, _ in ALUNOS for modalidade in modalidades}
+
+def test_cada_regra_bloqueia_so_o_que_lhe_cabe(regras):
+    assert LIMITE_MODALIDADES_POR_ALUNO == 3
+    elegibilidade = _avaliar(regras)
+
+    assert list(elegibilidade['nomes']) == [modalidade for _, modalidade, *_ in OFERTAS]
+    assert _celulas(elegibilidade, 'genero') == _todos('Vôlei')
+    assert _celulas(elegibilidade, 'turma') == {('RA-OUTRA-TURMA', 'Basquete')}
+    assert _celulas(elegibilidade, 'vaga') == _todos('Handebol')
+    assert _celulas(elegibilidade, 'limite_aluno') == {('RA-NO-LIMITE', modalidade) for _, modalidade, *_ in OFERTAS}
+    assert _celulas(elegibilidade, 'repetida') == {('RA-NO-FUTSAL', 'Futsal')}
+    assert elegibilidade['inscricoes_aluno'].tolist() == [0, 0, 3, 1]
+
+    # Elegível é exatamente o que nenhuma regra bloqueia
+    bloqueado = np.zeros_like(elegibilidade['elegivel'])
+    for mascara in elegibilidade['bloqueios'].values():
+        bloqueado |= mascara
+    assert (elegibilidade['elegivel'] == ~bloqueado).all()
+    assert modalidades_elegiveis(regras, elegibilidade, 0, 'M') == ['Futsal', 'Xadrez', 'Basquete', 'Judô']
+    assert modalidades_elegiveis(regras, elegibilidade, 1, 'M') == ['Futsal', 'Xadrez', 'Judô']
+    assert modalidades_elegiveis(regras, elegibilidade, 2, 'M') == []
+    assert modalidades_elegiveis(regras, elegibilidade, 3, 'M') == ['Xadrez', 'Basquete', 'Judô']
+
+def test_genero_misto_e_sem_filtro_liberam_a_modalidade(regras):
+    assert _celulas(_avaliar(regras, genero='F'), 'genero') == _todos('Futsal', 'Basquete', 'Handebol', 'Judô')
+    assert _celulas(_avaliar(regras, genero=None), 'genero') == set()
+    assert _celulas(_avaliar(regras, genero='Todos'), 'genero') == set()
+
+def test_vagas_tomadas_por_selecoes_ainda_nao_gravadas(regras):
+    elegibilidade = _avaliar(regras, vagas_utilizadas={'Judô': 1})
+    assert _celulas(elegibilidade, 'vaga') == _todos('Handebol', 'Judô')
+    posicao = list(elegibilidade['nomes']).index('Judô')
+    assert elegibilidade['vagas'][posicao] == 0
+    # As demais regras não mudam com as vagas
+    assert _celulas(elegibilidade, 'repetida') == {('RA-NO-FUTSAL', 'Futsal')}
+
+def test_regras_compiladas_uma_vez_por_versao(planilha, regras):
+    versao = obter_versao_aba('MODALIDADES')
+    assert compilar_regras(versao) is regras
+    assert regras['vagas'].tolist() == [10, 10, 10, 10, 0, 1]
+    assert regras['turmas'][3] == frozenset({'1A', '1B'})
+
+    # Uma escrita da aplicação na aba gera outra versão e outra compilação
+    planilha.worksheet('MODALIDADES')._valores[6][4:7] = ['5', '0', '5']
+    planilha._marcar_alteracao()
+    marcar_aba_alterada('MODALIDADES')
+    nova_versao = obter_versao_aba('MODALIDADES')
+    assert nova_versao != versao
+    assert compilar_regras(nova_versao)['vagas'].tolist() == [10, 10, 10, 10, 0, 5]
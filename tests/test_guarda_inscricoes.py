@@ -0,0 +1,120 @@
+# tests/test_guarda_inscricoes.py
+import threading
+from datetime import datetime
+
+import pytest
+
+from utils import diario_inscricoes
+from utils.sheets import (ABA_INSCRICOES_ATIVA, LIMITE_MODALIDADES_POR_ALUNO, append_row_and_clear_cache,
+                          get_ws, liberar_reservas, pares_ja_gravados, reservar_inscricoes,
+                          reservas_por_combinacao)
+
+def _nova_inscricao(planilha, ra, modalidade='Modalidade Teste'):
+    """Linha no formato da aba, da temporada ativa, para um par (RA, Modalidade) ainda não gravado"""
+    dados = list(planilha.worksheet(ABA_INSCRICOES_ATIVA).get_all_values()[1])
+    dados[2], dados[5] = ra, modalidade
+    dados[7] = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+    return dados
+
+def _reservadas(dados):
+    return reservas_por_combinacao()[1][(dados[0], dados[5], dados[4])]
+
+def _em_paralelo(funcao, argumentos):
+    """Chama a função em uma thread por argumento, todas liberadas ao mesmo tempo"""
+    barreira = threading.Barrier(len(argumentos))
+    resultados = [None] * len(argumentos)
+
+    def executar(posicao):
+        barreira.wait()
+        resultados[posicao] = funcao(argumentos[posicao])
+
+    threads = [threading.Thread(target=executar, args=(posicao,)) for posicao in range(len(argumentos))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return resultados
+
+def test_reservas_simultaneas_do_mesmo_par_aceitam_uma(planilha):
+    dados = _nova_inscricao(planilha, 'RA-CONCORRENTE')
+
+    resultados = _em_paralelo(lambda linha: reservar_inscricoes([linha]), [list(dados) for _ in range(16)])
+
+    assert sum(len(aceitas) for aceitas, _ in resultados) == 1
+    motivos = [motivo for _, rejeitadas in resultados for _, motivo in rejeitadas]
+    assert len(motivos) == 15
+    assert all('já está inscrito(a) em Modalidade Teste' in motivo for motivo in motivos)
+    assert _reservadas(dados) == 1
+
+    # Liberada, a reserva deixa de ocupar vaga e o par pode ser reservado de novo
+    liberar_reservas([dados])
+    assert _reservadas(dados) == 0
+    assert reservar_inscricoes([dados])[0] == [dados]
+
+def test_limite_por_aluno_conta_reservas_simultaneas(planilha):
+    pedidos = [_nova_inscricao(planilha, 'RA-LIMITE', f"Modalidade {i}") for i in range(6)]
+
+    resultados = _em_paralelo(lambda linha: reservar_inscricoes([linha]), pedidos)
+
+    aceitas = [linha for aceitas, _ in resultados for linha in aceitas]
+    assert len(aceitas) == LIMITE_MODALIDADES_POR_ALUNO
+    recusadas = [linha for linha in pedidos if linha not in aceitas]
+    assert reservar_inscricoes(recusadas[:1])[0] == []
+    liberar_reservas(aceitas[:1])
+    assert reservar_inscricoes(recusadas[:1])[0] == recusadas[:1]
+
+def test_append_que_falha_libera_a_reserva(planilha, monkeypatch):
+    dados = _nova_inscricao(planilha, 'RA-FALHA-APPEND')
+    ws = get_ws('INSCRITOS-UNIDADE')
+    append_original = ws.append_row
+    def append_com_erro(*args, **kwargs):
+        raise ConnectionError("Planilha indisponível")
+    monkeypatch.setattr(ws, 'append_row', append_com_erro)
+
+    assert append_row_and_clear_cache('INSCRITOS-UNIDADE', dados) is False
+    assert _reservadas(dados) == 0
+    assert pares_ja_gravados([dados]) == set()
+
+    # A nova tentativa não é recusada como repetida e, gravada, passa a bloquear o par
+    monkeypatch.setattr(ws, 'append_row', append_original)
+    assert append_row_and_clear_cache('INSCRITOS-UNIDADE', dados) is True
+    assert _reservadas(dados) == 0
+    assert pares_ja_gravados([dados]) == {('RA-FALHA-APPEND', 'Modalidade Teste')}
+    assert reservar_inscricoes([dados])[0] == []
+
+def test_diario_que_falha_libera_a_reserva(planilha, monkeypatch):
+    dados = _nova_inscricao(planilha, 'RA-FALHA-DIARIO')
+    def gravar_com_erro(conexao, linhas):
+        raise OSError("Disco cheio")
+    monkeypatch.setattr(diario_inscricoes, 'gravar_no_diario', gravar_com_erro)
+
+    with pytest.raises(OSError):
+        diario_inscricoes.enfileirar_inscricoes([dados])
+    assert _reservadas(dados) == 0
+    assert reservar_inscricoes([dados])[0] == [dados]
+
+def test_envio_que_falha_mantem_a_reserva_ate_a_nova_tentativa(planilha, monkeypatch):
+    monkeypatch.setattr(diario_inscricoes, 'acordar_envio', lambda: None)
+    with diario_inscricoes.conectar_diario() as conexao:
+        conexao.execute("DELETE FROM diario")
+    dados = _nova_inscricao(planilha, 'RA-FALHA-ENVIO')
+    assert diario_inscricoes.enfileirar_inscricoes([dados])[0] == 1
+
+    ws = get_ws(ABA_INSCRICOES_ATIVA)
+    append_original = ws.append_rows
+    def append_com_erro(*args, **kwargs):
+        raise ConnectionError("Planilha indisponível")
+    monkeypatch.setattr(ws, 'append_rows', append_com_erro)
+    assert diario_inscricoes.enviar_lote() == 0
+
+    # A inscrição continua no diário: a vaga segue reservada e o par, bloqueado
+    assert _reservadas(dados) == 1
+    assert reservar_inscricoes([dados])[0] == []
+
+    monkeypatch.setattr(ws, 'append_rows', append_original)
+    with diario_inscricoes.conectar_diario() as conexao:
+        conexao.execute("UPDATE diario SET proxima_tentativa = 0")
+    assert diario_inscricoes.enviar_lote() == 1
+    assert _reservadas(dados) == 0
+    assert pares_ja_gravados([dados]) == {('RA-FALHA-ENVIO', 'Modalidade Teste')}
+    assert reservar_inscricoes([dados])[0] == []
@@ -0,0 +1,118 @@
+# tests/test_lista_espera.py
+import time
+
+import pytest
+
+from utils import diario_inscricoes, lista_espera
+
+@pytest.fixture
+def espera(planilha, monkeypatch):
+    """Diário e lista de espera vazios, sem a thread de envio"""
+    monkeypatch.setattr(lista_espera, 'acordar_envio', lambda: None)
+    with lista_espera._conectar() as conexao:
+        for tabela in ('diario', 'espera', 'vagas_liberadas'):
+            conexao.execute(f"DELETE FROM {tabela}")
+    inscrita = planilha.worksheet('INSCRITOS-UNIDADE').get_all_values()[1]
+    pedido = list(inscrita)
+    pedido[1], pedido[2] = 'Aluno da Espera', 'RA-ESPERA'
+    assert lista_espera.entrar_na_espera([pedido]) == 1
+    return inscrita
+
+def _status(tabela, coluna, valor):
+    with lista_espera._conectar() as conexao:
+        return [s for s, in conexao.execute(f"SELECT status FROM {tabela} WHERE {coluna} = ?", (valor,))]
+
+def _excluir_da_planilha(planilha, dados):
+    valores = planilha.worksheet('INSCRITOS-UNIDADE')._valores
+    valores.remove(list(dados))
+    planilha._marcar_alteracao()
+
+def test_pedidos_aguardando_usa_o_indice(espera):
+    assert lista_espera.pedidos_aguardando('RA-ESPERA') == [espera[5]]
+    with lista_espera._conectar() as conexao:
+        plano = conexao.execute(
+            "EXPLAIN QUERY PLAN SELECT modalidade FROM espera WHERE ra = ? AND status = 'aguardando' "
+            "ORDER BY modalidade", ('RA-ESPERA',)
+        ).fetchall()
+    assert any('espera_aguardando_unico' in linha[-1] for linha in plano)
+
+def test_vaga_anotada_e_recuperada_depois_de_uma_queda(planilha, espera, monkeypatch):
+    # A exclusão chega à planilha, mas o processo cai antes da promoção
+    lista_espera.anotar_vagas_liberadas([espera])
+    _excluir_da_planilha(planilha, espera)
+
+    monkeypatch.setattr(lista_espera, '_INICIO_PROCESSO', time.time() + 1)
+    promovidas = lista_espera.recuperar_vagas_anotadas()
+    assert [linha[2] for linha in promovidas] == ['RA-ESPERA']
+    assert _status('diario', 'ra', 'RA-ESPERA') == ['pendente']
+    assert _status('espera', 'ra', 'RA-ESPERA') == ['promovido']
+    assert lista_espera.recuperar_vagas_anotadas() == []
+
+def test_vaga_de_exclusao_que_nao_aconteceu_nao_promove(espera, monkeypatch):
+    lista_espera.anotar_vagas_liberadas([espera])
+    monkeypatch.setattr(lista_espera, '_INICIO_PROCESSO', time.time() + 1)
+    assert lista_espera.recuperar_vagas_anotadas() == []
+    assert _status('espera', 'ra', 'RA-ESPERA') == ['aguardando']
+
+def test_promocao_e_baixa_da_vaga_na_mesma_transacao(planilha, espera, monkeypatch):
+    ids_vagas = lista_espera.anotar_vagas_liberadas([espera])
+    _excluir_da_planilha(planilha, espera)
+
+    gravar_original = diario_inscricoes.gravar_no_diario
+    def gravar_e_cair(conexao, linhas):
+        gravar_original(conexao, linhas)
+        raise RuntimeError("queda durante a gravação")
+    monkeypatch.setattr(lista_espera, 'gravar_no_diario', gravar_e_cair)
+    with pytest.raises(RuntimeError):
+        lista_espera.promover_apos_exclusoes(ids_vagas)
+
+    # Nada ficou pela metade: a vaga continua anotada e o aluno continua na fila
+    assert _status('diario', 'ra', 'RA-ESPERA') == []
+    assert _status('espera', 'ra', 'RA-ESPERA') == ['aguardando']
+    assert _status('vagas_liberadas', 'id', ids_vagas[0]) == ['anotada']
+
+    monkeypatch.setattr(lista_espera, 'gravar_no_diario', gravar_original)
+    assert [linha[2] for linha in lista_espera.promover_apos_exclusoes(ids_vagas)] == ['RA-ESPERA']
+    assert _status('vagas_liberadas', 'id', ids_vagas[0]) == ['promovida']
+
+def _linha_modalidade(planilha, dados):
+    """Linha da aba MODALIDADES da (unidade, modalidade, gênero) da inscrição"""
+    valores = planilha.worksheet('MODALIDADES')._valores
+    return next(linha for linha in valores[1:] if (linha[2], linha[1], linha[0]) == (dados[0], dados[5], dados[4]))
+
+def _permitir_turmas(planilha, dados, turmas):
+    """Acrescenta a coluna Turmas_Permitidas, restringindo só a modalidade da inscrição"""
+    valores = planilha.worksheet('MODALIDADES')._valores
+    valores[0].append('Turmas_Permitidas')
+    for linha in valores[1:]:
+        linha.append('')
+    _linha_modalidade(planilha, dados)[-1] = turmas
+
+def test_promocao_confere_turmas_permitidas(planilha, espera):
+    permitido = list(espera)
+    permitido[1], permitido[2], permitido[3] = 'Aluno Permitido', 'RA-PERMITIDO', 'Turma Permitida'
+    assert lista_espera.entrar_na_espera([permitido]) == 1
+    _permitir_turmas(planilha, espera, 'Turma Permitida')
+
+    ids_vagas = lista_espera.anotar_vagas_liberadas([espera])
+    _excluir_da_planilha(planilha, espera)
+    # O primeiro da fila é de uma turma não permitida: sai da fila e o próximo é chamado
+    assert [linha[2] for linha in lista_espera.promover_apos_exclusoes(ids_vagas)] == ['RA-PERMITIDO']
+    assert _status('espera', 'ra', 'RA-ESPERA') == ['descartado']
+    assert _status('espera', 'ra', 'RA-PERMITIDO') == ['promovido']
+
+def test_sem_vaga_o_pedido_continua_na_fila(planilha, espera):
+    _linha_modalidade(planilha, espera)[3] = 'NÃO'
+    ids_vagas = lista_espera.anotar_vagas_liberadas([espera])
+    _excluir_da_planilha(planilha, espera)
+    assert lista_espera.promover_apos_exclusoes(ids_vagas) == []
+    assert _status('espera', 'ra', 'RA-ESPERA') == ['aguardando']
+    assert _status('vagas_liberadas', 'id', ids_vagas[0]) == ['promovida']
+
+def test_pedido_cancelado_nao_e_promovido(planilha, espera):
+    assert lista_espera.cancelar_espera('RA-ESPERA', espera[5]) == 1
+    assert lista_espera.pedidos_aguardando('RA-ESPERA') == []
+    ids_vagas = lista_espera.anotar_vagas_liberadas([espera])
+    _excluir_da_planilha(planilha, espera)
+    assert lista_espera.promover_apos_exclusoes(ids_vagas) == []
+    assert _status('espera', 'ra', 'RA-ESPERA') == ['cancelado']
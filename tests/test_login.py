@@ -0,0 +1,21 @@
+# tests/test_login.py
+from streamlit.testing.v1 import AppTest
+
+from tests.conftest import RAIZ
+
+SCRIPT_LOGIN = str(RAIZ / 'AtivarAQUI.py')
+
+def test_formulario_de_login_nao_le_a_planilha(planilha):
+    app = AppTest.from_file(SCRIPT_LOGIN, default_timeout=60)
+    app.run()
+    assert not app.exception
+    assert len(app.text_input) == 1
+    assert planilha.total_chamadas() == 0
+
+    # A aba AUTORIZADOS só é lida quando o e-mail é conferido
+    app.text_input[0].input('nao.autorizado@exemplo.com')
+    app.button[0].click()
+    app.run()
+    assert not app.exception
+    assert any('não autorizado' in erro.value for erro in app.error)
+    assert planilha.total_chamadas() > 0
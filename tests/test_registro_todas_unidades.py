@@ -0,0 +1,38 @@
+# tests/test_registro_todas_unidades.py
+from streamlit.testing.v1 import AppTest
+
+from tests.conftest import SCRIPT_APP
+
+def test_voltar_para_o_registro_depois_de_outra_pagina(planilha):
+    app = AppTest.from_file(SCRIPT_APP, default_timeout=60)
+    app.session_state['pagina_atual'] = 'TodasUnidades'
+    app.run()
+    assert not app.exception
+
+    # Em outra página o estado do number_input "pagina_registro" é descartado
+    app.session_state['pagina_atual'] = 'Lista'
+    app.run()
+    assert not app.exception
+
+    app.session_state['pagina_atual'] = 'TodasUnidades'
+    app.run()
+    assert not app.exception
+    assert not [erro.value for erro in app.error if 'pagina_registro' in erro.value]
+    assert app.number_input(key='pagina_registro').value == 1
+
+def test_exportacao_em_um_clique(planilha, monkeypatch):
+    from utils import exportacao
+    geracoes = []
+    gerar_original = exportacao.gerar_arquivo
+    monkeypatch.setattr(exportacao, 'gerar_arquivo', lambda df, formato: geracoes.append(formato) or gerar_original(df, formato))
+
+    app = AppTest.from_file(SCRIPT_APP, default_timeout=60)
+    app.session_state['pagina_atual'] = 'TodasUnidades'
+    app.run()
+    assert not app.exception
+    assert not [botao for botao in app.button if 'Gerar arquivo' in botao.label]
+    assert len(app.get('download_button')) >= 1
+
+    # Reexecutar a mesma visão não refaz o arquivo (cache por filtros e versão)
+    app.run()
+    assert geracoes == ['CSV']
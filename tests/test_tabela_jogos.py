@@ -0,0 +1,91 @@
+# tests/test_tabela_jogos.py
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from utils.tabela_jogos import detectar_conflitos, gerar_jogos, montar_tabela_jogos
+
+def _equipes(n, modalidade='Futsal', genero='M'):
+    """Tabela de equipes de um único grupo, com número de atletas decrescente (define as sementes)"""
+    return pd.DataFrame({
+        'Modalidade': [modalidade] * n,
+        'Genero': [genero] * n,
+        'Equipe': [f"Equipe {i + 1}" for i in range(n)],
+        'Atletas': list(range(n + 10, 10, -1)),
+    })
+
+def _inscricoes(*linhas):
+    """Inscrições mínimas para montar_tabela_jogos: (Unidade, Turma, RA, Modalidade)"""
+    return pd.DataFrame([
+        {'Unidade': unidade, 'Turma Aluno': turma, 'RA Aluno': ra, 'Modalidade': modalidade,
+         'Genero Modalidade': 'M'}
+        for unidade, turma, ra, modalidade in linhas
+    ])
+
+def test_pontos_corridos_com_numero_impar_da_folga_a_cada_equipe():
+    jogos = gerar_jogos(_equipes(5), 'Pontos corridos')
+
+    assert len(jogos) == 5 * 4 // 2
+    confrontos = {frozenset((jogo['Equipe A'], jogo['Equipe B'])) for jogo in jogos}
+    assert len(confrontos) == len(jogos)
+    rodadas = sorted({jogo['rodada'] for jogo in jogos})
+    assert rodadas == [1, 2, 3, 4, 5]
+    equipes = {f"Equipe {i + 1}" for i in range(5)}
+    folgas = Counter()
+    for rodada in rodadas:
+        jogando = [equipe for jogo in jogos if jogo['rodada'] == rodada
+                   for equipe in (jogo['Equipe A'], jogo['Equipe B'])]
+        # Ninguém joga duas vezes na rodada e exatamente uma equipe folga
+        assert len(jogando) == len(set(jogando)) == 4
+        folgas.update(equipes - set(jogando))
+    assert folgas == Counter({equipe: 1 for equipe in equipes})
+
+def test_eliminatoria_completa_a_chave_ate_a_proxima_potencia_de_dois():
+    for n, vagas in ((3, 4), (5, 8), (6, 8), (7, 8), (9, 16)):
+        jogos = gerar_jogos(_equipes(n), 'Eliminatória')
+        folgas = vagas - n
+
+        # Uma partida a menos que o número de equipes, uma única final
+        assert len(jogos) == n - 1
+        assert [jogo['Fase'] for jogo in jogos].count('Final') == 1
+        assert jogos[-1]['Fase'] == 'Final'
+        primeira = [jogo for jogo in jogos if jogo['rodada'] == 1]
+        assert len(primeira) == (n - folgas) // 2
+        # As sementes (mais atletas) folgam e só estreiam na segunda fase
+        estreantes = {equipe for jogo in primeira for equipe in (jogo['Equipe A'], jogo['Equipe B'])}
+        assert estreantes.isdisjoint({f"Equipe {i + 1}" for i in range(folgas)})
+        segunda = [jogo for jogo in jogos if jogo['rodada'] == 2]
+        assert len(segunda) == vagas // 4
+
+def test_automatico_troca_para_eliminatoria_acima_do_limite():
+    assert {jogo['Formato'] for jogo in gerar_jogos(_equipes(6))} == {'Pontos corridos'}
+    assert {jogo['Formato'] for jogo in gerar_jogos(_equipes(7))} == {'Eliminatória'}
+
+def test_detectar_conflitos_aponta_aluno_em_dois_jogos_no_mesmo_horario():
+    # Jogos 0 e 1 no horário 0 dividem o aluno 1; o jogo 2 repete o aluno 1 em outro horário
+    horario_jogos = np.array([0, 0, 1])
+    alunos_jogos = [np.array([0, 1]), np.array([1, 2]), np.array([1, 3])]
+
+    pares, contagem = detectar_conflitos(horario_jogos, alunos_jogos, 4)
+
+    assert pares == [(0, 1)]
+    assert contagem.shape == (2, 4)
+    assert contagem[0].tolist() == [1, 2, 1, 0]
+    assert contagem[1].tolist() == [0, 1, 0, 1]
+    assert detectar_conflitos(np.array([], dtype=np.int64), [], 4)[0] == []
+
+def test_tabela_nao_marca_choque_para_aluno_em_varias_modalidades():
+    # RA-1 joga futsal e vôlei pela mesma unidade: os jogos das duas modalidades não podem coincidir
+    linhas = []
+    for unidade in ('Unidade A', 'Unidade B', 'Unidade C'):
+        linhas += [(unidade, '1A', f"{unidade}-{ra}", modalidade)
+                   for ra in ('RA-1', 'RA-2') for modalidade in ('Futsal', 'Vôlei')]
+    tabela = montar_tabela_jogos(_inscricoes(*linhas), n_quadras=4)
+
+    agenda = tabela['agenda']
+    assert len(agenda) == 2 * 3
+    assert tabela['conflitos'].empty
+    for unidade in ('Unidade A', 'Unidade B', 'Unidade C'):
+        com_a_unidade = agenda[(agenda['Equipe A'] == unidade) | (agenda['Equipe B'] == unidade)]
+        assert not com_a_unidade[['Dia', 'Horario']].duplicated().any()
@@ -0,0 +1,94 @@
+# tests/test_vigia_planilha.py
+from datetime import datetime, timedelta, timezone
+
+from utils import vigia_planilha
+from utils.sheets import get_ws, obter_versao_aba
+
+def _leituras_completas(planilha):
+    return planilha.chamadas[('*', 'values_batch_get')]
+
+def _registrar_intervalos(planilha, monkeypatch):
+    """Guarda os intervalos pedidos em cada values_batch_get"""
+    pedidos = []
+    original = planilha.values_batch_get
+    def values_batch_get(intervalos, **kwargs):
+        pedidos.append(list(intervalos))
+        return original(intervalos, **kwargs)
+    monkeypatch.setattr(planilha, 'values_batch_get', values_batch_get)
+    return pedidos
+
+def _alterar_por_fora(planilha, aba, celula, valor):
+    """Edição manual na planilha: não passa pela aplicação e acontece depois das escritas dela"""
+    linha, coluna = celula
+    planilha.worksheet(aba)._valores[linha - 1][coluna - 1] = valor
+    planilha._modificado_em = datetime.now(timezone.utc) + timedelta(seconds=60)
+
+def test_vigia_ignora_as_escritas_da_aplicacao(planilha):
+    estado = vigia_planilha.iniciar_vigia_planilha()
+    assert vigia_planilha.verificar_alteracoes(estado) == []
+    versao = obter_versao_aba('INSCRITOS-UNIDADE')
+
+    modelo = planilha.worksheet('INSCRITOS-UNIDADE').get_all_values()[1]
+    get_ws('INSCRITOS-UNIDADE').append_rows([modelo])
+    leituras = _leituras_completas(planilha)
+    assert vigia_planilha.verificar_alteracoes(estado) == []
+    assert obter_versao_aba('INSCRITOS-UNIDADE') == versao
+    # Só a leitura leve (coluna A) foi feita
+    assert _leituras_completas(planilha) == leituras + 1
+
+def test_vigia_rele_so_a_aba_alterada_por_fora(planilha, monkeypatch):
+    estado = vigia_planilha.iniciar_vigia_planilha()
+    vigia_planilha.verificar_alteracoes(estado)
+    estado['verificacao_completa_em'] = float('inf')
+    pedidos = _registrar_intervalos(planilha, monkeypatch)
+
+    _alterar_por_fora(planilha, 'MODALIDADES', (2, 1), 'Modalidade renomeada')
+    versao = obter_versao_aba('MODALIDADES')
+    assert vigia_planilha.verificar_alteracoes(estado) == ['MODALIDADES']
+    assert obter_versao_aba('MODALIDADES') == versao + 1
+    assert pedidos[-1] == ["'MODALIDADES'"]
+
+def test_vigia_rele_tudo_quando_a_coluna_a_nao_muda(planilha, monkeypatch):
+    estado = vigia_planilha.iniciar_vigia_planilha()
+    vigia_planilha.verificar_alteracoes(estado)
+    estado['verificacao_completa_em'] = float('inf')
+    pedidos = _registrar_intervalos(planilha, monkeypatch)
+
+    _alterar_por_fora(planilha, 'AUTORIZADOS', (2, 2), 'Outro Coordenador')
+    assert vigia_planilha.verificar_alteracoes(estado) == ['AUTORIZADOS']
+    assert len(pedidos[-1]) == len(vigia_planilha.ABAS_VIGIADAS)
+
+def _alterar_junto_com_a_aplicacao(planilha, aba, celula, valor):
+    """Edição manual logo depois de uma escrita da aplicação (dentro da folga do relógio)"""
+    linha, coluna = celula
+    planilha.worksheet(aba)._valores[linha - 1][coluna - 1] = valor
+    planilha._marcar_alteracao()
+
+def test_vigia_detecta_edicao_externa_perto_de_escrita_da_aplicacao(planilha, monkeypatch):
+    estado = vigia_planilha.iniciar_vigia_planilha()
+    vigia_planilha.verificar_alteracoes(estado)
+    estado['verificacao_completa_em'] = float('inf')
+    pedidos = _registrar_intervalos(planilha, monkeypatch)
+
+    modelo = planilha.worksheet('INSCRITOS-UNIDADE').get_all_values()[1]
+    get_ws('INSCRITOS-UNIDADE').append_rows([modelo])
+    _alterar_junto_com_a_aplicacao(planilha, 'MODALIDADES', (2, 1), 'Modalidade renomeada')
+    assert vigia_planilha.verificar_alteracoes(estado) == ['MODALIDADES']
+    assert pedidos[-1] == ["'MODALIDADES'"]
+
+def test_vigia_confere_a_coluna_a_esperada_da_aba_escrita(planilha):
+    estado = vigia_planilha.iniciar_vigia_planilha()
+    vigia_planilha.verificar_alteracoes(estado)
+    estado['verificacao_completa_em'] = float('inf')
+
+    ws = get_ws('INSCRITOS-UNIDADE')
+    modelo = planilha.worksheet('INSCRITOS-UNIDADE').get_all_values()[1]
+    ws.append_rows([modelo, modelo])
+    ws.delete_rows(3)
+    assert vigia_planilha.verificar_alteracoes(estado) == []
+
+    versao = obter_versao_aba('INSCRITOS-UNIDADE')
+    ws.append_rows([modelo])
+    _alterar_junto_com_a_aplicacao(planilha, 'INSCRITOS-UNIDADE', (2, 1), 'Unidade digitada à mão')
+    assert vigia_planilha.verificar_alteracoes(estado) == ['INSCRITOS-UNIDADE']
+    assert obter_versao_aba('INSCRITOS-UNIDADE') == versao + 1
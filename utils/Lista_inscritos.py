@@ -2,6 +2,8 @@
 import streamlit as st
 import pandas as pd
 from utils.sheets import *
+from utils.inscritos import COLUNAS_INSCRITOS, carregar_inscritos_unidade
+from utils.lista_espera import anotar_vagas_liberadas, promover_apos_exclusoes
 
 def pagina_lista_inscritos():
     """Página para visualizar e gerenciar inscrições"""
@@ -12,29 +14,10 @@ def pagina_lista_inscritos():
         st.error("Falha crítica ao conectar com o Google Sheets. A aplicação não pode continuar.")
         return
     
-    # Carrega dados dos inscritos
+    # Carrega só as inscrições da unidade do usuário logado (leitura por faixas de linhas)
     try:
-        df_inscritos = load_full_sheet_as_df('INSCRITOS-UNIDADE')
-        
-        if df_inscritos.empty:
-            st.info("Nenhum aluno inscrito encontrado.")
-            return
-        
-        # Verifica e padroniza os nomes das colunas
-        if len(df_inscritos.columns) >= 6:
-            # Pega as primeiras 6 colunas conforme especificado
-            df_inscritos = df_inscritos.iloc[:, :9]  # Pega até 9 colunas se existirem
-            if len(df_inscritos.columns) >= 9:
-                df_inscritos.columns = ['Unidade', 'Nome Aluno', 'RA Aluno', 'Turma Aluno', 'Genero Modalidade', 'Modalidade', 'Unidade Modalidade', 'Data/Hora', 'Usuario']
-            else:
-                # Preenche colunas faltantes
-                colunas_base = ['Unidade', 'Nome Aluno', 'RA Aluno', 'Turma Aluno', 'Genero Modalidade', 'Modalidade']
-                colunas_extras = ['Unidade Modalidade', 'Data/Hora', 'Usuario'][:len(df_inscritos.columns)-6]
-                df_inscritos.columns = colunas_base + colunas_extras
-        
-        # Filtra apenas os registros da unidade do usuário logado
         unidade_usuario = st.session_state.user_info['unidade']
-        df_inscritos_filtrado = df_inscritos[df_inscritos['Unidade'] == unidade_usuario]
+        df_inscritos_filtrado = carregar_inscritos_unidade(unidade_usuario, obter_versao_aba('INSCRITOS-UNIDADE'))
         
         if df_inscritos_filtrado.empty:
             st.info(f"Nenhum aluno inscrito encontrado para a unidade {unidade_usuario}.")
@@ -48,11 +31,22 @@ def pagina_lista_inscritos():
         df_display = df_inscritos_filtrado[colunas_para_exibir].copy()
         df_display['Excluir'] = False
         
+        # Editor e exclusão rodam em um fragmento: marcar/desmarcar registros
+        # reexecuta só esta área, sem recarregar e refiltrar a lista
+        fragmento_exclusao_inscritos(df_inscritos_filtrado, df_display)
+        
+    except Exception as e:
+        st.error(f"Erro ao carregar lista de inscritos: {e}")
+
+@st.fragment
+def fragmento_exclusao_inscritos(df_inscritos_filtrado, df_display):
+    """Editor de seleção, prévia e confirmação de exclusão (reexecuta de forma independente)"""
+    try:
         # Tabela interativa com opção de exclusão
         st.write("**Selecione os registros para excluir:**")
         
         # Editor de dados para inscrições
-        edited_df = st.data_editor(
+        st.data_editor(
             df_display,
             column_config={
                 "Excluir": st.column_config.CheckboxColumn(
@@ -73,31 +67,19 @@ def pagina_lista_inscritos():
             key="inscritos_editor"
         )
         
-        # Identifica registros selecionados para exclusão
-        registros_para_excluir = []
-        for idx, row in edited_df.iterrows():
-            if row['Excluir']:
-                # Pega o índice original no DataFrame filtrado
-                index_original_filtrado = idx
-                # Encontra o índice correspondente no DataFrame original
-                index_original = df_inscritos_filtrado.index[index_original_filtrado]
-                
-                # Pega todos os dados originais do registro (incluindo colunas ocultas)
-                dados_registro = [
-                    df_inscritos_filtrado.iloc[index_original_filtrado]['Unidade'],
-                    df_inscritos_filtrado.iloc[index_original_filtrado]['Nome Aluno'],
-                    df_inscritos_filtrado.iloc[index_original_filtrado]['RA Aluno'],
-                    df_inscritos_filtrado.iloc[index_original_filtrado]['Turma Aluno'],
-                    df_inscritos_filtrado.iloc[index_original_filtrado]['Genero Modalidade'],
-                    df_inscritos_filtrado.iloc[index_original_filtrado]['Modalidade'],
-                    df_inscritos_filtrado.iloc[index_original_filtrado]['Unidade Modalidade'],
-                    df_inscritos_filtrado.iloc[index_original_filtrado]['Data/Hora'],
-                    df_inscritos_filtrado.iloc[index_original_filtrado]['Usuario']
-                ]
-                registros_para_excluir.append({
-                    'index_original': index_original,
-                    'dados': dados_registro
-                })
+        # Só as linhas alteradas no editor: posição -> colunas editadas (o resto continua False)
+        linhas_editadas = st.session_state.get("inscritos_editor", {}).get("edited_rows", {})
+        posicoes = sorted(int(posicao) for posicao, alteracoes in linhas_editadas.items()
+                          if alteracoes.get('Excluir') and int(posicao) < len(df_inscritos_filtrado))
+        
+        # Registros selecionados em uma única seleção, com todas as colunas originais (inclusive ocultas)
+        # Chaves na ordem da aba (inscrições repetidas recebem a ocorrência como sufixo)
+        linhas_inscritos = df_inscritos_filtrado[COLUNAS_INSCRITOS].values.tolist()
+        chaves = chaves_inscricoes(linhas_inscritos)
+        registros_para_excluir = [
+            {'chave': chaves[posicao], 'dados': linhas_inscritos[posicao]}
+            for posicao in posicoes
+        ]
         
         # Botão para confirmar exclusão
         if registros_para_excluir:
@@ -113,46 +95,33 @@ def pagina_lista_inscritos():
                 with st.spinner("Excluindo registros..."):
                     exclusoes_realizadas = 0
                     erros = 0
+                    vagas_liberadas, vagas_mantidas = [], []
                     
-                    # Ordena pelos índices em ordem decrescente para evitar problemas de reindexação
-                    registros_para_excluir.sort(key=lambda x: x['index_original'], reverse=True)
+                    # As vagas são anotadas antes das exclusões: uma queda no meio não as perde
+                    ids_vagas = anotar_vagas_liberadas([registro['dados'] for registro in registros_para_excluir])
                     
-                    for registro in registros_para_excluir:
-                        if excluir_registro_inscricao(registro['index_original'], registro['dados'], st.session_state.user_info['nome']):
+                    # Cada exclusão localiza a linha atual pela chave, então a ordem não importa
+                    for registro, id_vaga in zip(registros_para_excluir, ids_vagas):
+                        if excluir_registro_inscricao(registro['chave'], registro['dados'], st.session_state.user_info['nome']):
                             exclusoes_realizadas += 1
+                            vagas_liberadas.append(id_vaga)
                         else:
                             erros += 1
+                            vagas_mantidas.append(id_vaga)
+                    
+                    # Vagas liberadas vão para os primeiros da lista de espera (uma gravação para todas)
+                    promovidas = promover_apos_exclusoes(vagas_liberadas, vagas_mantidas)
+                    if promovidas:
+                        st.info(f"⏳ {len(promovidas)} aluno(s) promovido(s) da lista de espera: " +
+                                ", ".join(f"{linha[1]} ({linha[5]})" for linha in promovidas))
                     
                     if erros == 0:
                         st.success(f"✅ {exclusoes_realizadas} registro(s) excluído(s) com sucesso!")
+                        # As posições marcadas no editor não valem para a lista sem os excluídos
+                        st.session_state.pop("inscritos_editor", None)
                         st.rerun()
                     else:
                         st.warning(f"⚠️ {exclusoes_realizadas} exclusão(ões) bem-sucedidas, {erros} com erro.")
-        
-    except Exception as e:
-        st.error(f"Erro ao carregar lista de inscritos: {e}")
-
-def excluir_registro_inscricao(linha_index, dados_registro, usuario_responsavel):
-    """Exclui um registro da aba INSCRITOS-UNIDADE e registra na aba de exclusões"""
-    try:
-        ws_inscritos = get_ws('INSCRITOS-UNIDADE')
-        if not ws_inscritos:
-            st.error("Não foi possível acessar a aba INSCRITOS-UNIDADE")
-            return False
-        
-        # Primeiro registra a exclusão
-        if registrar_exclusao(dados_registro, usuario_responsavel):
-            # Depois exclui a linha da planilha original
-            # A linha_index vem do DataFrame, então adicionamos 2 (cabeçalho + índice 0-based)
-            linha_planilha = linha_index + 2
-            ws_inscritos.delete_rows(linha_planilha)
-            
-            # Limpa o cache para forçar atualização
-            st.cache_data.clear()
-            return True
-        else:
-            return False
-            
+    
     except Exception as e:
-        st.error(f"Erro ao excluir registro: {e}")
-        return False
\ No newline at end of file
+        st.error(f"Erro ao processar exclusões: {e}")
@@ -1,11 +1,7 @@
 # Login.py
 import streamlit as st
 import uuid
-import smtplib
-import bcrypt
 from datetime import datetime, timedelta
-from email.mime.text import MIMEText
-from utils.sheets import *
 
 # ------------------------------------------------------------
 # Configurações de Segurança
@@ -29,6 +25,8 @@ def verificar_autenticacao():
 
 def carregar_usuarios_autorizados_com_senhas():
     """Carrega os usuários autorizados com senhas da aba AUTORIZADOS"""
+    # A planilha (pandas, gspread) só é carregada quando as credenciais são conferidas
+    from utils.sheets import load_full_sheet_as_df
     try:
         df_autorizados = load_full_sheet_as_df('AUTORIZADOS')
         
@@ -83,6 +81,7 @@ def limpar_hash(hash_sujo):
 
 def atualizar_senha_usuario(email, senha_hash):
     """Atualiza a senha do usuário na coluna F da planilha AUTORIZADOS"""
+    from utils.sheets import get_ws
     try:
         ws_autorizados = get_ws('AUTORIZADOS')
         if not ws_autorizados:
@@ -116,6 +115,10 @@ def atualizar_senha_usuario(email, senha_hash):
 
 def enviar_codigo_verificacao(email, token):
     """Envia código de verificação por email"""
+    # smtplib só é necessário no primeiro acesso de um usuário
+    import smtplib
+    from email.mime.text import MIMEText
+    
     try:
         msg = MIMEText(f"""
         Olá!
@@ -141,6 +144,7 @@ def enviar_codigo_verificacao(email, token):
 
 def registrar_login(user_info):
     """Registra o login na aba LOGIN"""
+    from utils.sheets import get_ws
     try:
         ws_login = get_ws('LOGIN')
         if not ws_login:
@@ -219,13 +223,6 @@ def pagina_login():
     st.title("🔐 Sistema de Inscrição - Login Seguro")
     st.markdown("---")
     
-    # Carrega usuários
-    usuarios = carregar_usuarios_autorizados_com_senhas()
-    
-    if not usuarios:
-        st.error("Sistema temporariamente indisponível. Tente novamente mais tarde.")
-        return
-    
     # ETAPA 1: Email
     if st.session_state.etapa_login == "email":
         with st.form("form_email"):
@@ -237,8 +234,13 @@ def pagina_login():
             if submitted:
                 email = email.strip().lower()
                 
+                # Os usuários só são carregados ao conferir o e-mail informado
+                usuarios = carregar_usuarios_autorizados_com_senhas() if email else {}
+                
                 if not email:
                     st.error("Por favor, digite seu e-mail.")
+                elif not usuarios:
+                    st.error("Sistema temporariamente indisponível. Tente novamente mais tarde.")
                 elif email not in usuarios:
                     st.error("E-mail não autorizado para acesso ao sistema.")
                 else:
@@ -285,6 +287,7 @@ def pagina_login():
                         st.error(f"❌ {mensagem}")
                     else:
                         # Cria hash da senha
+                        import bcrypt
                         try:
                             # Garantir encoding consistente
                             senha_bytes = nova_senha.encode('utf-8')
@@ -323,6 +326,7 @@ def pagina_login():
                     st.error("Por favor, digite sua senha.")
                 else:
                     # Limpa o hash da sessão antes de comparar
+                    import bcrypt
                     senha_hash_sessao = limpar_hash(st.session_state.dados_usuario['senha_hash'])
                     
                     try:
@@ -339,10 +343,14 @@ def pagina_login():
                             st.session_state.tentativas_login = 0
                             st.session_state.bloqueado_ate = None
                             
+                            # Os dados de autenticação (inclusive o hash da senha) não ficam na sessão
+                            st.session_state.pop('dados_usuario', None)
+                            st.session_state.pop('token_verificacao', None)
+                            
                             # Registra o login na aba LOGIN
                             registrar_login(st.session_state.user_info)
                             
-                            st.success(f"✅ Bem-vindo(a), {st.session_state.dados_usuario['nome']}!")
+                            st.success(f"✅ Bem-vindo(a), {st.session_state.user_info['nome']}!")
                             st.rerun()
                         else:
                             # Senha incorreta
@@ -2,29 +2,11 @@
 import streamlit as st
 import pandas as pd
 import logging
-import os
 from utils.sheets import *
-
-# Configuração de logging robusta
-try:
-    # Cria o diretório logs se não existir
-    log_dir = 'logs'
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    
-    logging.basicConfig(
-        filename=os.path.join(log_dir, 'app.log'),
-        level=logging.ERROR,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        encoding='utf-8'
-    )
-except Exception as e:
-    # Fallback: logging sem arquivo se houver erro
-    logging.basicConfig(
-        level=logging.ERROR,
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
-    logging.warning(f"Erro ao configurar arquivo de log: {e}. Usando logging sem arquivo.")
+from utils.elegibilidade import (avaliar_elegibilidade, regras_atuais, indices_unidade, mascara_genero,
+                                 modalidades_elegiveis, modalidades_lotadas, validar_inscricoes)
+from utils.lista_espera import cancelar_espera, entrar_na_espera, pedidos_aguardando
+from utils.diario_inscricoes import enfileirar_inscricoes, inscricoes_pendentes, iniciar_envio_em_segundo_plano
 
 # NOVA FUNÇÃO: Callback para atualização imediata do session_state
 def sync_modalidade_selection(aluno_id, numero_modalidade):
@@ -46,55 +28,16 @@ def sync_modalidade_selection(aluno_id, numero_modalidade):
     except Exception as e:
         logging.error(f"Erro no callback sync_modalidade_selection: {e}")
 
-@st.cache_data(ttl=600)
-def carregar_modalidades_completas():
-    """Carrega todas as informações da aba MODALIDADES com tratamento robusto"""
-    try:
-        df_modalidades = load_full_sheet_as_df('MODALIDADES')
-        
-        if df_modalidades.empty:
-            st.warning("Nenhuma modalidade encontrada na aba MODALIDADES")
-            return pd.DataFrame()
-        
-        # Verifica e padroniza os nomes das colunas
-        if len(df_modalidades.columns) >= 4:
-            # Usa apenas as primeiras 4 colunas essenciais
-            df_modalidades = df_modalidades.iloc[:, :7]  # Pega até 7 colunas se existirem
-            if len(df_modalidades.columns) >= 7:
-                df_modalidades.columns = ['Genero', 'Modalidade', 'Unidade', 'Tem_Vaga', 'Limite_Vagas', 'Inscritos', 'Vagas_Restantes']
-            else:
-                # Preenche colunas faltantes
-                colunas_base = ['Genero', 'Modalidade', 'Unidade', 'Tem_Vaga']
-                colunas_extras = ['Limite_Vagas', 'Inscritos', 'Vagas_Restantes'][:len(df_modalidades.columns)-4]
-                df_modalidades.columns = colunas_base + colunas_extras
-        
-        # Limpeza e tratamento dos dados
-        for col in ['Genero', 'Modalidade', 'Unidade', 'Tem_Vaga']:
-            if col in df_modalidades.columns:
-                df_modalidades[col] = df_modalidades[col].astype(str).str.strip()
-        
-        # CORREÇÃO ADICIONAL: Converter colunas numéricas para o tipo correto
-        colunas_numericas = ['Limite_Vagas', 'Inscritos', 'Vagas_Restantes']
-        for col in colunas_numericas:
-            if col in df_modalidades.columns:
-                # Converte para numérico, forçando erros para NaN (coerce)
-                df_modalidades[col] = pd.to_numeric(df_modalidades[col], errors='coerce')
-                # Preenche NaN com 0
-                df_modalidades[col] = df_modalidades[col].fillna(0)
-        
-        # Remove linhas completamente vazias
-        df_modalidades = df_modalidades.dropna(how='all')
-        
-        return df_modalidades
-        
-    except Exception as e:
-        logging.exception("Erro ao carregar modalidades completas")
-        st.error("Falha ao carregar modalidades. Tente novamente.")
-        return pd.DataFrame()
+def sair_da_espera(ra_aluno, aluno_id):
+    """Callback: retira o aluno da lista de espera das modalidades escolhidas (antes da reexecução)"""
+    chave = f"sair_espera_{aluno_id}"
+    for modalidade in st.session_state.get(chave, []):
+        cancelar_espera(ra_aluno, modalidade)
+    st.session_state[chave] = []
 
 @st.cache_data(ttl=600)
-def carregar_alunos_permitidos():
-    """Carrega os dados dos alunos que têm permissão da aba INSCRITOS-ECOMMERCE"""
+def carregar_alunos_permitidos(versao):
+    """Carrega os dados dos alunos que têm permissão da aba INSCRITOS-ECOMMERCE (cache por versão da aba)"""
     try:
         df_alunos = load_full_sheet_as_df('INSCRITOS-ECOMMERCE')
         
@@ -127,45 +70,17 @@ def carregar_alunos_permitidos():
         return pd.DataFrame()
 
 def carregar_modalidades(unidade_usuario, genero_filtro=None, apenas_com_vaga=True):
-    """CARREGAMENTO UNIFICADO - Carrega modalidades com filtros flexíveis"""
+    """CARREGAMENTO UNIFICADO - Modalidades da unidade filtradas pelas regras compiladas (máscaras)"""
     try:
-        df_modalidades = carregar_modalidades_completas()
+        regras = regras_atuais()
+        indices = indices_unidade(regras, unidade_usuario)
         
-        if df_modalidades.empty:
-            return []
-        
-        # Filtra por unidade
-        modalidades_filtradas = df_modalidades[df_modalidades['Unidade'] == unidade_usuario]
-        
-        # Filtra por vagas se solicitado
+        # Filtro por gênero ('M / F' sempre entra) e, se solicitado, por vagas
+        mascara = mascara_genero(regras, indices, genero_filtro)
         if apenas_com_vaga:
-            modalidades_filtradas = modalidades_filtradas[
-                (modalidades_filtradas['Tem_Vaga'] != 'NÃO') & 
-                (modalidades_filtradas['Vagas_Restantes'] > 0)
-            ]
-        
-        # Filtro adicional por gênero se especificado
-        if genero_filtro and genero_filtro != "Todos":
-            modalidades_filtradas = modalidades_filtradas[
-                (modalidades_filtradas['Genero'] == genero_filtro) | 
-                (modalidades_filtradas['Genero'] == 'M / F')
-            ]
-        
-        # Cria lista formatada
-        opcoes_modalidades = []
-        for _, row in modalidades_filtradas.iterrows():
-            opcoes_modalidades.append({
-                'texto': row['Modalidade'],
-                'modalidade': row['Modalidade'],
-                'genero': row['Genero'],
-                'unidade': row['Unidade'],
-                'limite_vagas': row['Limite_Vagas'],
-                'inscritos': row['Inscritos'],
-                'vagas_restantes': row['Vagas_Restantes'],
-                'tem_vaga': row['Tem_Vaga']
-            })
+            mascara &= regras['vagas'][indices] > 0
         
-        return opcoes_modalidades
+        return [regras['opcoes'][j] for j in indices[mascara]]
         
     except Exception as e:
         logging.exception(f"Erro ao carregar modalidades para unidade {unidade_usuario}")
@@ -192,28 +107,11 @@ def calcular_vagas_utilizadas(selecoes_alunos, modalidades_filtradas):
     
     return vagas_utilizadas
 
-def atualizar_opcoes_select(modalidades_filtradas, vagas_utilizadas, selecoes_aluno_atual=None):
-    """Atualiza as opções do selectbox considerando as vagas utilizadas E mantendo seleções atuais"""
-    opcoes_select = ["Nenhuma"]
-    
-    # Adiciona apenas modalidades com vagas disponíveis
-    for modalidade in modalidades_filtradas:
-        vagas_restantes_base = modalidade['vagas_restantes']
-        if isinstance(vagas_restantes_base, str):
-            try:
-                vagas_restantes_base = float(vagas_restantes_base)
-            except ValueError:
-                vagas_restantes_base = 0
-        
-        # Calcula vagas disponíveis considerando as seleções atuais
-        vagas_selecionadas = vagas_utilizadas.get(modalidade['modalidade'], 0)
-        vagas_disponiveis_agora = vagas_restantes_base - vagas_selecionadas
-        
-        # Só inclui modalidade se tiver vagas disponíveis
-        if vagas_disponiveis_agora > 0:
-            opcoes_select.append(modalidade['modalidade'])
+def atualizar_opcoes_select(modalidades_elegiveis_aluno, modalidades_filtradas, selecoes_aluno_atual=None):
+    """Opções do selectbox: modalidades elegíveis para o aluno, mantendo as seleções atuais"""
+    opcoes_select = ["Nenhuma"] + list(modalidades_elegiveis_aluno)
     
-    # NOVA LÓGICA: Adiciona as seleções atuais do aluno mesmo que não estejam mais disponíveis
+    # Adiciona as seleções atuais do aluno mesmo que não estejam mais disponíveis
     if selecoes_aluno_atual:
         selecoes_atuais = [
             selecoes_aluno_atual['modalidade1'],
@@ -246,8 +144,8 @@ def verificar_duplicatas_modalidades(selecoes_aluno):
     return True, modalidades_validas
 
 @st.cache_data(ttl=600)
-def carregar_inscricoes_existentes_detalhadas():
-    """Carrega as inscrições já existentes com detalhes das modalidades por aluno"""
+def carregar_inscricoes_existentes_detalhadas(versao):
+    """Carrega as inscrições já existentes com detalhes das modalidades por aluno (cache por versão da aba)"""
     try:
         df_inscritos = load_full_sheet_as_df('INSCRITOS-UNIDADE')
         if df_inscritos.empty:
@@ -287,21 +185,43 @@ def filtrar_alunos_por_pesquisa(df_alunos, termo_pesquisa):
 
 def criar_lista_suspensa_alunos(df_alunos_filtrados):
     """Cria lista suspensa formatada para seleção de alunos"""
-    opcoes_alunos = []
-    
-    for idx, aluno in df_alunos_filtrados.iterrows():
-        ra_aluno = str(aluno['RA']).strip()
-        nome_aluno = str(aluno['Nome do Aluno']).strip()
-        
-        opcoes_alunos.append({
+    ras = df_alunos_filtrados['RA'].astype(str).str.strip()
+    nomes = df_alunos_filtrados['Nome do Aluno'].astype(str).str.strip()
+    return [
+        {
             'id': f"{ra_aluno}_{idx}",
             'texto': f"{nome_aluno} (RA: {ra_aluno})",
             'ra': ra_aluno,
             'nome': nome_aluno,
             'index': idx
-        })
-    
-    return opcoes_alunos
+        }
+        for idx, ra_aluno, nome_aluno in zip(df_alunos_filtrados.index, ras, nomes)
+    ]
+
+@st.cache_resource(max_entries=4, ttl=600, show_spinner=False)
+def montar_turmas_alunos(versao):
+    """
+    Alunos permitidos particionados por unidade e turma, montados uma vez por
+    versão da aba INSCRITOS-ECOMMERCE (e refeitos a cada 10 minutos, como a
+    leitura dos alunos: a aplicação não escreve nessa aba, então sem o vigia a
+    versão não muda). Para cada unidade: 'turmas' (ordenadas) e,
+    por turma, os alunos ('alunos', índice 0..n-1), as opções da lista suspensa
+    ('opcoes') e os RAs ('ras'). Compartilhado entre sessões; não deve ser alterado.
+    """
+    df_alunos = carregar_alunos_permitidos(versao)
+    turmas_por_unidade = {}
+    if df_alunos.empty:
+        return turmas_por_unidade
+    for (unidade, turma), df_turma in df_alunos.groupby(['Unidade', 'Turma do Aluno'], sort=True):
+        df_turma = df_turma.reset_index(drop=True)
+        dados_unidade = turmas_por_unidade.setdefault(unidade, {'turmas': [], 'por_turma': {}})
+        dados_unidade['turmas'].append(turma)
+        dados_unidade['por_turma'][turma] = {
+            'alunos': df_turma,
+            'opcoes': criar_lista_suspensa_alunos(df_turma),
+            'ras': frozenset(df_turma['RA'].astype(str).str.strip()),
+        }
+    return turmas_por_unidade
 
 def inicializar_session_state():
     """Inicializa o estado da sessão de forma organizada"""
@@ -314,6 +234,22 @@ def inicializar_session_state():
             'ultimo_genero_filtro': None
         }
 
+# Prefixos das chaves de widget criadas por aluno (f"{prefixo}{aluno_id}")
+PREFIXOS_WIDGETS_ALUNO = ('genero_', 'modal1_', 'modal2_', 'modal3_', 'espera_', 'botao_espera_')
+
+def limpar_selecoes_cadastro():
+    """
+    Descarta as seleções por aluno e as chaves de widget associadas, para que o
+    estado da sessão não cresça com cada aluno e turma visitados.
+    """
+    cadastro = st.session_state.cadastro
+    for aluno_id in set(cadastro['selecoes_alunos']) | set(cadastro['filtro_genero_alunos']):
+        for prefixo in PREFIXOS_WIDGETS_ALUNO:
+            st.session_state.pop(f"{prefixo}{aluno_id}", None)
+    cadastro['selecoes_alunos'] = {}
+    cadastro['filtro_genero_alunos'] = {}
+    cadastro['aluno_selecionado'] = None
+
 def pagina_principal():
     """Página principal de cadastro de inscrições - VERSÃO OTIMIZADA"""
     
@@ -327,9 +263,9 @@ def pagina_principal():
         st.error("Falha crítica ao conectar com o Google Sheets. A aplicação não pode continuar.")
         return
     
-    # Carrega dados com cache
-    df_alunos = carregar_alunos_permitidos()
-    if df_alunos.empty:
+    # Carrega as turmas já particionadas por unidade (cache por versão da aba)
+    turmas_por_unidade = montar_turmas_alunos(obter_versao_aba('INSCRITOS-ECOMMERCE'))
+    if not turmas_por_unidade:
         st.error("Não foi possível carregar a lista de alunos permitidos.")
         return
     
@@ -342,10 +278,10 @@ def pagina_principal():
     
     with col_filtro1:
         st.write(f"**Unidade:** {unidade_usuario}")
-        df_alunos_filtro_unidade = df_alunos[df_alunos['Unidade'] == unidade_usuario]
+        turmas_unidade = turmas_por_unidade.get(unidade_usuario, {'turmas': [], 'por_turma': {}})
         
     with col_filtro2:
-        turmas_disponiveis = sorted(df_alunos_filtro_unidade['Turma do Aluno'].unique())
+        turmas_disponiveis = turmas_unidade['turmas']
         if turmas_disponiveis:
             turma_selecionada = st.selectbox(
                 "Selecione a Turma:",
@@ -366,11 +302,14 @@ def pagina_principal():
             help="Filtre as modalidades da tabela abaixo por gênero"
         )
     
-    # Filtra alunos
-    df_alunos_filtrados = df_alunos[
-        (df_alunos['Unidade'] == unidade_usuario) & 
-        (df_alunos['Turma do Aluno'] == turma_selecionada)
-    ].reset_index(drop=True)
+    # Ao trocar de turma, as seleções da turma anterior deixam de ser usadas
+    if st.session_state.cadastro['ultima_turma'] != turma_selecionada:
+        limpar_selecoes_cadastro()
+        st.session_state.cadastro['ultima_turma'] = turma_selecionada
+    
+    # Alunos da turma (consulta ao dicionário de turmas)
+    turma_alunos = turmas_unidade['por_turma'][turma_selecionada]
+    df_alunos_filtrados = turma_alunos['alunos']
     
     # Carrega modalidades usando função unificada
     opcoes_modalidades_tabela = carregar_modalidades(unidade_usuario, genero_filtro, apenas_com_vaga=True)
@@ -381,7 +320,34 @@ def pagina_principal():
         return
     
     # Carrega inscrições existentes
-    inscricoes_existentes_detalhadas = carregar_inscricoes_existentes_detalhadas()
+    inscricoes_existentes_detalhadas = carregar_inscricoes_existentes_detalhadas(obter_versao_aba('INSCRITOS-UNIDADE'))
+    
+    # Inscrições gravadas no diário que ainda não chegaram à planilha também contam
+    # (a primeira chamada no processo inicia o envio e reenvia o que ficou pendente)
+    iniciar_envio_em_segundo_plano()
+    for ra_aluno, modalidades in inscricoes_pendentes().items():
+        registradas = inscricoes_existentes_detalhadas.setdefault(ra_aluno, [])
+        registradas.extend(m for m in modalidades if m not in registradas)
+    
+    # A partir daqui a página roda em fragmentos: trocar aluno ou modalidade
+    # reexecuta só a área de seleção, sem refazer filtros e leituras de cache
+    fragmento_selecao_modalidades(
+        unidade_usuario,
+        turma_selecionada,
+        genero_filtro,
+        df_alunos_filtrados,
+        turma_alunos['opcoes'],
+        turma_alunos['ras'],
+        opcoes_modalidades_tabela,
+        opcoes_modalidades_alunos,
+        inscricoes_existentes_detalhadas
+    )
+
+@st.fragment
+def fragmento_selecao_modalidades(unidade_usuario, turma_selecionada, genero_filtro, df_alunos_filtrados,
+                                  opcoes_alunos, ras_turma, opcoes_modalidades_tabela, opcoes_modalidades_alunos,
+                                  inscricoes_existentes_detalhadas):
+    """Tabela de vagas, seleção do aluno e das modalidades (reexecuta de forma independente)"""
     
     # Calcula vagas utilizadas - AGORA ATUALIZADO EM TEMPO REAL
     vagas_utilizadas = calcular_vagas_utilizadas(
@@ -389,6 +355,17 @@ def pagina_principal():
         opcoes_modalidades_alunos
     )
     
+    # Regras de elegibilidade avaliadas para a turma inteira de uma vez (alunos × modalidades)
+    regras = regras_atuais()
+    elegibilidade = avaliar_elegibilidade(
+        regras,
+        unidade_usuario,
+        df_alunos_filtrados['RA'],
+        df_alunos_filtrados['Turma do Aluno'],
+        inscricoes_existentes_detalhadas,
+        vagas_utilizadas
+    )
+    
     # Tabela de modalidades - AGORA ATUALIZA EM TEMPO REAL
     st.subheader("MODALIDADES DISPONÍVEIS")
     st.write(f"**Unidade:** {unidade_usuario}")
@@ -437,23 +414,13 @@ def pagina_principal():
     col_selecao1, col_selecao2 = st.columns([3, 1])
     
     with col_selecao1:
-        # Filtra alunos (sem pesquisa por texto)
-        df_alunos_pesquisados = df_alunos_filtrados
-        
-        if df_alunos_pesquisados.empty:
+        if df_alunos_filtrados.empty:
             st.warning("Nenhum aluno encontrado com os filtros aplicados.")
             return
         
-        # Cria lista suspensa de alunos
-        opcoes_alunos = criar_lista_suspensa_alunos(df_alunos_pesquisados)
-        
-        # Remove alunos que já têm 3 modalidades registradas
-        opcoes_alunos_filtradas = []
-        for aluno_opcao in opcoes_alunos:
-            ra_aluno = aluno_opcao['ra']
-            modalidades_registradas = inscricoes_existentes_detalhadas.get(ra_aluno, [])
-            if len(modalidades_registradas) < 3:
-                opcoes_alunos_filtradas.append(aluno_opcao)
+        # Remove alunos que já atingiram o limite de modalidades registradas
+        pode_inscrever = elegibilidade['inscricoes_aluno'] < LIMITE_MODALIDADES_POR_ALUNO
+        opcoes_alunos_filtradas = [aluno_opcao for aluno_opcao in opcoes_alunos if pode_inscrever[aluno_opcao['index']]]
         
         if not opcoes_alunos_filtradas:
             st.success("Todos os alunos desta turma já estão inscritos em 3 modalidades!")
@@ -478,10 +445,11 @@ def pagina_principal():
         st.write("")  # Espaçamento
         st.write("")  # Espaçamento
         if st.button("🔄 Limpar", use_container_width=True, help="Limpar seleção atual"):
-            # CORREÇÃO: Incrementa a chave para resetar o selectbox
+            # CORREÇÃO: Incrementa a chave para resetar o selectbox (e descarta a chave anterior)
+            st.session_state.pop(f"selectbox_aluno_{st.session_state.selectbox_aluno_key}", None)
             st.session_state.selectbox_aluno_key += 1
             st.session_state.cadastro['aluno_selecionado'] = None
-            st.rerun()
+            st.rerun(scope="fragment")
 #----------------------------------------------------------------------------------------------------------------
     
     # Encontra o aluno selecionado
@@ -557,7 +525,9 @@ def pagina_principal():
             
             # ATUALIZAÇÃO: Agora considera as vagas utilizadas em tempo real E mantém seleções atuais
             selecoes = st.session_state.cadastro['selecoes_alunos'][aluno_id]
-            opcoes_select = atualizar_opcoes_select(modalidades_aluno_filtradas, vagas_utilizadas, selecoes)
+            elegiveis_aluno = modalidades_elegiveis(regras, elegibilidade, aluno_selecionado_data['index'],
+                                                    genero_selecionado)
+            opcoes_select = atualizar_opcoes_select(elegiveis_aluno, modalidades_aluno_filtradas, selecoes)
             
             # Desabilita modalidades já registradas
             modalidade1_registrada = selecoes['modalidade1_registrada']
@@ -614,8 +584,64 @@ def pagina_principal():
             if any([modalidade1_registrada, modalidade2_registrada, modalidade3_registrada]):
                 st.warning("Modalidades em cinza já estão registradas e não podem ser alteradas.")
             
+            # Modalidades lotadas: o aluno pode aguardar uma vaga (promovido quando alguém for excluído)
+            aguardando = pedidos_aguardando(ra_aluno)
+            if aguardando:
+                st.info(f"⏳ Na lista de espera de: {', '.join(aguardando)}")
+                with st.expander("⏳ Sair da lista de espera"):
+                    modalidades_saida = st.multiselect(
+                        "Modalidades em espera:",
+                        options=aguardando,
+                        key=f"sair_espera_{aluno_id}"
+                    )
+                    st.button("Sair da lista de espera", key=f"botao_sair_espera_{aluno_id}",
+                              disabled=not modalidades_saida, on_click=sair_da_espera, args=(ra_aluno, aluno_id))
+            lotadas = [
+                m for m in modalidades_lotadas(regras, elegibilidade, aluno_selecionado_data['index'], genero_selecionado)
+                if m['modalidade'] not in aguardando
+            ]
+            if lotadas and modalidades_existentes < LIMITE_MODALIDADES_POR_ALUNO:
+                with st.expander("⏳ Lista de espera das modalidades lotadas"):
+                    modalidades_espera = st.multiselect(
+                        "Modalidades lotadas:",
+                        options=[m['modalidade'] for m in lotadas],
+                        key=f"espera_{aluno_id}"
+                    )
+                    if st.button("Entrar na lista de espera", key=f"botao_espera_{aluno_id}",
+                                 disabled=not modalidades_espera):
+                        pedidos = [
+                            [
+                                unidade_usuario,
+                                nome_aluno,
+                                ra_aluno,
+                                turma_selecionada,
+                                m['genero'],
+                                m['modalidade'],
+                                unidade_usuario,
+                                "",  # Data/Hora é preenchida na promoção
+                                st.session_state.user_info['nome']
+                            ]
+                            for m in lotadas if m['modalidade'] in modalidades_espera
+                        ]
+                        adicionados = entrar_na_espera(pedidos)
+                        st.success(f"✅ {nome_aluno} entrou na lista de espera de {adicionados} modalidade(s).")
+            
             st.markdown("---")
     
+    fragmento_previa_inscricoes(
+        unidade_usuario,
+        turma_selecionada,
+        genero_filtro,
+        ras_turma,
+        opcoes_modalidades_alunos,
+        inscricoes_existentes_detalhadas
+    )
+
+@st.fragment
+def fragmento_previa_inscricoes(unidade_usuario, turma_selecionada, genero_filtro, ras_turma,
+                                opcoes_modalidades_alunos, inscricoes_existentes_detalhadas):
+    """Prévia e registro das inscrições (o botão de registro reexecuta só este trecho)"""
+    
     # Preview e registro
     st.subheader("Prévia das inscrições")
     
@@ -624,12 +650,7 @@ def pagina_principal():
     
     for aluno_id, selecoes in st.session_state.cadastro['selecoes_alunos'].items():
         ra_aluno = selecoes['ra']
-        aluno_na_lista = any(
-            str(aluno['RA']).strip() == str(ra_aluno).strip()
-            for _, aluno in df_alunos_filtrados.iterrows()
-        )
-        
-        if not aluno_na_lista:
+        if str(ra_aluno).strip() not in ras_turma:
             continue
             
         modalidades_aluno = [selecoes['modalidade1'], selecoes['modalidade2'], selecoes['modalidade3']]
@@ -666,11 +687,8 @@ def pagina_principal():
         # Botão de registro
         if st.button("REGISTRAR INSCRIÇÕES", type="primary"):
             try:
-                inscricoes_realizadas = 0
-                erros = 0
-                
-                for inscricao in inscricoes_para_salvar:
-                    dados_inscricao = [
+                linhas_inscricao = [
+                    [
                         unidade_usuario,
                         inscricao['Nome Aluno'],
                         inscricao['RA Aluno'],
@@ -681,25 +699,29 @@ def pagina_principal():
                         pd.Timestamp.now().strftime("%d/%m/%Y %H:%M:%S"),
                         st.session_state.user_info['nome']
                     ]
-                    
-                    if append_row_and_clear_cache('INSCRITOS-UNIDADE', dados_inscricao):
-                        inscricoes_realizadas += 1
-                    else:
-                        erros += 1
+                    for inscricao in inscricoes_para_salvar
+                ]
+                
+                # Confere as regras da modalidade (vagas contando o próprio lote) antes de gravar
+                motivos = validar_inscricoes(regras_atuais(), linhas_inscricao)
+                recusadas_regras = [(linha, f"{linha[1]} em {linha[5]}: {motivo}")
+                                    for linha, motivo in zip(linhas_inscricao, motivos) if motivo]
+                linhas_validas = [linha for linha, motivo in zip(linhas_inscricao, motivos) if not motivo]
+                
+                # Grava no diário local; o envio à planilha acontece em segundo plano
+                inscricoes_realizadas, recusadas = enfileirar_inscricoes(linhas_validas) if linhas_validas else (0, [])
+                recusadas = recusadas_regras + recusadas
                 
-                if erros == 0:
+                if not recusadas:
                     st.success(f"✅ {inscricoes_realizadas} inscrição(ões) registrada(s) com sucesso!")
                     # Limpa apenas os dados de cadastro, mantendo outros estados
-                    st.session_state.cadastro = {
-                        'selecoes_alunos': {},
-                        'filtro_genero_alunos': {},
-                        'aluno_selecionado': None,
-                        'ultima_turma': turma_selecionada,
-                        'ultimo_genero_filtro': genero_filtro
-                    }
+                    limpar_selecoes_cadastro()
+                    st.session_state.cadastro['ultimo_genero_filtro'] = genero_filtro
                     st.rerun()
                 else:
-                    st.warning(f"⚠️ {inscricoes_realizadas} inscrição(ões) bem-sucedidas, {erros} com erro.")
+                    st.warning(f"⚠️ {inscricoes_realizadas} inscrição(ões) bem-sucedidas, {len(recusadas)} recusada(s):")
+                    for _, motivo in recusadas:
+                        st.write(f"- {motivo}")
             except Exception as e:
                 logging.exception("Erro ao registrar inscrições")
                 st.error("Falha ao registrar inscrições. Tente novamente.")
@@ -4,6 +4,32 @@ import pandas as pd
 from datetime import datetime, timedelta
 from utils.sheets import *
 from utils.Login import verificar_autenticacao
+from utils.inscritos import (carregar_inscritos_padronizados, contar_inscricoes_por_temporada, filtrar_inscritos,
+                             opcoes_filtros_inscritos, paginar, total_paginas)
+from utils.carregador_paginas import relatorio_importacoes
+from utils.metricas import exportar_prometheus, resumo_cache_leituras, resumo_chamadas_api, zerar_metricas
+from utils.perfilador import (definir_perfil_ativo, exportar_flamegraph, listar_perfis, perfil_ativo,
+                               pontos_quentes, resumo_por_categoria)
+from utils.memoria_sessoes import relatorio_sessao, relatorio_sessoes
+from utils.diario_inscricoes import acordar_envio, situacao_diario
+from utils.lista_espera import situacao_espera
+from utils.modalidades import gravar_contagens_modalidades
+from utils.agregados import obter_metricas, obter_resumo_inscricoes, pivotar_resumo
+from utils.exportacao import (FORMATOS_EXPORTACAO, formatos_disponiveis,
+                              gerar_arquivo_exportacao, nome_arquivo_exportacao)
+from utils.tabela_jogos import (AGRUPAMENTOS_EQUIPE, FORMATOS_DISPUTA, HORARIOS_PADRAO,
+                                gerar_arquivo_tabela_jogos, gerar_tabela_jogos)
+
+# Opções de linhas por página na tabela de registros
+TAMANHOS_PAGINA = [25, 50, 100, 250, 500]
+TAMANHO_PAGINA_PADRAO = 50
+
+# Métricas disponíveis no painel de preenchimento (rótulo -> coluna do resumo)
+METRICAS_PAINEL = {
+    "Taxa de preenchimento": 'Taxa_Preenchimento',
+    "Inscrições": 'Inscricoes',
+    "Alunos únicos": 'Alunos_Unicos',
+}
 
 def obter_senha_admin():
     """Obtém a senha de administrador da célula G2 da aba AUTORIZADOS"""
@@ -113,31 +139,25 @@ def pagina_registro_todas_unidades():
     
     # Carrega dados dos inscritos
     try:
-        df_inscritos = load_full_sheet_as_df('INSCRITOS-UNIDADE')
+        # A versão da aba entra na chave dos caches: enquanto ninguém escrever
+        # na planilha, filtros e páginas são servidos da memória
+        versao_inscritos = obter_versao_aba('INSCRITOS-UNIDADE')
+        df_inscritos = filtrar_inscritos("Todas", "Todas", "Todos", versao_inscritos)
         
         if df_inscritos.empty:
             st.info("Nenhum aluno inscrito encontrado.")
             return
         
-        # Verifica e padroniza os nomes das colunas
-        if len(df_inscritos.columns) >= 9:
-            df_inscritos = df_inscritos.iloc[:, :9]
-            df_inscritos.columns = ['Unidade', 'Nome Aluno', 'RA Aluno', 'Turma Aluno', 'Genero Modalidade', 'Modalidade', 'Unidade Modalidade', 'Data/Hora', 'Usuario']
-        else:
-            # Preenche colunas faltantes
-            colunas_base = ['Unidade', 'Nome Aluno', 'RA Aluno', 'Turma Aluno', 'Genero Modalidade', 'Modalidade']
-            colunas_extras = ['Unidade Modalidade', 'Data/Hora', 'Usuario'][:len(df_inscritos.columns)-6]
-            df_inscritos.columns = colunas_base + colunas_extras
-        
         st.subheader("Todos os alunos inscritos")
         st.write(f"**Total de inscrições:** {len(df_inscritos)}")
         
+        unidades, modalidades, generos = opcoes_filtros_inscritos(versao_inscritos)
+        
         # Filtros
         col1, col2, col3 = st.columns(3)
         
         with col1:
             # Filtro por unidade
-            unidades = sorted(df_inscritos['Unidade'].dropna().unique())
             unidade_selecionada = st.selectbox(
                 "Filtrar por Unidade:",
                 options=["Todas"] + unidades,
@@ -146,7 +166,6 @@ def pagina_registro_todas_unidades():
         
         with col2:
             # Filtro por modalidade
-            modalidades = sorted(df_inscritos['Modalidade'].dropna().unique())
             modalidade_selecionada = st.selectbox(
                 "Filtrar por Modalidade:",
                 options=["Todas"] + modalidades,
@@ -155,35 +174,53 @@ def pagina_registro_todas_unidades():
         
         with col3:
             # Filtro por gênero
-            generos = sorted(df_inscritos['Genero Modalidade'].dropna().unique())
             genero_selecionado = st.selectbox(
                 "Filtrar por Gênero:",
                 options=["Todos"] + generos,
                 index=0
             )
         
-        # Aplica filtros
-        df_filtrado = df_inscritos.copy()
-        
-        if unidade_selecionada != "Todas":
-            df_filtrado = df_filtrado[df_filtrado['Unidade'] == unidade_selecionada]
-        
-        if modalidade_selecionada != "Todas":
-            df_filtrado = df_filtrado[df_filtrado['Modalidade'] == modalidade_selecionada]
+        # Aplica filtros (visão memorizada por filtros + versão dos dados)
+        df_filtrado = filtrar_inscritos(unidade_selecionada, modalidade_selecionada,
+                                        genero_selecionado, versao_inscritos)
         
-        if genero_selecionado != "Todos":
-            df_filtrado = df_filtrado[df_filtrado['Genero Modalidade'] == genero_selecionado]
-        
-        # Estatísticas
+        # Estatísticas (lidas dos agregados materializados, sem percorrer as inscrições)
+        metricas = obter_metricas(unidade_selecionada, modalidade_selecionada, genero_selecionado)
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Total Filtrado", len(df_filtrado))
+            st.metric("Total Filtrado", metricas['total'])
         with col2:
-            st.metric("Unidades", df_filtrado['Unidade'].nunique())
+            st.metric("Unidades", metricas['unidades'])
         with col3:
-            st.metric("Modalidades", df_filtrado['Modalidade'].nunique())
+            st.metric("Modalidades", metricas['modalidades'])
         with col4:
-            st.metric("Alunos Únicos", df_filtrado['Nome Aluno'].nunique())
+            st.metric("Alunos Únicos", metricas['alunos_unicos'])
+        
+        # Painel de preenchimento por unidade × modalidade × gênero
+        st.subheader("📊 Painel de preenchimento")
+        
+        resumo = obter_resumo_inscricoes()
+        if unidade_selecionada != "Todas":
+            resumo = resumo[resumo['Unidade'] == unidade_selecionada]
+        if modalidade_selecionada != "Todas":
+            resumo = resumo[resumo['Modalidade'] == modalidade_selecionada]
+        if genero_selecionado != "Todos":
+            resumo = resumo[resumo['Genero'] == genero_selecionado]
+        
+        metrica_painel = st.radio(
+            "Métrica do painel:",
+            options=list(METRICAS_PAINEL),
+            index=0,
+            horizontal=True
+        )
+        
+        tabela_pivot = pivotar_resumo(resumo, METRICAS_PAINEL[metrica_painel])
+        if tabela_pivot.empty:
+            st.info("Nenhuma inscrição para os filtros selecionados.")
+        elif METRICAS_PAINEL[metrica_painel] == 'Taxa_Preenchimento':
+            st.dataframe(tabela_pivot.style.format("{:.0%}"), use_container_width=True)
+        else:
+            st.dataframe(tabela_pivot, use_container_width=True)
         
         # Tabela com todos os registros
         st.subheader("📋 Lista completa de inscrições")
@@ -192,22 +229,255 @@ def pagina_registro_todas_unidades():
         colunas_exibicao = ['Unidade', 'Nome Aluno', 'RA Aluno', 'Turma Aluno', 'Genero Modalidade', 'Modalidade', 'Data/Hora']
         colunas_disponiveis = [col for col in colunas_exibicao if col in df_filtrado.columns]
         
+        # Paginação no servidor: apenas as linhas da página atual vão para o navegador
+        filtros_atuais = (unidade_selecionada, modalidade_selecionada, genero_selecionado)
+        # O estado do number_input some quando o usuário sai da página; volta à página 1
+        st.session_state.setdefault('pagina_registro', 1)
+        if st.session_state.get('filtros_registro') != filtros_atuais:
+            st.session_state.filtros_registro = filtros_atuais
+            st.session_state.pagina_registro = 1
+        
+        col_tamanho, col_pagina, col_info = st.columns([1, 1, 2])
+        
+        with col_tamanho:
+            tamanho_pagina = st.selectbox(
+                "Linhas por página:",
+                options=TAMANHOS_PAGINA,
+                index=TAMANHOS_PAGINA.index(TAMANHO_PAGINA_PADRAO)
+            )
+        
+        paginas = total_paginas(len(df_filtrado), tamanho_pagina)
+        if st.session_state.pagina_registro > paginas:
+            st.session_state.pagina_registro = paginas
+        
+        with col_pagina:
+            pagina_atual = st.number_input(
+                "Página:",
+                min_value=1,
+                max_value=paginas,
+                step=1,
+                key="pagina_registro"
+            )
+        
+        with col_info:
+            st.write("")  # Espaçamento
+            st.write("")  # Espaçamento
+            st.write(f"Página {pagina_atual} de {paginas}")
+        
         # Exibe a tabela
         st.dataframe(
-            df_filtrado[colunas_disponiveis],
+            paginar(df_filtrado[colunas_disponiveis], pagina_atual, tamanho_pagina),
             use_container_width=True,
             hide_index=True
         )
         
-        # Botão para exportar dados
-        if st.button("📥 Exportar para CSV"):
-            csv = df_filtrado.to_csv(index=False, encoding='utf-8-sig')
+        # Exportação em um clique: o arquivo vem do cache por (formato, filtros,
+        # versão dos dados), então as reexecuções da página não o refazem
+        col_formato, col_download = st.columns([1, 3])
+        
+        with col_formato:
+            formato_exportacao = st.selectbox(
+                "Formato de exportação:",
+                options=formatos_disponiveis(),
+                index=0
+            )
+        
+        with col_download:
+            st.write("")  # Espaçamento
+            st.write("")  # Espaçamento
             st.download_button(
-                label="💾 Baixar CSV",
-                data=csv,
-                file_name=f"registros_todas_unidades_{pd.Timestamp.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv"
+                label=f"📥 Exportar para {formato_exportacao}",
+                data=gerar_arquivo_exportacao(formato_exportacao, unidade_selecionada, modalidade_selecionada,
+                                              genero_selecionado, versao_inscritos),
+                file_name=nome_arquivo_exportacao(formato_exportacao),
+                mime=FORMATOS_EXPORTACAO[formato_exportacao]['mime'],
+                on_click="ignore"
+            )
+        
+        # Estatísticas de uso da API do Google (apenas no modo administrativo)
+        with st.expander("📈 Chamadas à API do Google Sheets"):
+            df_chamadas = resumo_chamadas_api()
+            if df_chamadas.empty:
+                st.info("Nenhuma chamada registrada neste processo.")
+            else:
+                st.dataframe(
+                    df_chamadas.sort_values('Tempo total (s)', ascending=False),
+                    use_container_width=True,
+                    hide_index=True
+                )
+            
+            st.write("**Cache de leitura das abas:**")
+            st.dataframe(
+                resumo_cache_leituras(),
+                column_config={
+                    "Taxa de acerto": st.column_config.ProgressColumn("Taxa de acerto", min_value=0.0, max_value=1.0)
+                },
+                use_container_width=True,
+                hide_index=True
             )
+            
+            col_metricas1, col_metricas2 = st.columns(2)
+            with col_metricas1:
+                st.download_button(
+                    label="📄 Baixar métricas (Prometheus)",
+                    data=exportar_prometheus(),
+                    file_name="metricas_interclasse.prom",
+                    mime="text/plain",
+                    on_click="ignore"
+                )
+            with col_metricas2:
+                if st.button("🔄 Zerar métricas"):
+                    zerar_metricas()
+                    st.rerun()
+        
+        # Perfilador por rerun: mostra onde o tempo das páginas está sendo gasto
+        with st.expander("🔬 Perfilador de páginas"):
+            ativo = st.toggle(
+                "Perfilar as páginas de todas as sessões",
+                value=perfil_ativo(),
+                help="Amostra a pilha de execução de cada rerun. Desative depois da análise."
+            )
+            if ativo != perfil_ativo():
+                definir_perfil_ativo(ativo)
+            
+            perfis = listar_perfis()
+            if not perfis:
+                st.info("Nenhum perfil coletado. Ative o perfilador e navegue pelas páginas.")
+            else:
+                rotulos_perfis = [
+                    f"{p.inicio.strftime('%d/%m %H:%M:%S')} - {p.pagina} - {p.unidade or '-'} - {p.duracao * 1000:.0f} ms"
+                    for p in perfis
+                ]
+                indice_perfil = st.selectbox(
+                    "Perfil:",
+                    options=range(len(perfis)),
+                    format_func=lambda i: rotulos_perfis[i]
+                )
+                perfil = perfis[indice_perfil]
+                
+                st.write(f"**{perfil.total_amostras} amostras** a cada {perfil.intervalo * 1000:.0f} ms")
+                st.dataframe(resumo_por_categoria(perfil), use_container_width=True, hide_index=True)
+                st.dataframe(pontos_quentes(perfil), use_container_width=True, hide_index=True)
+                st.download_button(
+                    label="🔥 Baixar flame graph (formato collapsed)",
+                    data=exportar_flamegraph(perfil),
+                    file_name=f"perfil_{perfil.pagina}_{perfil.inicio.strftime('%Y%m%d_%H%M%S')}.folded",
+                    mime="text/plain",
+                    on_click="ignore"
+                )
+        
+        # Tempos de importação dos módulos (partida a frio no Streamlit Cloud)
+        with st.expander("⏱️ Tempos de importação dos módulos"):
+            df_importacoes = relatorio_importacoes()
+            if df_importacoes.empty:
+                st.info("Nenhuma importação medida neste processo.")
+            else:
+                st.dataframe(df_importacoes, use_container_width=True, hide_index=True)
+        
+        # Memória ocupada pelo estado das sessões abertas neste processo
+        with st.expander("🧠 Memória das sessões"):
+            df_sessoes = relatorio_sessoes()
+            if df_sessoes.empty:
+                st.info("Nenhuma sessão medida neste processo.")
+            else:
+                st.write(f"**{len(df_sessoes)} sessão(ões)**, {df_sessoes['Memória (KB)'].sum():.0f} KB no total")
+                st.dataframe(df_sessoes, use_container_width=True, hide_index=True)
+            st.write("**Sessão atual por chave:**")
+            st.dataframe(relatorio_sessao().head(20), use_container_width=True, hide_index=True)
+        
+        # Situação do diário local de inscrições (envio em segundo plano à planilha)
+        with st.expander("🗂️ Diário de inscrições"):
+            situacao = situacao_diario()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Pendentes de envio", situacao['pendentes'])
+            col2.metric("Enviadas", situacao['enviados'])
+            col3.metric("Descartadas (duplicadas)", situacao['duplicados'])
+            if situacao['ultimo_erro']:
+                st.warning(f"Última falha de envio: {situacao['ultimo_erro']}")
+            if st.button("🔄 Enviar pendentes agora"):
+                acordar_envio()
+            
+            df_espera = situacao_espera()
+            if df_espera.empty:
+                st.write("Nenhum aluno na lista de espera.")
+            else:
+                st.write(f"**Lista de espera:** {int(df_espera['Aguardando'].sum())} aluno(s)")
+                st.dataframe(df_espera, use_container_width=True, hide_index=True)
+            
+            # Inscritos/Vagas_Restantes calculados pela aplicação, gravados na aba sob demanda
+            if VAGAS_CALCULADAS and st.button("📤 Gravar inscritos e vagas na aba MODALIDADES"):
+                try:
+                    gravadas = gravar_contagens_modalidades()
+                    st.success(f"{gravadas} linha(s) da aba MODALIDADES atualizada(s).")
+                except Exception as e:
+                    st.error(f"Erro ao gravar as contagens: {e}")
+        
+        # Temporadas: a aba ativa guarda só a edição atual; as anteriores vão para abas de arquivo
+        with st.expander("🗄️ Temporadas"):
+            por_temporada = contar_inscricoes_por_temporada(carregar_inscritos_padronizados())
+            temporada_atual = temporada_ativa()
+            encerradas = por_temporada[por_temporada.index < temporada_atual]
+            st.write(f"**Temporada ativa:** {temporada_atual}")
+            if not por_temporada.empty:
+                st.dataframe(por_temporada.rename_axis('Temporada').reset_index(name='Inscrições na aba ativa'),
+                             use_container_width=True, hide_index=True)
+            if encerradas.empty:
+                st.write("Nenhuma inscrição de temporada encerrada na aba ativa.")
+            elif st.button(f"🗄️ Arquivar {int(encerradas.sum())} inscrição(ões) de temporadas encerradas"):
+                try:
+                    movidas = arquivar_temporadas_encerradas()
+                    st.success("Arquivadas: " + ", ".join(f"{t}: {n}" for t, n in sorted(movidas.items())))
+                except Exception as e:
+                    st.error(f"Erro ao arquivar temporadas: {e}")
+        
+        # Tabela de jogos montada a partir das inscrições (equipes, chaves e horários sem choque)
+        with st.expander("🏆 Tabela de jogos"):
+            with st.form("form_tabela_jogos"):
+                col1, col2, col3 = st.columns(3)
+                agrupar_por = col1.selectbox("Equipes por:", options=AGRUPAMENTOS_EQUIPE)
+                formato_disputa = col2.selectbox("Formato de disputa:", options=FORMATOS_DISPUTA)
+                n_quadras = col3.number_input("Jogos simultâneos:", min_value=1, max_value=50, value=4, step=1)
+                horarios_texto = st.text_input("Horários de cada dia (separados por vírgula):",
+                                               value=", ".join(HORARIOS_PADRAO))
+                gerar_tabela = st.form_submit_button("Gerar tabela de jogos")
+            
+            if gerar_tabela:
+                horarios = tuple(h.strip() for h in horarios_texto.split(',') if h.strip()) or HORARIOS_PADRAO
+                st.session_state.parametros_tabela_jogos = (agrupar_por, formato_disputa, int(n_quadras), horarios)
+            
+            # Os parâmetros ficam na sessão; a tabela em si vem do cache (parâmetros + versão)
+            parametros_tabela = st.session_state.get('parametros_tabela_jogos')
+            if parametros_tabela:
+                tabela_jogos = gerar_tabela_jogos(versao_inscritos, *parametros_tabela)
+                agenda = tabela_jogos['agenda']
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Equipes", len(tabela_jogos['equipes']))
+                col2.metric("Jogos", len(agenda))
+                col3.metric("Dias", int(agenda['Dia'].max()) if not agenda.empty else 0)
+                col4.metric("Choques de horário", len(tabela_jogos['conflitos']))
+                if not tabela_jogos['conflitos'].empty:
+                    st.dataframe(tabela_jogos['conflitos'], use_container_width=True, hide_index=True)
+                
+                st.dataframe(agenda, use_container_width=True, hide_index=True)
+                col_agenda, col_equipes = st.columns(2)
+                with col_agenda:
+                    st.download_button(
+                        label=f"📥 Exportar jogos ({formato_exportacao})",
+                        data=gerar_arquivo_tabela_jogos(formato_exportacao, 'agenda', versao_inscritos,
+                                                        *parametros_tabela),
+                        file_name=nome_arquivo_exportacao(formato_exportacao, prefixo="tabela_jogos"),
+                        mime=FORMATOS_EXPORTACAO[formato_exportacao]['mime'],
+                        on_click="ignore"
+                    )
+                with col_equipes:
+                    st.download_button(
+                        label=f"📥 Exportar equipes ({formato_exportacao})",
+                        data=gerar_arquivo_tabela_jogos(formato_exportacao, 'equipes', versao_inscritos,
+                                                        *parametros_tabela),
+                        file_name=nome_arquivo_exportacao(formato_exportacao, prefixo="equipes"),
+                        mime=FORMATOS_EXPORTACAO[formato_exportacao]['mime'],
+                        on_click="ignore"
+                    )
         
     except Exception as e:
         st.error(f"Erro ao carregar dados: {e}")
\ No newline at end of file
@@ -0,0 +1,258 @@
+# utils/agregados.py
+import threading
+import time
+from collections import Counter, defaultdict
+import streamlit as st
+import pandas as pd
+from utils.sheets import *
+from utils.inscritos import carregar_inscritos_padronizados
+from utils.modalidades import carregar_modalidades_completas
+
+# Depois desse tempo o resumo é reconstruído a partir da planilha, para
+# incorporar edições feitas fora da aplicação (mesmo prazo dos caches de dados)
+VALIDADE_AGREGADOS_SEGUNDOS = 600
+
+# ------------------------------------------------------------
+# Estado materializado (um por processo, compartilhado entre sessões)
+# ------------------------------------------------------------
+@st.cache_resource
+def _estado_agregados():
+    """
+    Contadores mantidos incrementalmente a cada inclusão/exclusão:
+    - contagens[(unidade, modalidade, genero)] -> número de inscrições
+    - alunos[(unidade, modalidade, genero)] -> Counter de RA
+    - alunos_total -> Counter de RA em todas as inscrições
+    """
+    return {
+        'lock': threading.Lock(),
+        'construido_em': None,
+        'versao': None,
+        'revisao': 0,
+        'contagens': Counter(),
+        'alunos': defaultdict(Counter),
+        'alunos_total': Counter(),
+        'resumo': None,
+        'revisao_reservas_resumo': None,
+        'ofertas': {},
+        'versao_modalidades': None,
+    }
+
+def _chave_inscricao(dados):
+    """Chave (unidade, modalidade, gênero) de uma linha da aba INSCRITOS-UNIDADE"""
+    return (str(dados[0]).strip(), str(dados[5]).strip(), str(dados[4]).strip())
+
+def _reconstruir(estado):
+    """Reconstrói todos os contadores a partir da planilha (chamado com o lock adquirido)"""
+    versao = obter_versao_aba('INSCRITOS-UNIDADE')
+    df_inscritos = carregar_inscritos_padronizados()
+
+    contagens = Counter()
+    alunos = defaultdict(Counter)
+    alunos_total = Counter()
+
+    if not df_inscritos.empty:
+        df_chaves = pd.DataFrame({
+            'Unidade': df_inscritos['Unidade'].astype(str).str.strip(),
+            'Modalidade': df_inscritos['Modalidade'].astype(str).str.strip(),
+            'Genero': df_inscritos['Genero Modalidade'].astype(str).str.strip(),
+            'RA': df_inscritos['RA Aluno'].astype(str).str.strip(),
+        })
+        colunas_chave = ['Unidade', 'Modalidade', 'Genero']
+        contagens.update(df_chaves.groupby(colunas_chave).size().to_dict())
+        for (unidade, modalidade, genero, ra), n in df_chaves.groupby(colunas_chave + ['RA']).size().items():
+            alunos[(unidade, modalidade, genero)][ra] = n
+        alunos_total.update(df_chaves['RA'].value_counts().to_dict())
+
+    estado['contagens'] = contagens
+    estado['alunos'] = alunos
+    estado['alunos_total'] = alunos_total
+    estado['construido_em'] = time.monotonic()
+    estado['versao'] = versao
+    estado['revisao'] += 1
+    estado['resumo'] = None
+
+def obter_estado_agregados():
+    """
+    Retorna o estado materializado, reconstruindo se ainda não existe, expirou ou
+    se a versão da aba mudou sem passar pelo observador (escrita em outra réplica)
+    """
+    estado = _estado_agregados()
+    with estado['lock']:
+        if (estado['construido_em'] is None or
+                estado['versao'] != obter_versao_aba('INSCRITOS-UNIDADE') or
+                time.monotonic() - estado['construido_em'] > VALIDADE_AGREGADOS_SEGUNDOS):
+            _reconstruir(estado)
+    return estado
+
+def _aplicar_escrita(evento, dados, linha=None):
+    """Observador de INSCRITOS-UNIDADE: atualiza os contadores sem reler a planilha"""
+    estado = _estado_agregados()
+    with estado['lock']:
+        # Se ainda não foi construído, a primeira leitura já vai incluir esta escrita
+        if estado['construido_em'] is None:
+            return
+
+        chave = _chave_inscricao(dados)
+        ra = str(dados[2]).strip()
+        delta = 1 if evento == 'inclusao' else -1
+
+        estado['contagens'][chave] += delta
+        estado['alunos'][chave][ra] += delta
+        estado['alunos_total'][ra] += delta
+
+        # Remove entradas zeradas para que as contagens de únicos continuem exatas
+        if estado['contagens'][chave] <= 0:
+            del estado['contagens'][chave]
+        if estado['alunos'][chave][ra] <= 0:
+            del estado['alunos'][chave][ra]
+        if not estado['alunos'][chave]:
+            del estado['alunos'][chave]
+        if estado['alunos_total'][ra] <= 0:
+            del estado['alunos_total'][ra]
+
+        estado['versao'] = obter_versao_aba('INSCRITOS-UNIDADE')
+        estado['revisao'] += 1
+        estado['resumo'] = None
+
+registrar_observador_inscritos('agregados', _aplicar_escrita)
+
+# ------------------------------------------------------------
+# Consultas sobre os agregados
+# ------------------------------------------------------------
+def _ofertas_modalidades():
+    """Mapa (unidade, modalidade, gênero) -> (Limite_Vagas, Tem_Vaga) das combinações da aba MODALIDADES"""
+    df_modalidades = carregar_modalidades_completas(obter_versao_aba('MODALIDADES'))
+    if df_modalidades.empty:
+        return {}
+    limites = df_modalidades['Limite_Vagas'] if 'Limite_Vagas' in df_modalidades.columns else 0
+    tem_vaga = df_modalidades['Tem_Vaga'] != 'NÃO' if 'Tem_Vaga' in df_modalidades.columns else True
+    df_ofertas = pd.DataFrame({
+        'Unidade': df_modalidades['Unidade'], 'Modalidade': df_modalidades['Modalidade'],
+        'Genero': df_modalidades['Genero'], 'Limite_Vagas': limites, 'Tem_Vaga': tem_vaga,
+    })
+    return {
+        (row.Unidade, row.Modalidade, row.Genero): (row.Limite_Vagas, bool(row.Tem_Vaga))
+        for row in df_ofertas.itertuples(index=False)
+        if row.Unidade and row.Modalidade
+    }
+
+def _atualizar_ofertas(estado):
+    """Relê as combinações oferecidas e seus limites quando a versão da aba MODALIDADES muda"""
+    versao = obter_versao_aba('MODALIDADES')
+    if estado['versao_modalidades'] == versao:
+        return
+    ofertas = _ofertas_modalidades()
+    with estado['lock']:
+        estado['ofertas'] = ofertas
+        estado['versao_modalidades'] = versao
+        estado['resumo'] = None
+
+def obter_resumo_inscricoes():
+    """
+    Tabela resumo por unidade × modalidade × gênero com inscrições, alunos únicos,
+    reservas ainda no diário, limite de vagas, Tem_Vaga, vagas restantes
+    (descontadas as reservas) e taxa de preenchimento. Traz
+    todas as combinações oferecidas na aba MODALIDADES (as sem inscrição com 0)
+    e as que têm inscrição sem estar na aba. É recalculada a partir dos
+    contadores (uma linha por combinação), nunca a partir das inscrições.
+    """
+    estado = obter_estado_agregados()
+    _atualizar_ofertas(estado)
+    return resumo_em_memoria()
+
+def assinatura_agregados():
+    """(revisão dos contadores, versão das ofertas, revisão das reservas): muda sempre que o resumo muda"""
+    estado = _estado_agregados()
+    return estado['revisao'], estado['versao_modalidades'], reservas_por_combinacao()[0]
+
+def contagens_inscricoes():
+    """(revisão, cópia das contagens por (unidade, modalidade, gênero)), montando os agregados se preciso"""
+    estado = obter_estado_agregados()
+    with estado['lock']:
+        return estado['revisao'], dict(estado['contagens'])
+
+def revisao_agregados():
+    """Revisão atual dos contadores (montando os agregados se preciso), para chaves de cache"""
+    return obter_estado_agregados()['revisao']
+
+def resumo_em_memoria():
+    """
+    Mesmo resumo de obter_resumo_inscricoes, mas só com o que já está em memória:
+    não reconstrói os contadores nem relê as ofertas (nunca chama a API). Retorna
+    None se os agregados ainda não foram montados neste processo.
+    """
+    estado = _estado_agregados()
+    # Inscrições aceitas que ainda estão no diário (reservadas na guarda) já ocupam vaga
+    revisao_reservas, reservadas = reservas_por_combinacao()
+    with estado['lock']:
+        if estado['construido_em'] is None:
+            return None
+        if estado['resumo'] is not None and estado['revisao_reservas_resumo'] == revisao_reservas:
+            return estado['resumo']
+        revisao = estado['revisao']
+        ofertas = estado['ofertas']
+        # Junção externa: combinações oferecidas sem inscrição e inscrições fora da aba MODALIDADES
+        chaves = set(ofertas) | set(estado['contagens'])
+        linhas = [
+            (unidade, modalidade, genero, estado['contagens'].get((unidade, modalidade, genero), 0),
+             len(estado['alunos'].get((unidade, modalidade, genero), ())))
+            for unidade, modalidade, genero in chaves
+        ]
+
+    resumo = pd.DataFrame(linhas, columns=['Unidade', 'Modalidade', 'Genero', 'Inscricoes', 'Alunos_Unicos'])
+    # Combinação que não está na aba: sem limite conhecido e sem vaga
+    oferta = [ofertas.get(chave, (0, False)) for chave in zip(resumo['Unidade'], resumo['Modalidade'], resumo['Genero'])]
+    resumo['Limite_Vagas'] = [limite for limite, _ in oferta]
+    resumo['Tem_Vaga'] = [tem_vaga for _, tem_vaga in oferta]
+    resumo['Reservadas'] = [
+        reservadas.get(chave, 0) for chave in zip(resumo['Unidade'], resumo['Modalidade'], resumo['Genero'])
+    ]
+    resumo['Vagas_Restantes'] = (
+        (resumo['Limite_Vagas'] - resumo['Inscricoes'] - resumo['Reservadas']).clip(lower=0).where(resumo['Tem_Vaga'], 0)
+    )
+    resumo['Taxa_Preenchimento'] = (
+        resumo['Inscricoes'] / resumo['Limite_Vagas'].where(resumo['Limite_Vagas'] > 0)
+    ).fillna(0.0)
+    resumo = resumo.sort_values(['Unidade', 'Modalidade', 'Genero']).reset_index(drop=True)
+
+    with estado['lock']:
+        # Só guarda se nenhuma escrita chegou enquanto o resumo era montado
+        if estado['revisao'] == revisao and estado['ofertas'] is ofertas:
+            estado['resumo'] = resumo
+            estado['revisao_reservas_resumo'] = revisao_reservas
+    return resumo
+
+def obter_metricas(unidade="Todas", modalidade="Todas", genero="Todos"):
+    """Totais para os cartões do painel (inscrições, unidades, modalidades e alunos únicos)"""
+    estado = obter_estado_agregados()
+    with estado['lock']:
+        chaves = [
+            chave for chave in estado['contagens']
+            if (unidade == "Todas" or chave[0] == unidade)
+            and (modalidade == "Todas" or chave[1] == modalidade)
+            and (genero == "Todos" or chave[2] == genero)
+        ]
+        total = sum(estado['contagens'][chave] for chave in chaves)
+        if len(chaves) == len(estado['contagens']):
+            alunos_unicos = len(estado['alunos_total'])
+        else:
+            alunos_unicos = len(set().union(*(estado['alunos'][chave].keys() for chave in chaves)))
+
+    return {
+        'total': total,
+        'unidades': len({chave[0] for chave in chaves}),
+        'modalidades': len({chave[1] for chave in chaves}),
+        'alunos_unicos': alunos_unicos,
+    }
+
+def pivotar_resumo(resumo, metrica):
+    """Pivota o resumo em unidade × (modalidade, gênero) para a métrica escolhida"""
+    if resumo.empty:
+        return pd.DataFrame()
+    return resumo.pivot_table(
+        index='Unidade',
+        columns=['Modalidade', 'Genero'],
+        values=metrica,
+        aggfunc='sum',
+        fill_value=0
+    )
@@ -0,0 +1,178 @@
+# utils/api_contagens.py
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import streamlit as st
+
+# Endpoint HTTP somente leitura (servidor próprio, ao lado do Streamlit) com as
+# contagens de inscrições e vagas restantes. As respostas saem do resumo que
+# já está em memória: uma consulta não abre sessão nem chama a API do Google.
+#   GET /contagens[?unidade=...]  JSON com ETag (responde 304 a If-None-Match)
+#   GET /saude                    estado do serviço
+#   GET /metrics                  métricas no formato do Prometheus (exige o token)
+# Por padrão só atende a própria máquina (um proxy reverso publica o que for
+# necessário) e só é iniciado depois do primeiro login.
+API_HOST = os.environ.get('INTERCLASSE_API_HOST', '127.0.0.1')
+API_PORTA = int(os.environ.get('INTERCLASSE_API_PORTA', '8502'))
+API_MAX_IDADE = int(os.environ.get('INTERCLASSE_API_MAX_IDADE', '5'))
+# Inicia o endpoint na partida do processo, sem esperar um login
+API_NA_PARTIDA = os.environ.get('INTERCLASSE_API_NA_PARTIDA', '').lower() in ('1', 'true', 'sim')
+# Origens liberadas para CORS, separadas por vírgula (vazio: nenhuma)
+API_ORIGENS = {o.strip() for o in os.environ.get('INTERCLASSE_API_ORIGENS', '').split(',') if o.strip()}
+# Token exigido em /metrics ("Authorization: Bearer <token>"); sem token a rota fica fechada
+API_TOKEN_METRICAS = os.environ.get('INTERCLASSE_API_TOKEN_METRICAS', '')
+
+# Corpo JSON pronto por assinatura dos agregados: (assinatura, unidade) -> (corpo, etag)
+_respostas = {}
+_lock = threading.Lock()
+
+def _montar_contagens(resumo, unidade=None):
+    """
+    Estrutura do JSON: totais e, por unidade, todas as modalidades oferecidas
+    (inclusive as ainda sem inscrição) com as vagas restantes do resumo
+    """
+    if unidade:
+        resumo = resumo[resumo['Unidade'] == unidade]
+    unidades = {}
+    for linha in resumo.itertuples(index=False):
+        limite = int(linha.Limite_Vagas)
+        dados_unidade = unidades.setdefault(linha.Unidade, {'inscricoes': 0, 'modalidades': []})
+        dados_unidade['inscricoes'] += int(linha.Inscricoes)
+        dados_unidade['modalidades'].append({
+            'modalidade': linha.Modalidade,
+            'genero': linha.Genero,
+            'inscricoes': int(linha.Inscricoes),
+            'alunos_unicos': int(linha.Alunos_Unicos),
+            'limite_vagas': limite,
+            'tem_vaga': bool(linha.Tem_Vaga),
+            'vagas_restantes': int(linha.Vagas_Restantes) if limite else None,
+        })
+    return {
+        'gerado_em': datetime.now(timezone.utc).isoformat(),
+        'total_inscricoes': int(resumo['Inscricoes'].sum()),
+        'unidades': unidades,
+    }
+
+def obter_resposta_contagens(unidade=None):
+    """
+    (corpo, etag) das contagens, ou None se os agregados ainda não existem.
+    O corpo só é remontado quando os agregados mudam; nas demais consultas é
+    uma busca em dicionário.
+    """
+    from utils.agregados import assinatura_agregados, resumo_em_memoria
+
+    chave = (assinatura_agregados(), unidade)
+    resposta = _respostas.get(chave)
+    if resposta is not None:
+        return resposta
+
+    resumo = resumo_em_memoria()
+    if resumo is None:
+        return None
+    corpo = json.dumps(_montar_contagens(resumo, unidade), ensure_ascii=False).encode('utf-8')
+    etag = '"' + hashlib.sha1(corpo).hexdigest()[:20] + '"'
+    with _lock:
+        # Mantém apenas as respostas da assinatura atual
+        for antiga in [c for c in _respostas if c[0] != chave[0]]:
+            del _respostas[antiga]
+        _respostas[chave] = (corpo, etag)
+    return corpo, etag
+
+class ManipuladorContagens(BaseHTTPRequestHandler):
+    server_version = "InterclasseAPI/1.0"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        try:
+            if url.path == '/contagens':
+                unidade = parse_qs(url.query).get('unidade', [None])[0]
+                self._responder_contagens(unidade)
+            elif url.path == '/saude':
+                from utils.agregados import resumo_em_memoria
+                pronto = resumo_em_memoria() is not None
+                self._enviar(200 if pronto else 503, json.dumps({'pronto': pronto}).encode('utf-8'))
+            elif url.path == '/metrics':
+                if not self._token_metricas_valido():
+                    self._enviar(401, '{"erro": "token ausente ou inválido"}'.encode('utf-8'),
+                                 cabecalhos={'WWW-Authenticate': 'Bearer'})
+                    return
+                from utils.metricas import exportar_prometheus
+                self._enviar(200, exportar_prometheus().encode('utf-8'),
+                             tipo='text/plain; version=0.0.4; charset=utf-8')
+            else:
+                self._enviar(404, b'{"erro": "rota inexistente"}')
+        except Exception:
+            logging.exception("Erro no endpoint de contagens")
+            self._enviar(500, b'{"erro": "erro interno"}')
+
+    def _token_metricas_valido(self):
+        if not API_TOKEN_METRICAS:
+            return False
+        autorizacao = self.headers.get('Authorization', '')
+        return hmac.compare_digest(autorizacao.encode('utf-8'), f'Bearer {API_TOKEN_METRICAS}'.encode('utf-8'))
+
+    def _responder_contagens(self, unidade):
+        resposta = obter_resposta_contagens(unidade)
+        if resposta is None:
+            self._enviar(503, '{"erro": "contagens ainda não carregadas"}'.encode('utf-8'), cabecalhos={'Retry-After': '30'})
+            return
+        corpo, etag = resposta
+        cabecalhos = {'ETag': etag, 'Cache-Control': f'max-age={API_MAX_IDADE}'}
+        if self.headers.get('If-None-Match') == etag:
+            self._enviar(304, b'', cabecalhos=cabecalhos)
+        else:
+            self._enviar(200, corpo, cabecalhos=cabecalhos)
+
+    def _enviar(self, status, corpo, tipo='application/json; charset=utf-8', cabecalhos=None):
+        self.send_response(status)
+        if status != 304:
+            self.send_header('Content-Type', tipo)
+            self.send_header('Content-Length', str(len(corpo)))
+        origem = self.headers.get('Origin')
+        if origem and origem in API_ORIGENS:
+            self.send_header('Access-Control-Allow-Origin', origem)
+            self.send_header('Vary', 'Origin')
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        # Consultas frequentes (placares) não vão para o log da aplicação
+        pass
+
+@st.cache_resource
+def iniciar_api_contagens():
+    """
+    Inicia (uma vez por processo) o servidor do endpoint em uma thread. Os
+    agregados são montados uma vez em segundo plano para que o endpoint responda
+    mesmo antes de alguém abrir o painel. Chamada depois do login (ou na partida,
+    com INTERCLASSE_API_NA_PARTIDA). INTERCLASSE_API_PORTA=0 desliga.
+    """
+    if not API_PORTA:
+        return None
+    try:
+        servidor = ThreadingHTTPServer((API_HOST, API_PORTA), ManipuladorContagens)
+    except OSError as e:
+        logging.warning(f"Endpoint de contagens não iniciado na porta {API_PORTA}: {e}")
+        return None
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="api-contagens", daemon=True).start()
+
+    def preparar_agregados():
+        try:
+            from utils.agregados import obter_resumo_inscricoes
+            obter_resumo_inscricoes()
+        except Exception:
+            logging.exception("Erro ao preparar os agregados do endpoint de contagens")
+
+    threading.Thread(target=preparar_agregados, name="api-contagens-preparo", daemon=True).start()
+    logging.info("Endpoint de contagens iniciado", extra={'host': API_HOST, 'porta': API_PORTA})
+    return servidor
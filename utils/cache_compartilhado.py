@@ -0,0 +1,177 @@
+# utils/cache_compartilhado.py
+import json
+import logging
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+# Cache compartilhado entre réplicas (opcional): versões das abas e cópias das
+# leituras completas. Sem a variável de ambiente, cada processo usa só o próprio cache.
+#   INTERCLASSE_CACHE_COMPARTILHADO=redis://localhost:6379/0
+#   INTERCLASSE_CACHE_COMPARTILHADO=sqlite:///caminho/cache_compartilhado.sqlite3
+ENDERECO_CACHE = os.environ.get('INTERCLASSE_CACHE_COMPARTILHADO', '').strip()
+VALIDADE_SNAPSHOT = int(os.environ.get('INTERCLASSE_CACHE_VALIDADE', '600'))
+# Tempo máximo que uma réplica espera a leitura feita por outra antes de ler sozinha
+ESPERA_LEITURA_ALHEIA = 10.0
+PREFIXO = 'interclasse'
+
+class CacheCompartilhado(ABC):
+    """Operações comuns; as subclasses implementam o armazenamento (uma subclasse incompleta não pode ser criada)"""
+
+    @abstractmethod
+    def obter_versao(self, aba):
+        raise NotImplementedError
+
+    @abstractmethod
+    def incrementar_versao(self, aba):
+        raise NotImplementedError
+
+    @abstractmethod
+    def ler_snapshot(self, aba, versao):
+        raise NotImplementedError
+
+    @abstractmethod
+    def gravar_snapshot(self, aba, versao, valores):
+        raise NotImplementedError
+
+    @abstractmethod
+    def tentar_bloquear(self, chave, segundos):
+        raise NotImplementedError
+
+    @abstractmethod
+    def liberar(self, chave):
+        raise NotImplementedError
+
+    def obter_ou_carregar(self, aba, versao, carregar):
+        """
+        Devolve a cópia da aba nesta versão. Se nenhuma réplica a leu ainda, só
+        uma delas (a que obtém o bloqueio) chama `carregar`; as demais esperam a cópia.
+        """
+        valores = self.ler_snapshot(aba, versao)
+        if valores is not None:
+            return valores
+
+        chave_bloqueio = f"carregando:{aba}:{versao}"
+        if not self.tentar_bloquear(chave_bloqueio, int(ESPERA_LEITURA_ALHEIA * 3)):
+            limite = time.monotonic() + ESPERA_LEITURA_ALHEIA
+            while time.monotonic() < limite:
+                time.sleep(0.2)
+                valores = self.ler_snapshot(aba, versao)
+                if valores is not None:
+                    return valores
+            logging.warning("Cópia compartilhada não chegou a tempo; lendo a aba", extra={'aba': aba})
+            return carregar()
+
+        try:
+            valores = carregar()
+            self.gravar_snapshot(aba, versao, valores)
+            return valores
+        finally:
+            self.liberar(chave_bloqueio)
+
+class CacheRedis(CacheCompartilhado):
+    """Servidor Redis (ou compatível) compartilhado pelas réplicas"""
+
+    def __init__(self, endereco):
+        import redis
+        self.cliente = redis.Redis.from_url(endereco)
+
+    def obter_versao(self, aba):
+        return int(self.cliente.get(f"{PREFIXO}:versao:{aba}") or 0)
+
+    def incrementar_versao(self, aba):
+        return int(self.cliente.incr(f"{PREFIXO}:versao:{aba}"))
+
+    def ler_snapshot(self, aba, versao):
+        dados = self.cliente.get(f"{PREFIXO}:snapshot:{aba}:{versao}")
+        return json.loads(dados) if dados is not None else None
+
+    def gravar_snapshot(self, aba, versao, valores):
+        self.cliente.set(f"{PREFIXO}:snapshot:{aba}:{versao}", json.dumps(valores, ensure_ascii=False),
+                         ex=VALIDADE_SNAPSHOT)
+
+    def tentar_bloquear(self, chave, segundos):
+        return bool(self.cliente.set(f"{PREFIXO}:{chave}", '1', nx=True, ex=segundos))
+
+    def liberar(self, chave):
+        self.cliente.delete(f"{PREFIXO}:{chave}")
+
+class CacheSQLite(CacheCompartilhado):
+    """Arquivo SQLite em disco compartilhado (réplicas na mesma máquina ou volume)"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        pasta = os.path.dirname(caminho)
+        if pasta and not os.path.exists(pasta):
+            os.makedirs(pasta)
+        with self._conectar() as conexao:
+            conexao.execute("CREATE TABLE IF NOT EXISTS versoes (aba TEXT PRIMARY KEY, versao INTEGER NOT NULL)")
+            conexao.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    aba TEXT NOT NULL, versao INTEGER NOT NULL, valores TEXT NOT NULL,
+                    expira_em REAL NOT NULL, PRIMARY KEY (aba, versao)
+                )
+            """)
+            conexao.execute("CREATE TABLE IF NOT EXISTS bloqueios (chave TEXT PRIMARY KEY, expira_em REAL NOT NULL)")
+
+    def _conectar(self):
+        conexao = sqlite3.connect(self.caminho, timeout=30)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        return conexao
+
+    def obter_versao(self, aba):
+        with self._conectar() as conexao:
+            linha = conexao.execute("SELECT versao FROM versoes WHERE aba = ?", (aba,)).fetchone()
+        return linha[0] if linha else 0
+
+    def incrementar_versao(self, aba):
+        with self._conectar() as conexao:
+            conexao.execute(
+                "INSERT INTO versoes (aba, versao) VALUES (?, 1) "
+                "ON CONFLICT(aba) DO UPDATE SET versao = versao + 1", (aba,)
+            )
+            return conexao.execute("SELECT versao FROM versoes WHERE aba = ?", (aba,)).fetchone()[0]
+
+    def ler_snapshot(self, aba, versao):
+        with self._conectar() as conexao:
+            linha = conexao.execute(
+                "SELECT valores FROM snapshots WHERE aba = ? AND versao = ? AND expira_em > ?",
+                (aba, versao, time.time())
+            ).fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    def gravar_snapshot(self, aba, versao, valores):
+        agora = time.time()
+        with self._conectar() as conexao:
+            conexao.execute("DELETE FROM snapshots WHERE expira_em <= ? OR (aba = ? AND versao < ?)",
+                            (agora, aba, versao))
+            conexao.execute("INSERT OR REPLACE INTO snapshots (aba, versao, valores, expira_em) VALUES (?, ?, ?, ?)",
+                            (aba, versao, json.dumps(valores, ensure_ascii=False), agora + VALIDADE_SNAPSHOT))
+
+    def tentar_bloquear(self, chave, segundos):
+        agora = time.time()
+        with self._conectar() as conexao:
+            conexao.execute("DELETE FROM bloqueios WHERE chave = ? AND expira_em <= ?", (chave, agora))
+            cursor = conexao.execute("INSERT OR IGNORE INTO bloqueios (chave, expira_em) VALUES (?, ?)",
+                                     (chave, agora + segundos))
+            return cursor.rowcount == 1
+
+    def liberar(self, chave):
+        with self._conectar() as conexao:
+            conexao.execute("DELETE FROM bloqueios WHERE chave = ?", (chave,))
+
+@lru_cache(maxsize=1)
+def obter_cache_compartilhado():
+    """Backend configurado, ou None quando o cache compartilhado está desligado ou indisponível"""
+    if not ENDERECO_CACHE:
+        return None
+    try:
+        if ENDERECO_CACHE.startswith(('redis://', 'rediss://', 'unix://')):
+            return CacheRedis(ENDERECO_CACHE)
+        caminho = ENDERECO_CACHE[len('sqlite:///'):] if ENDERECO_CACHE.startswith('sqlite:///') else ENDERECO_CACHE
+        return CacheSQLite(caminho)
+    except Exception:
+        logging.exception("Cache compartilhado indisponível; usando apenas o cache local")
+        return None
@@ -0,0 +1,81 @@
+# utils/carregador_paginas.py
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+
+# Páginas da aplicação: chave de navegação -> (módulo, função da página)
+PAGINAS = {
+    "Cadastro": ("Realizar_Cadastros", "pagina_principal"),
+    "Lista": ("Lista_inscritos", "pagina_lista_inscritos"),
+    "TodasUnidades": ("Registro_Todas_Unidades", "pagina_registro_todas_unidades"),
+}
+
+# Orçamento de tempo de importação por módulo (ms); acima disso um aviso vai para o log
+ORCAMENTO_IMPORTACAO_MS = float(os.environ.get("INTERCLASSE_ORCAMENTO_IMPORT_MS", "1500"))
+
+# Registro dos tempos de importação do processo: módulo -> dados da medição
+_TEMPOS_IMPORTACAO = {}
+_lock = threading.Lock()
+
+def importar_modulo(nome):
+    """
+    Importa um módulo da aplicação medindo o tempo da primeira importação.
+    Tenta primeiro com o prefixo utils (VS Code) e depois sem (Streamlit Cloud).
+    """
+    for nome_completo in (f"utils.{nome}", nome):
+        if nome_completo in sys.modules:
+            return sys.modules[nome_completo]
+
+    with _lock:
+        modulos_antes = set(sys.modules)
+        inicio = time.perf_counter()
+        try:
+            modulo = importlib.import_module(f"utils.{nome}")
+        except ImportError:
+            modulo = importlib.import_module(nome)
+        tempo_ms = (time.perf_counter() - inicio) * 1000
+
+        # Pacotes de terceiros carregados pela primeira vez junto com este módulo
+        novos = set(sys.modules) - modulos_antes
+        pacotes_novos = sorted({m.split('.')[0] for m in novos} - {'utils', nome})
+
+        _TEMPOS_IMPORTACAO[nome] = {
+            'tempo_ms': tempo_ms,
+            'modulos_carregados': len(novos),
+            'pacotes_novos': pacotes_novos,
+        }
+
+    if tempo_ms > ORCAMENTO_IMPORTACAO_MS:
+        logging.warning(
+            f"Importação de '{nome}' levou {tempo_ms:.0f} ms "
+            f"(orçamento {ORCAMENTO_IMPORTACAO_MS:.0f} ms); pacotes novos: {', '.join(pacotes_novos)}"
+        )
+    else:
+        logging.info(f"Importação de '{nome}' levou {tempo_ms:.0f} ms")
+
+    return modulo
+
+def carregar_pagina(chave):
+    """Retorna a função da página, importando o módulo só quando a página é aberta"""
+    nome_modulo, nome_funcao = PAGINAS[chave]
+    return getattr(importar_modulo(nome_modulo), nome_funcao)
+
+def relatorio_importacoes():
+    """Tabela com os tempos de importação medidos neste processo"""
+    import pandas as pd
+    
+    linhas = [
+        {
+            'Módulo': nome,
+            'Tempo (ms)': round(dados['tempo_ms'], 1),
+            'Orçamento (ms)': ORCAMENTO_IMPORTACAO_MS,
+            'Dentro do orçamento': dados['tempo_ms'] <= ORCAMENTO_IMPORTACAO_MS,
+            'Módulos carregados': dados['modulos_carregados'],
+            'Pacotes novos': ', '.join(dados['pacotes_novos']),
+        }
+        for nome, dados in _TEMPOS_IMPORTACAO.items()
+    ]
+    return pd.DataFrame(linhas)
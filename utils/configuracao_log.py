@@ -0,0 +1,145 @@
+# utils/configuracao_log.py
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+# Pasta dos logs (fora do repositório em produção e nos testes)
+LOG_DIR = os.environ.get('INTERCLASSE_LOG_DIR', 'logs')
+LOG_ARQUIVO = 'app.log'
+
+# Nível mínimo e rotação do arquivo podem ser ajustados por variável de ambiente
+LOG_NIVEL = os.environ.get('INTERCLASSE_LOG_NIVEL', 'INFO').upper()
+LOG_TAMANHO_MAXIMO = int(os.environ.get('INTERCLASSE_LOG_TAMANHO_MAXIMO', str(5 * 1024 * 1024)))
+LOG_ARQUIVOS_ANTIGOS = int(os.environ.get('INTERCLASSE_LOG_ARQUIVOS_ANTIGOS', '5'))
+
+_lock = threading.Lock()
+_listener = None
+
+# ------------------------------------------------------------
+# Contexto da sessão Streamlit anexado a cada registro
+# ------------------------------------------------------------
+def _contexto_sessao():
+    """Lê sessão, unidade, página e tempo decorrido do rerun atual (ou vazio fora de uma sessão)"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        if ctx is None:
+            return {}
+        estado = ctx.session_state
+        contexto = {'sessao': ctx.session_id}
+        if 'user_info' in estado:
+            contexto['unidade'] = estado['user_info'].get('unidade')
+        contexto['pagina'] = estado['pagina_atual'] if 'pagina_atual' in estado else None
+        if '_inicio_rerun' in estado:
+            contexto['tempo_rerun_ms'] = round((time.perf_counter() - estado['_inicio_rerun']) * 1000, 1)
+        return contexto
+    except Exception:
+        return {}
+
+class FiltroContexto(logging.Filter):
+    """Anexa o contexto da sessão ao registro, ainda na thread do script"""
+    def filter(self, record):
+        for campo, valor in _contexto_sessao().items():
+            if not hasattr(record, campo):
+                setattr(record, campo, valor)
+        return True
+
+class QueueHandlerEstruturado(logging.handlers.QueueHandler):
+    """
+    Coloca o registro na fila sem formatar a mensagem final: a formatação em
+    JSON e a escrita em disco acontecem na thread do QueueListener.
+    """
+    def prepare(self, record):
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+# Atributos padrão de LogRecord que não são repetidos como campos extras
+_ATRIBUTOS_PADRAO = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+class FormatadorJSON(logging.Formatter):
+    """Uma linha JSON por registro"""
+    def format(self, record):
+        dados = {
+            'momento': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensagem': record.getMessage(),
+            'modulo': record.module,
+            'funcao': record.funcName,
+            'linha': record.lineno,
+            'thread': record.threadName,
+        }
+        for campo, valor in record.__dict__.items():
+            if campo not in _ATRIBUTOS_PADRAO and not campo.startswith('_'):
+                dados[campo] = valor
+        if record.exc_text:
+            dados['excecao'] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+# ------------------------------------------------------------
+# Configuração
+# ------------------------------------------------------------
+def configurar_logging():
+    """
+    Configura o log estruturado: os registros vão para uma fila e uma thread em
+    segundo plano grava em LOG_DIR/app.log (JSON por linha, com rotação por tamanho).
+    Chamada uma vez na partida da aplicação.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+
+        try:
+            # Cria o diretório dos logs se não existir
+            if not os.path.exists(LOG_DIR):
+                os.makedirs(LOG_DIR)
+            destino = logging.handlers.RotatingFileHandler(
+                os.path.join(LOG_DIR, LOG_ARQUIVO),
+                maxBytes=LOG_TAMANHO_MAXIMO,
+                backupCount=LOG_ARQUIVOS_ANTIGOS,
+                encoding='utf-8'
+            )
+        except Exception as e:
+            # Fallback: log no console se o arquivo não puder ser criado
+            destino = logging.StreamHandler()
+            logging.getLogger(__name__).warning(f"Erro ao configurar arquivo de log: {e}. Usando o console.")
+        destino.setFormatter(FormatadorJSON())
+
+        fila = queue.SimpleQueue()
+        handler = QueueHandlerEstruturado(fila)
+        handler.addFilter(FiltroContexto())
+
+        raiz = logging.getLogger()
+        raiz.setLevel(LOG_NIVEL)
+        raiz.addHandler(handler)
+
+        _listener = logging.handlers.QueueListener(fila, destino, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+# ------------------------------------------------------------
+# Duração dos reruns
+# ------------------------------------------------------------
+def iniciar_rerun(session_state):
+    """Marca o início do rerun; registros seguintes levam o tempo decorrido"""
+    session_state['_inicio_rerun'] = time.perf_counter()
+
+def finalizar_rerun(session_state):
+    """Registra a duração total do rerun da sessão"""
+    inicio = session_state.get('_inicio_rerun')
+    if inicio is None:
+        return
+    duracao_ms = round((time.perf_counter() - inicio) * 1000, 1)
+    logging.getLogger('interclasse.rerun').info("Rerun concluído", extra={'duracao_rerun_ms': duracao_ms})
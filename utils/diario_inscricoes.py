@@ -0,0 +1,283 @@
+# utils/diario_inscricoes.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import streamlit as st
+from utils.sheets import *
+
+# Diário local (write-ahead) das inscrições: a inscrição é gravada primeiro aqui,
+# confirmada ao coordenador, e enviada em segundo plano à partição indicada pelo
+# roteador aba_da_inscricao (a aba INSCRITOS-UNIDADE, para a temporada ativa)
+CAMINHO_DIARIO = os.environ.get('INTERCLASSE_DIARIO', os.path.join('dados', 'diario_inscricoes.sqlite3'))
+INTERVALO_ENVIO = float(os.environ.get('INTERCLASSE_DIARIO_INTERVALO', '2'))
+TAMANHO_LOTE = int(os.environ.get('INTERCLASSE_DIARIO_LOTE', '50'))
+ESPERA_MAXIMA_NOVA_TENTATIVA = 300
+
+_lock = threading.Lock()
+
+def conectar_diario():
+    """Abre uma conexão com o diário (uma por operação; SQLite em modo WAL). Também usada pela lista de espera"""
+    pasta = os.path.dirname(CAMINHO_DIARIO)
+    if pasta and not os.path.exists(pasta):
+        os.makedirs(pasta)
+    conexao = sqlite3.connect(CAMINHO_DIARIO, timeout=30)
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.execute("PRAGMA synchronous=FULL")
+    conexao.execute("""
+        CREATE TABLE IF NOT EXISTS diario (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ra TEXT NOT NULL,
+            modalidade TEXT NOT NULL,
+            dados TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pendente',
+            criado_em REAL NOT NULL,
+            tentativas INTEGER NOT NULL DEFAULT 0,
+            proxima_tentativa REAL NOT NULL DEFAULT 0,
+            enviado_em REAL,
+            ultimo_erro TEXT
+        )
+    """)
+    # Um mesmo (RA, Modalidade) só pode estar pendente uma vez
+    conexao.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS diario_pendente_unico
+        ON diario (ra, modalidade) WHERE status = 'pendente'
+    """)
+    return conexao
+
+def _chave(dados):
+    """(RA, Modalidade) de uma linha no formato da aba INSCRITOS-UNIDADE"""
+    return str(dados[2]).strip(), str(dados[5]).strip()
+
+# ------------------------------------------------------------
+# Gravação (thread do script)
+# ------------------------------------------------------------
+def enfileirar_inscricoes(linhas):
+    """
+    Confere as inscrições na guarda, grava as aceitas no diário e acorda o envio
+    em segundo plano. Retorna (aceitas, rejeitadas), com rejeitadas sendo uma
+    lista de (dados, motivo).
+    """
+    aceitas, rejeitadas = reservar_inscricoes(linhas)
+    try:
+        with _lock, conectar_diario() as conexao:
+            gravar_no_diario(conexao, aceitas)
+    except Exception:
+        liberar_reservas(aceitas)
+        raise
+    logging.info("Inscrições gravadas no diário", extra={'aceitas': len(aceitas), 'recusadas': len(rejeitadas)})
+    if aceitas:
+        acordar_envio()
+    return len(aceitas), rejeitadas
+
+def gravar_no_diario(conexao, linhas):
+    """
+    Grava no diário inscrições já reservadas na guarda, dentro da transação de
+    quem chama (que faz o commit e depois chama acordar_envio)
+    """
+    agora = time.time()
+    for dados in linhas:
+        ra, modalidade = _chave(dados)
+        conexao.execute(
+            "INSERT OR IGNORE INTO diario (ra, modalidade, dados, criado_em) VALUES (?, ?, ?, ?)",
+            (ra, modalidade, json.dumps(dados, ensure_ascii=False), agora)
+        )
+
+def inscricoes_pendentes():
+    """RA -> modalidades ainda não enviadas à planilha"""
+    with _lock, conectar_diario() as conexao:
+        linhas = conexao.execute("SELECT ra, modalidade FROM diario WHERE status = 'pendente'").fetchall()
+    pendentes = {}
+    for ra, modalidade in linhas:
+        pendentes.setdefault(ra, []).append(modalidade)
+    return pendentes
+
+def situacao_diario():
+    """Quantidade de registros por status e o erro mais recente"""
+    with _lock, conectar_diario() as conexao:
+        contagens = dict(conexao.execute("SELECT status, COUNT(*) FROM diario GROUP BY status").fetchall())
+        ultimo_erro = conexao.execute(
+            "SELECT ultimo_erro FROM diario WHERE status = 'pendente' AND ultimo_erro IS NOT NULL "
+            "ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+    return {
+        'pendentes': contagens.get('pendente', 0),
+        'enviados': contagens.get('enviado', 0),
+        'duplicados': contagens.get('duplicado', 0),
+        'ultimo_erro': ultimo_erro[0] if ultimo_erro else None,
+    }
+
+# ------------------------------------------------------------
+# Envio em segundo plano
+# ------------------------------------------------------------
+@st.cache_resource
+def _abas_de_arquivo_conferidas():
+    """
+    Abas de arquivo já relidas neste processo: desde então só receberam appends
+    confirmados deste envio. Um append que falha depois de chamado tira a aba daqui.
+    """
+    return set()
+
+def _pares_existentes_na_planilha(aba):
+    """(RA, Modalidade) já presentes na partição (vazio se a aba de arquivo ainda não existe)"""
+    if aba != ABA_INSCRICOES_ATIVA and temporada_da_aba(aba) not in temporadas_arquivadas():
+        return set()
+    df = load_full_sheet_as_df(aba)
+    if df.empty or len(df.columns) < 6:
+        return set()
+    return set(zip(df.iloc[:, 2].astype(str).str.strip(), df.iloc[:, 5].astype(str).str.strip()))
+
+def _pares_ja_enviados(aba, registros):
+    """
+    (RA, Modalidade) do lote que já estão na partição. Na aba ativa a conferência
+    é feita na guarda, em memória; depois de um append ambíguo a versão da aba
+    muda e a guarda relê as colunas RA e Modalidade. Uma aba de arquivo só é
+    relida na primeira vez neste processo (envios anteriores a uma queda) ou
+    depois de um append que falhou.
+    """
+    if aba == ABA_INSCRICOES_ATIVA:
+        return pares_ja_gravados([dados for _, dados in registros])
+    if aba in _abas_de_arquivo_conferidas():
+        return set()
+    existentes = _pares_existentes_na_planilha(aba)
+    _abas_de_arquivo_conferidas().add(aba)
+    return existentes
+
+def enviar_lote():
+    """
+    Envia um lote de inscrições pendentes, com um append por partição: o
+    roteador aba_da_inscricao manda cada inscrição para a aba da sua temporada
+    (na prática, quase todas para a aba ativa). Retorna quantas foram enviadas.
+    """
+    agora = time.time()
+    with _lock, conectar_diario() as conexao:
+        pendentes = conexao.execute(
+            "SELECT id, dados FROM diario WHERE status = 'pendente' AND proxima_tentativa <= ? "
+            "ORDER BY id LIMIT ?",
+            (agora, TAMANHO_LOTE)
+        ).fetchall()
+    if not pendentes:
+        return 0
+
+    por_aba = {}
+    for id_registro, dados_json in pendentes:
+        dados = json.loads(dados_json)
+        por_aba.setdefault(aba_da_inscricao(dados), []).append((id_registro, dados))
+    return sum(_enviar_para_aba(aba, registros) for aba, registros in por_aba.items())
+
+def _enviar_para_aba(aba, registros):
+    """
+    Envia as inscrições de uma partição em um único append. Inscrições cujo
+    (RA, Modalidade) já está na aba (por exemplo, enviadas antes de uma queda
+    do processo) são marcadas como duplicadas.
+    """
+    existentes = _pares_ja_enviados(aba, registros)
+    lote, ids_lote, ids_duplicados, duplicados = [], [], [], []
+    for id_registro, dados in registros:
+        chave = _chave(dados)
+        if chave in existentes:
+            ids_duplicados.append(id_registro)
+            duplicados.append(dados)
+        else:
+            existentes.add(chave)
+            lote.append(dados)
+            ids_lote.append(id_registro)
+
+    if ids_duplicados:
+        with _lock, conectar_diario() as conexao:
+            conexao.executemany("UPDATE diario SET status = 'duplicado' WHERE id = ?",
+                                [(i,) for i in ids_duplicados])
+        liberar_reservas(duplicados)
+
+    if not lote:
+        return 0
+
+    tentou_append = False
+    try:
+        if aba == ABA_INSCRICOES_ATIVA:
+            ws = get_ws(aba)
+        else:
+            ws = abrir_aba_de_arquivo(aba, load_full_sheet_as_df(ABA_INSCRICOES_ATIVA).columns.tolist())
+        if ws is None:
+            raise RuntimeError(f"Aba {aba} indisponível")
+        tentou_append = True
+        resposta = ws.append_rows(lote, value_input_option="USER_ENTERED")
+    except Exception as e:
+        logging.exception("Falha ao enviar lote do diário", extra={'aba': aba, 'tamanho_lote': len(lote)})
+        with _lock, conectar_diario() as conexao:
+            conexao.executemany(
+                "UPDATE diario SET tentativas = tentativas + 1, ultimo_erro = ?, "
+                "proxima_tentativa = ? + MIN(?, (1 << MIN(tentativas, 8))) WHERE id = ?",
+                [(str(e), time.time(), ESPERA_MAXIMA_NOVA_TENTATIVA, i) for i in ids_lote]
+            )
+        if tentou_append:
+            # A falha pode ser ambígua (timeout com as linhas já gravadas): a
+            # próxima tentativa relê a aba e marca como duplicado o que já chegou
+            _abas_de_arquivo_conferidas().discard(aba)
+            marcar_aba_alterada(aba)
+        return 0
+
+    with _lock, conectar_diario() as conexao:
+        conexao.executemany(
+            "UPDATE diario SET status = 'enviado', enviado_em = ?, ultimo_erro = NULL WHERE id = ?",
+            [(time.time(), i) for i in ids_lote]
+        )
+
+    marcar_aba_alterada(aba)
+    if aba == ABA_INSCRICOES_ATIVA:
+        primeira_linha = linha_da_resposta(resposta)
+        for deslocamento, dados in enumerate(lote):
+            linha = primeira_linha + deslocamento if primeira_linha else None
+            notificar_observadores_inscritos('inclusao', dados, linha)
+    else:
+        # Guarda e agregados acompanham só a temporada ativa
+        liberar_reservas(lote)
+    logging.info("Lote do diário enviado à planilha", extra={'aba': aba, 'tamanho_lote': len(lote)})
+    return len(lote)
+
+@st.cache_resource
+def iniciar_envio_em_segundo_plano():
+    """
+    Inicia (uma vez por processo) a thread que esvazia o diário. Ao iniciar,
+    as inscrições que ficaram pendentes antes de um reinício são reenviadas.
+    """
+    evento = threading.Event()
+
+    def executar():
+        # Pendentes de uma execução anterior voltam a ocupar a guarda até serem enviados
+        try:
+            with _lock, conectar_diario() as conexao:
+                pendentes = conexao.execute("SELECT dados FROM diario WHERE status = 'pendente'").fetchall()
+            reservar_inscricoes([json.loads(dados) for dados, in pendentes])
+        except Exception:
+            logging.exception("Erro ao reservar as inscrições pendentes do diário")
+        # Vagas de exclusões interrompidas por uma queda ainda chamam a lista de espera
+        try:
+            from utils.lista_espera import recuperar_vagas_anotadas
+            recuperar_vagas_anotadas()
+        except Exception:
+            logging.exception("Erro ao recuperar as vagas liberadas pendentes")
+        while True:
+            try:
+                # Esvazia o que estiver pronto; lotes cheios seguem sem esperar
+                while enviar_lote() >= TAMANHO_LOTE:
+                    pass
+            except Exception:
+                logging.exception("Erro no envio do diário de inscrições")
+            try:
+                from utils.modalidades import gravar_contagens_se_alteradas
+                gravar_contagens_se_alteradas()
+            except Exception:
+                logging.exception("Erro ao gravar as contagens na aba MODALIDADES")
+            evento.wait(INTERVALO_ENVIO)
+            evento.clear()
+
+    thread = threading.Thread(target=executar, name="envio-diario-inscricoes", daemon=True)
+    thread.start()
+    return evento
+
+def acordar_envio():
+    """Pede um envio imediato (sem esperar o intervalo)"""
+    iniciar_envio_em_segundo_plano().set()
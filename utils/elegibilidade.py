@@ -0,0 +1,219 @@
+# utils/elegibilidade.py
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.sheets import *
+from utils.modalidades import COLUNA_TURMAS_PERMITIDAS, carregar_modalidades_atualizadas, carregar_modalidades_completas
+
+# Regras de elegibilidade das modalidades, compiladas em arrays uma vez por
+# versão da aba MODALIDADES e avaliadas para uma turma inteira de uma vez
+# (matriz alunos × modalidades da unidade). Cada regra bloqueia quando:
+#   genero        a modalidade não é do gênero escolhido nem 'M / F'
+#   turma         a turma do aluno não está em Turmas_Permitidas (vazia = todas)
+#   vaga          Tem_Vaga é 'NÃO' ou não restam vagas (descontadas as já selecionadas)
+#   limite_aluno  o aluno já tem LIMITE_MODALIDADES_POR_ALUNO inscrições
+#   repetida      o aluno já está inscrito na modalidade
+GENERO_MISTO = 'M / F'
+MOTIVOS_BLOQUEIO = {
+    'inexistente': "modalidade não oferecida para a unidade e gênero",
+    'genero': "gênero incompatível com a modalidade",
+    'turma': "turma não permitida na modalidade",
+    'vaga': "modalidade sem vagas",
+    'limite_aluno': f"aluno já atingiu o limite de {LIMITE_MODALIDADES_POR_ALUNO} modalidades",
+    'repetida': "aluno já inscrito na modalidade",
+}
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def compilar_regras(versao, revisao=None):
+    """
+    Regras de todas as linhas da aba MODALIDADES na versão indicada. Com
+    `revisao` (dos contadores de inscrições e das reservas do diário), as vagas
+    são as calculadas pela aplicação. O resultado é compartilhado entre sessões
+    e não deve ser alterado.
+    """
+    if revisao is None:
+        df_modalidades = carregar_modalidades_completas(versao)
+    else:
+        df_modalidades = carregar_modalidades_atualizadas(versao)
+    if df_modalidades.empty:
+        df_modalidades = pd.DataFrame(columns=['Genero', 'Modalidade', 'Unidade', 'Tem_Vaga',
+                                               'Limite_Vagas', 'Inscritos', 'Vagas_Restantes'])
+    df_modalidades = df_modalidades.reset_index(drop=True)
+    n = len(df_modalidades)
+
+    def coluna(nome, padrao):
+        return df_modalidades[nome] if nome in df_modalidades.columns else pd.Series([padrao] * n, dtype=object)
+
+    vagas_restantes = pd.to_numeric(coluna('Vagas_Restantes', 0), errors='coerce').fillna(0).to_numpy(dtype=float)
+    sem_vaga = (coluna('Tem_Vaga', '').astype(str) == 'NÃO').to_numpy()
+    turmas_permitidas = [
+        frozenset(t.strip() for t in str(valor).split(',') if t.strip())
+        for valor in coluna(COLUNA_TURMAS_PERMITIDAS, '')
+    ]
+
+    # Opções no formato usado pela página de cadastro (montadas uma vez por versão)
+    opcoes = [
+        {
+            'texto': linha.Modalidade,
+            'modalidade': linha.Modalidade,
+            'genero': linha.Genero,
+            'unidade': linha.Unidade,
+            'limite_vagas': getattr(linha, 'Limite_Vagas', 0),
+            'inscritos': getattr(linha, 'Inscritos', 0),
+            'vagas_restantes': getattr(linha, 'Vagas_Restantes', 0),
+            'tem_vaga': linha.Tem_Vaga,
+        }
+        for linha in df_modalidades.itertuples(index=False)
+    ]
+
+    chaves = {}
+    for j, chave in enumerate(zip(df_modalidades['Unidade'], df_modalidades['Modalidade'], df_modalidades['Genero'])):
+        chaves.setdefault(chave, j)
+
+    return {
+        'versao': versao,
+        'revisao': revisao,
+        'unidade': df_modalidades['Unidade'].to_numpy(dtype=object),
+        'nomes': df_modalidades['Modalidade'].to_numpy(dtype=object),
+        'genero': df_modalidades['Genero'].to_numpy(dtype=object),
+        'vagas': np.where(sem_vaga, 0.0, vagas_restantes),
+        'turmas': turmas_permitidas,
+        'por_unidade': {unidade: np.asarray(indices) for unidade, indices
+                        in df_modalidades.groupby('Unidade', sort=False).indices.items()},
+        'chaves': chaves,
+        'opcoes': opcoes,
+    }
+
+def regras_atuais():
+    """Regras da versão atual da aba MODALIDADES (e das contagens e reservas, com VAGAS_CALCULADAS)"""
+    revisao = None
+    if VAGAS_CALCULADAS:
+        from utils.agregados import revisao_agregados
+        revisao = (revisao_agregados(), reservas_por_combinacao()[0])
+    return compilar_regras(obter_versao_aba('MODALIDADES'), revisao)
+
+def indices_unidade(regras, unidade):
+    """Posições (nas regras) das modalidades da unidade, na ordem da aba"""
+    return regras['por_unidade'].get(unidade, np.array([], dtype=np.int64))
+
+def mascara_genero(regras, indices, genero=None):
+    """Modalidades compatíveis com o gênero escolhido ('Todos' ou None = todas)"""
+    if not genero or genero == "Todos":
+        return np.ones(len(indices), dtype=bool)
+    generos = regras['genero'][indices]
+    return (generos == genero) | (generos == GENERO_MISTO)
+
+def avaliar_elegibilidade(regras, unidade, ras, turmas, registradas, vagas_utilizadas=None, genero=None):
+    """
+    Avalia todas as regras para os alunos de uma turma (ou qualquer lista de
+    alunos da unidade) contra as modalidades da unidade.
+    - ras, turmas: sequências alinhadas (um item por aluno)
+    - registradas: RA -> modalidades em que o aluno já está inscrito
+    - vagas_utilizadas: nome da modalidade -> vagas já tomadas por seleções ainda não gravadas
+    Retorna um dicionário com 'indices' e 'nomes' das modalidades (colunas),
+    'elegivel' (alunos × modalidades), 'bloqueios' (uma matriz por regra),
+    'vagas' restantes por modalidade e 'inscricoes_aluno' por aluno.
+    """
+    indices = indices_unidade(regras, unidade)
+    nomes = regras['nomes'][indices]
+    ras = np.asarray([str(ra).strip() for ra in ras], dtype=object)
+    turmas = np.asarray(turmas, dtype=object)
+    n, m = len(ras), len(indices)
+
+    vagas = regras['vagas'][indices]
+    if vagas_utilizadas:
+        vagas = vagas - np.array([vagas_utilizadas.get(nome, 0) for nome in nomes], dtype=float)
+
+    restricao_turma = np.zeros((n, m), dtype=bool)
+    for k, j in enumerate(indices):
+        if regras['turmas'][j]:
+            restricao_turma[:, k] = ~np.isin(turmas, list(regras['turmas'][j]))
+
+    # Inscrições existentes: matriz aluno × nome de modalidade, expandida para as colunas
+    codigos_nomes, nomes_unicos = pd.factorize(nomes)
+    pares = [(i, modalidade) for i, ra in enumerate(ras) for modalidade in registradas.get(ra, ())]
+    inscrito = np.zeros((n, len(nomes_unicos)), dtype=bool)
+    if pares:
+        linhas, modalidades = zip(*pares)
+        colunas = pd.Index(nomes_unicos).get_indexer(list(modalidades))
+        validas = colunas >= 0
+        inscrito[np.asarray(linhas)[validas], colunas[validas]] = True
+    inscricoes_aluno = np.fromiter((len(registradas.get(ra, ())) for ra in ras), dtype=np.int64, count=n)
+
+    bloqueios = {
+        'genero': np.broadcast_to(~mascara_genero(regras, indices, genero), (n, m)),
+        'turma': restricao_turma,
+        'vaga': np.broadcast_to(vagas <= 0, (n, m)),
+        'limite_aluno': np.broadcast_to((inscricoes_aluno >= LIMITE_MODALIDADES_POR_ALUNO)[:, None], (n, m)),
+        'repetida': inscrito[:, codigos_nomes] if m else np.zeros((n, 0), dtype=bool),
+    }
+    bloqueado = np.zeros((n, m), dtype=bool)
+    for mascara in bloqueios.values():
+        bloqueado |= mascara
+
+    return {
+        'indices': indices,
+        'nomes': nomes,
+        'elegivel': ~bloqueado,
+        'bloqueios': bloqueios,
+        'vagas': vagas,
+        'inscricoes_aluno': inscricoes_aluno,
+    }
+
+def modalidades_elegiveis(regras, elegibilidade, posicao_aluno, genero=None):
+    """Nomes das modalidades em que o aluno (posição na lista avaliada) pode se inscrever"""
+    mascara = elegibilidade['elegivel'][posicao_aluno] & mascara_genero(regras, elegibilidade['indices'], genero)
+    return list(dict.fromkeys(elegibilidade['nomes'][mascara]))
+
+def validar_inscricoes(regras, linhas):
+    """
+    Confere um lote de linhas no formato da aba INSCRITOS-UNIDADE (importações,
+    conferências, registro pela página) contra as regras da modalidade: existência
+    para a unidade e o gênero, turma permitida e vagas (contando o próprio lote).
+    Repetições e o limite por aluno ficam com a guarda de escrita da planilha.
+    Retorna, para cada linha, None se ela pode ser gravada ou o motivo da recusa.
+    """
+    if not linhas:
+        return []
+    unidades = [str(linha[0]).strip() for linha in linhas]
+    turmas = np.asarray([str(linha[3]).strip() for linha in linhas], dtype=object)
+    generos = [str(linha[4]).strip() for linha in linhas]
+    modalidades = [str(linha[5]).strip() for linha in linhas]
+
+    posicoes = np.fromiter(
+        (regras['chaves'].get(chave, -1) for chave in zip(unidades, modalidades, generos)),
+        dtype=np.int64, count=len(linhas)
+    )
+    existe = posicoes >= 0
+    posicoes_validas = np.where(existe, posicoes, 0)
+
+    # Vagas: a k-ésima linha do lote para a mesma modalidade precisa de k+1 vagas
+    ordem_no_lote = pd.Series(posicoes).groupby(posicoes).cumcount().to_numpy()
+    sem_vaga = existe & (ordem_no_lote >= regras['vagas'][posicoes_validas])
+
+    turma_bloqueada = np.zeros(len(linhas), dtype=bool)
+    for j in np.unique(posicoes[existe]):
+        if regras['turmas'][j]:
+            linhas_j = posicoes == j
+            turma_bloqueada[linhas_j] = ~np.isin(turmas[linhas_j], list(regras['turmas'][j]))
+
+    motivos = np.full(len(linhas), None, dtype=object)
+    motivos[sem_vaga] = MOTIVOS_BLOQUEIO['vaga']
+    motivos[existe & turma_bloqueada] = MOTIVOS_BLOQUEIO['turma']
+    motivos[~existe] = MOTIVOS_BLOQUEIO['inexistente']
+    return motivos.tolist()
+
+def modalidades_lotadas(regras, elegibilidade, posicao_aluno, genero=None):
+    """Modalidades que o aluno só não pode escolher por falta de vaga (candidatas à lista de espera)"""
+    outros_bloqueios = np.zeros(len(elegibilidade['indices']), dtype=bool)
+    for regra, mascara in elegibilidade['bloqueios'].items():
+        if regra != 'vaga':
+            outros_bloqueios |= mascara[posicao_aluno]
+    lotadas = (elegibilidade['bloqueios']['vaga'][posicao_aluno] & ~outros_bloqueios
+               & mascara_genero(regras, elegibilidade['indices'], genero))
+    opcoes, vistas = [], set()
+    for j in elegibilidade['indices'][lotadas]:
+        if regras['nomes'][j] not in vistas:
+            vistas.add(regras['nomes'][j])
+            opcoes.append(regras['opcoes'][j])
+    return opcoes
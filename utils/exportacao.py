@@ -0,0 +1,87 @@
+# utils/exportacao.py
+import io
+import importlib.util
+import streamlit as st
+import pandas as pd
+from utils.inscritos import filtrar_inscritos
+
+# Quantidade de linhas escritas por bloco (evita montar o arquivo inteiro como uma
+# única string antes da escrita). O arquivo pronto fica em memória: o
+# st.download_button do Streamlit 1.47 recebe bytes, não um gerador.
+TAMANHO_BLOCO = 5000
+
+# Formatos suportados: extensão, MIME e biblioteca opcional necessária
+FORMATOS_EXPORTACAO = {
+    'CSV': {'extensao': 'csv', 'mime': 'text/csv', 'dependencia': None},
+    'Parquet': {'extensao': 'parquet', 'mime': 'application/vnd.apache.parquet', 'dependencia': 'pyarrow'},
+    'XLSX': {'extensao': 'xlsx',
+             'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+             'dependencia': 'openpyxl'},
+}
+
+def formatos_disponiveis():
+    """Lista os formatos cuja biblioteca opcional está instalada"""
+    return [
+        nome for nome, info in FORMATOS_EXPORTACAO.items()
+        if info['dependencia'] is None or importlib.util.find_spec(info['dependencia']) is not None
+    ]
+
+def iterar_blocos(df, tamanho_bloco=TAMANHO_BLOCO):
+    """Percorre o DataFrame em blocos de linhas"""
+    for inicio in range(0, len(df), tamanho_bloco):
+        yield df.iloc[inicio:inicio + tamanho_bloco]
+
+def escrever_csv(df, destino):
+    """Escreve o CSV bloco a bloco (UTF-8 com BOM, compatível com o Excel)"""
+    texto = io.TextIOWrapper(destino, encoding='utf-8-sig', newline='')
+    df.head(0).to_csv(texto, index=False)
+    for bloco in iterar_blocos(df):
+        bloco.to_csv(texto, index=False, header=False)
+    texto.flush()
+    texto.detach()
+
+def escrever_parquet(df, destino):
+    """Escreve o Parquet com um row group por bloco"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(destino, schema) as writer:
+        for bloco in iterar_blocos(df):
+            writer.write_table(pa.Table.from_pandas(bloco, schema=schema, preserve_index=False))
+
+def escrever_xlsx(df, destino):
+    """Escreve a planilha XLSX bloco a bloco"""
+    with pd.ExcelWriter(destino, engine='openpyxl') as writer:
+        df.head(0).to_excel(writer, index=False, sheet_name='Inscritos')
+        linha_inicial = 1
+        for bloco in iterar_blocos(df):
+            bloco.to_excel(writer, index=False, header=False, sheet_name='Inscritos', startrow=linha_inicial)
+            linha_inicial += len(bloco)
+
+ESCRITORES = {
+    'CSV': escrever_csv,
+    'Parquet': escrever_parquet,
+    'XLSX': escrever_xlsx,
+}
+
+def gerar_arquivo(df, formato):
+    """Gera o conteúdo (bytes) do arquivo no formato pedido"""
+    destino = io.BytesIO()
+    ESCRITORES[formato](df, destino)
+    return destino.getvalue()
+
+@st.cache_data(ttl=600, max_entries=32, show_spinner="Gerando arquivo de exportação...")
+def gerar_arquivo_exportacao(formato, unidade, modalidade, genero, versao):
+    """
+    Gera o arquivo de exportação da visão filtrada.
+    O cache é indexado por (formato, filtros, versão dos dados), então exportar
+    novamente a mesma visão não refaz o arquivo.
+    """
+    df_filtrado = filtrar_inscritos(unidade, modalidade, genero, versao)
+    return gerar_arquivo(df_filtrado, formato)
+
+def nome_arquivo_exportacao(formato, prefixo="registros_todas_unidades"):
+    """Monta o nome do arquivo com a data atual e a extensão do formato"""
+    extensao = FORMATOS_EXPORTACAO[formato]['extensao']
+    return f"{prefixo}_{pd.Timestamp.now().strftime('%Y%m%d')}.{extensao}"
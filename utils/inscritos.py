@@ -0,0 +1,117 @@
+# utils/inscritos.py
+import streamlit as st
+import pandas as pd
+from utils.sheets import *
+
+# Colunas da aba INSCRITOS-UNIDADE (A até I)
+COLUNAS_INSCRITOS = ['Unidade', 'Nome Aluno', 'RA Aluno', 'Turma Aluno', 'Genero Modalidade',
+                     'Modalidade', 'Unidade Modalidade', 'Data/Hora', 'Usuario']
+
+def padronizar_colunas_inscritos(df_inscritos):
+    """Padroniza os nomes das colunas da aba INSCRITOS-UNIDADE (vazia se faltam as 6 essenciais)"""
+    if len(df_inscritos.columns) < 6:
+        return pd.DataFrame(columns=COLUNAS_INSCRITOS)
+    if len(df_inscritos.columns) >= 9:
+        df_inscritos = df_inscritos.iloc[:, :9]
+        df_inscritos.columns = COLUNAS_INSCRITOS
+    else:
+        # Preenche colunas faltantes
+        colunas_base = COLUNAS_INSCRITOS[:6]
+        colunas_extras = COLUNAS_INSCRITOS[6:][:len(df_inscritos.columns)-6]
+        df_inscritos.columns = colunas_base + colunas_extras
+    return df_inscritos
+
+def carregar_inscritos_padronizados(temporadas=None):
+    """
+    Carrega as inscrições já com as colunas padronizadas. Sem `temporadas`, lê só
+    a aba ativa (INSCRITOS-UNIDADE); com uma lista de anos, lê apenas as
+    partições dessas temporadas (aba ativa e/ou abas de arquivo).
+    """
+    lidas = [load_full_sheet_as_df(aba) for aba in abas_das_temporadas(temporadas)]
+    partes = [padronizar_colunas_inscritos(df_aba) for df_aba in lidas if not df_aba.empty]
+    if not partes:
+        return lidas[0] if lidas else pd.DataFrame()
+    return partes[0] if len(partes) == 1 else pd.concat(partes, ignore_index=True)
+
+@st.cache_data(ttl=600, max_entries=64, show_spinner=False)
+def carregar_inscritos_unidade(unidade, versao):
+    """
+    Inscrições de uma unidade, já padronizadas, sem baixar a aba inteira: o
+    índice de faixas por unidade diz quais linhas ler e um único batch_get traz
+    só essas faixas. Se o vigia já leu a aba nesta versão, filtra essa leitura
+    sem chamar a API. O índice do DataFrame é a linha da planilha - 2, como em
+    load_full_sheet_as_df. O parâmetro `versao` faz parte da chave do cache.
+    """
+    unidade = str(unidade).strip()
+    valores = leitura_em_memoria(ABA_INSCRICOES_ATIVA, versao)
+    if valores is not None:
+        linhas = list(enumerate(valores[1:]))
+    else:
+        faixas = agrupar_faixas(faixas_da_unidade(unidade))
+        linhas = []
+        if faixas:
+            ws = get_ws(ABA_INSCRICOES_ATIVA)
+            if not ws:
+                return pd.DataFrame(columns=COLUNAS_INSCRITOS)
+            ultima_coluna = chr(ord('A') + len(COLUNAS_INSCRITOS) - 1)
+            blocos = ws.batch_get([f"A{inicio}:{ultima_coluna}{fim}" for inicio, fim in faixas])
+            for (inicio, _), bloco in zip(faixas, blocos):
+                linhas += [(inicio - 2 + deslocamento, linha) for deslocamento, linha in enumerate(bloco)]
+
+    # Descarta linhas de outras unidades (faixas unidas ou aba alterada durante a leitura)
+    largura = len(COLUNAS_INSCRITOS)
+    linhas = [(i, (list(linha) + [''] * largura)[:largura]) for i, linha in linhas
+              if linha and str(linha[0]).strip() == unidade]
+    if not linhas:
+        return pd.DataFrame(columns=COLUNAS_INSCRITOS)
+    indices, dados = zip(*linhas)
+    return pd.DataFrame(list(dados), columns=COLUNAS_INSCRITOS, index=list(indices))
+
+def contar_inscricoes_por_temporada(df_inscritos):
+    """Quantidade de inscrições por temporada (ano da Data/Hora; sem data = temporada ativa)"""
+    if df_inscritos.empty or 'Data/Hora' not in df_inscritos.columns:
+        return pd.Series(dtype='int64')
+    anos = df_inscritos['Data/Hora'].astype(str).str.extract(r'^\s*\d{1,2}/\d{1,2}/(\d{4})')[0]
+    return pd.to_numeric(anos, errors='coerce').fillna(temporada_ativa()).astype(int).value_counts().sort_index()
+
+@st.cache_data(ttl=600, max_entries=64, show_spinner=False)
+def filtrar_inscritos(unidade, modalidade, genero, versao):
+    """
+    Retorna as inscrições filtradas por unidade, modalidade e gênero.
+    O parâmetro `versao` (de obter_versao_aba) faz parte da chave do cache,
+    então uma escrita na aba invalida as visões já calculadas.
+    """
+    df_inscritos = carregar_inscritos_padronizados()
+    if df_inscritos.empty:
+        return df_inscritos
+
+    mascara = pd.Series(True, index=df_inscritos.index)
+    if unidade != "Todas":
+        mascara &= df_inscritos['Unidade'] == unidade
+    if modalidade != "Todas":
+        mascara &= df_inscritos['Modalidade'] == modalidade
+    if genero != "Todos":
+        mascara &= df_inscritos['Genero Modalidade'] == genero
+
+    return df_inscritos[mascara]
+
+@st.cache_data(ttl=600, show_spinner=False)
+def opcoes_filtros_inscritos(versao):
+    """Retorna as listas ordenadas de unidades, modalidades e gêneros para os filtros"""
+    df_inscritos = carregar_inscritos_padronizados()
+    if df_inscritos.empty:
+        return [], [], []
+    return (
+        sorted(df_inscritos['Unidade'].dropna().unique()),
+        sorted(df_inscritos['Modalidade'].dropna().unique()),
+        sorted(df_inscritos['Genero Modalidade'].dropna().unique())
+    )
+
+def paginar(df, pagina, tamanho_pagina):
+    """Retorna apenas as linhas da página pedida (páginas começam em 1)"""
+    inicio = (pagina - 1) * tamanho_pagina
+    return df.iloc[inicio:inicio + tamanho_pagina]
+
+def total_paginas(total_linhas, tamanho_pagina):
+    """Quantidade de páginas necessárias para exibir todas as linhas"""
+    return max(1, -(-total_linhas // tamanho_pagina))
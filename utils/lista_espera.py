@@ -0,0 +1,280 @@
+# utils/lista_espera.py
+import heapq
+import json
+import logging
+import threading
+import time
+from collections import Counter
+import streamlit as st
+import pandas as pd
+from utils.sheets import chave_inscricao, liberar_reservas, localizar_linha_inscricao, reservar_inscricoes
+from utils.diario_inscricoes import acordar_envio, conectar_diario, gravar_no_diario
+from utils.elegibilidade import MOTIVOS_BLOQUEIO, regras_atuais, validar_inscricoes
+
+# Lista de espera das modalidades lotadas. Cada vaga é de uma linha da aba
+# MODALIDADES, então a fila é por (unidade, modalidade, gênero), ordenada pela
+# hora do pedido. Os pedidos ficam no mesmo SQLite do diário de inscrições; em
+# memória cada fila é um heap, e promover o próximo aluno custa O(log n).
+STATUS_AGUARDANDO = 'aguardando'
+# Vagas anotadas antes deste instante são de um processo anterior (recuperação)
+_INICIO_PROCESSO = time.time()
+
+def _conectar():
+    conexao = conectar_diario()
+    conexao.execute("""
+        CREATE TABLE IF NOT EXISTS espera (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            unidade TEXT NOT NULL,
+            modalidade TEXT NOT NULL,
+            genero TEXT NOT NULL,
+            ra TEXT NOT NULL,
+            dados TEXT NOT NULL,
+            pedido_em REAL NOT NULL,
+            status TEXT NOT NULL DEFAULT 'aguardando',
+            resolvido_em REAL,
+            motivo TEXT
+        )
+    """)
+    # Um aluno só pode aguardar uma vez por modalidade (o índice também atende a consulta por RA)
+    conexao.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS espera_aguardando_unico
+        ON espera (ra, modalidade) WHERE status = 'aguardando'
+    """)
+    # Vagas de inscrições excluídas, anotadas antes da exclusão na planilha e
+    # baixadas na mesma transação que grava as promoções no diário
+    conexao.execute("""
+        CREATE TABLE IF NOT EXISTS vagas_liberadas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            dados TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'anotada',
+            criado_em REAL NOT NULL,
+            resolvido_em REAL
+        )
+    """)
+    conexao.execute("""
+        CREATE INDEX IF NOT EXISTS vagas_anotadas
+        ON vagas_liberadas (criado_em) WHERE status = 'anotada'
+    """)
+    return conexao
+
+def _chave_fila(dados):
+    """(unidade, modalidade, gênero) de uma linha no formato da aba INSCRITOS-UNIDADE"""
+    return str(dados[0]).strip(), str(dados[5]).strip(), str(dados[4]).strip()
+
+@st.cache_resource
+def _estado_espera():
+    """Filas em memória (heaps de (pedido_em, id, dados)) e os ids ainda aguardando"""
+    return {'lock': threading.Lock(), 'filas': None, 'aguardando': set()}
+
+def _garantir_filas(estado):
+    """Monta os heaps a partir do diário na primeira vez (chamado com o lock adquirido)"""
+    if estado['filas'] is not None:
+        return
+    with _conectar() as conexao:
+        linhas = conexao.execute(
+            "SELECT id, dados, pedido_em FROM espera WHERE status = ?", (STATUS_AGUARDANDO,)
+        ).fetchall()
+    filas = {}
+    for id_espera, dados_json, pedido_em in linhas:
+        dados = json.loads(dados_json)
+        filas.setdefault(_chave_fila(dados), []).append((pedido_em, id_espera, dados))
+    for fila in filas.values():
+        heapq.heapify(fila)
+    estado['filas'] = filas
+    estado['aguardando'] = {id_espera for id_espera, _, _ in linhas}
+
+def entrar_na_espera(linhas):
+    """
+    Coloca inscrições (linhas no formato da aba INSCRITOS-UNIDADE) na lista de
+    espera. Pedidos repetidos do mesmo aluno na mesma modalidade são ignorados.
+    Retorna quantos pedidos entraram.
+    """
+    estado = _estado_espera()
+    agora = time.time()
+    adicionados = 0
+    with estado['lock']:
+        _garantir_filas(estado)
+        with _conectar() as conexao:
+            for dados in linhas:
+                unidade, modalidade, genero = _chave_fila(dados)
+                cursor = conexao.execute(
+                    "INSERT OR IGNORE INTO espera (unidade, modalidade, genero, ra, dados, pedido_em) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (unidade, modalidade, genero, str(dados[2]).strip(), json.dumps(dados, ensure_ascii=False), agora)
+                )
+                if cursor.rowcount == 1:
+                    heapq.heappush(estado['filas'].setdefault((unidade, modalidade, genero), []),
+                                   (agora, cursor.lastrowid, dados))
+                    estado['aguardando'].add(cursor.lastrowid)
+                    adicionados += 1
+    logging.info("Pedidos na lista de espera", extra={'adicionados': adicionados})
+    return adicionados
+
+def _resolver(conexao, ids_status):
+    """Grava o desfecho dos pedidos, lista de (id, status, motivo), na transação de quem chama"""
+    agora = time.time()
+    conexao.executemany(
+        "UPDATE espera SET status = ?, motivo = ?, resolvido_em = ? WHERE id = ?",
+        [(status, motivo, agora, id_espera) for id_espera, status, motivo in ids_status]
+    )
+
+def cancelar_espera(ra, modalidade):
+    """Retira o pedido do aluno (a entrada do heap é descartada quando chegar ao topo)"""
+    estado = _estado_espera()
+    with estado['lock']:
+        _garantir_filas(estado)
+        with _conectar() as conexao:
+            ids = [linha[0] for linha in conexao.execute(
+                "SELECT id FROM espera WHERE ra = ? AND modalidade = ? AND status = ?",
+                (str(ra).strip(), str(modalidade).strip(), STATUS_AGUARDANDO)
+            )]
+            _resolver(conexao, [(id_espera, 'cancelado', 'cancelado pelo coordenador') for id_espera in ids])
+        estado['aguardando'].difference_update(ids)
+    return len(ids)
+
+def anotar_vagas_liberadas(dados_excluidos):
+    """
+    Anota as vagas das inscrições que vão ser excluídas, antes da exclusão na
+    planilha. Retorna os ids, na mesma ordem, para promover_apos_exclusoes.
+    """
+    agora = time.time()
+    with _conectar() as conexao:
+        return [
+            conexao.execute("INSERT INTO vagas_liberadas (dados, criado_em) VALUES (?, ?)",
+                            (json.dumps(dados, ensure_ascii=False), agora)).lastrowid
+            for dados in dados_excluidos
+        ]
+
+def promover_apos_exclusoes(ids_liberadas, ids_mantidas=()):
+    """
+    Ocupa as vagas das exclusões que deram certo (ids_liberadas) com os primeiros
+    da fila de cada (unidade, modalidade, gênero); as vagas de exclusões que
+    falharam (ids_mantidas) só recebem baixa. Promoções, desfechos da fila e
+    baixa das vagas vão para o diário em uma única transação: uma queda no meio
+    não deixa vaga liberada sem promoção nem promove duas vezes. Cada promoção
+    passa pela mesma conferência do cadastro: quem as regras da modalidade
+    (turma permitida, modalidade ainda oferecida) ou a guarda (já inscrito, limite
+    de modalidades) recusarem sai da fila e o próximo é chamado. Se a vaga não
+    chegou a abrir (limite já excedido), o pedido continua na fila. Retorna as
+    linhas promovidas.
+    """
+    ids_liberadas = set(ids_liberadas)
+    ids = list(ids_liberadas) + list(ids_mantidas)
+    if not ids:
+        return []
+    with _conectar() as conexao:
+        anotadas = dict(conexao.execute(
+            f"SELECT id, dados FROM vagas_liberadas WHERE status = 'anotada' AND id IN ({','.join('?' * len(ids))})",
+            ids
+        ).fetchall())
+    vagas = Counter(_chave_fila(json.loads(anotadas[i])) for i in ids_liberadas if i in anotadas)
+
+    estado = _estado_espera()
+    promovidas, chamados, reservadas, desfechos = [], [], [], []
+    with estado['lock']:
+        _garantir_filas(estado)
+        try:
+            while vagas:
+                # Próximos da fila para cada vaga livre (entradas canceladas são descartadas)
+                lote = []
+                for chave, quantidade in list(vagas.items()):
+                    fila = estado['filas'].get(chave, [])
+                    chamados_fila = 0
+                    while chamados_fila < quantidade and fila:
+                        pedido_em, id_espera, dados = heapq.heappop(fila)
+                        if id_espera in estado['aguardando']:
+                            lote.append((chave, pedido_em, id_espera, dados))
+                            chamados_fila += 1
+                    if chamados_fila == 0:
+                        del vagas[chave]
+                if not lote:
+                    break
+
+                agora = pd.Timestamp.now().strftime("%d/%m/%Y %H:%M:%S")
+                linhas = [list(dados[:7]) + [agora] + list(dados[8:9]) for _, _, _, dados in lote]
+                # Regras relidas a cada rodada: as reservas da rodada anterior já ocupam vaga
+                motivos = validar_inscricoes(regras_atuais(), linhas)
+                aceitas, rejeitadas = reservar_inscricoes(
+                    [linha for linha, motivo in zip(linhas, motivos) if motivo is None]
+                )
+                reservadas.extend(aceitas)
+                recusadas = {id(linha): motivo for linha, motivo in rejeitadas}
+
+                for (chave, pedido_em, id_espera, dados), linha, motivo in zip(lote, linhas, motivos):
+                    if motivo == MOTIVOS_BLOQUEIO['vaga']:
+                        heapq.heappush(estado['filas'][chave], (pedido_em, id_espera, dados))
+                        vagas.pop(chave, None)
+                        continue
+                    chamados.append((chave, pedido_em, id_espera, dados))
+                    if motivo is not None or id(linha) in recusadas:
+                        desfechos.append((id_espera, 'descartado', motivo or recusadas[id(linha)]))
+                    else:
+                        desfechos.append((id_espera, 'promovido', None))
+                        promovidas.append(linha)
+                        vagas[chave] -= 1
+                        if vagas[chave] <= 0:
+                            del vagas[chave]
+
+            agora = time.time()
+            with _conectar() as conexao:
+                gravar_no_diario(conexao, promovidas)
+                _resolver(conexao, desfechos)
+                conexao.executemany(
+                    "UPDATE vagas_liberadas SET status = ?, resolvido_em = ? WHERE id = ?",
+                    [('promovida' if i in ids_liberadas else 'mantida', agora, i) for i in ids if i in anotadas]
+                )
+        except Exception:
+            # Nada foi gravado: reservas desfeitas e os pedidos voltam para as filas
+            liberar_reservas(reservadas)
+            for chave, pedido_em, id_espera, dados in chamados:
+                heapq.heappush(estado['filas'][chave], (pedido_em, id_espera, dados))
+            raise
+        estado['aguardando'].difference_update(id_espera for id_espera, _, _ in desfechos)
+
+    if promovidas:
+        acordar_envio()
+        logging.info("Alunos promovidos da lista de espera", extra={'promovidos': len(promovidas)})
+    return promovidas
+
+def recuperar_vagas_anotadas():
+    """
+    Conclui as vagas anotadas por um processo anterior que caiu entre a
+    exclusão e a promoção: a vaga só conta se a inscrição não está mais na planilha
+    """
+    with _conectar() as conexao:
+        anotadas = conexao.execute(
+            "SELECT id, dados FROM vagas_liberadas WHERE status = 'anotada' AND criado_em < ?",
+            (_INICIO_PROCESSO,)
+        ).fetchall()
+    if not anotadas:
+        return []
+    liberadas, mantidas = [], []
+    for id_vaga, dados_json in anotadas:
+        if localizar_linha_inscricao(chave_inscricao(json.loads(dados_json))) is None:
+            liberadas.append(id_vaga)
+        else:
+            mantidas.append(id_vaga)
+    logging.info("Vagas anotadas recuperadas", extra={'liberadas': len(liberadas), 'mantidas': len(mantidas)})
+    return promover_apos_exclusoes(liberadas, mantidas)
+
+def situacao_espera():
+    """Tabela com quantos alunos aguardam em cada (unidade, modalidade, gênero)"""
+    estado = _estado_espera()
+    with estado['lock']:
+        _garantir_filas(estado)
+        contagens = [
+            (unidade, modalidade, genero, sum(1 for _, id_espera, _ in fila if id_espera in estado['aguardando']))
+            for (unidade, modalidade, genero), fila in estado['filas'].items()
+        ]
+    df = pd.DataFrame(contagens, columns=['Unidade', 'Modalidade', 'Genero', 'Aguardando'])
+    return df[df['Aguardando'] > 0].sort_values(['Unidade', 'Modalidade', 'Genero']).reset_index(drop=True)
+
+def pedidos_aguardando(ra):
+    """Modalidades em que o aluno está na lista de espera (consulta pelo índice de RA)"""
+    with _conectar() as conexao:
+        linhas = conexao.execute(
+            # status literal: só assim o SQLite usa o índice parcial
+            "SELECT modalidade FROM espera WHERE ra = ? AND status = 'aguardando' ORDER BY modalidade",
+            (str(ra).strip(),)
+        ).fetchall()
+    return [modalidade for modalidade, in linhas]
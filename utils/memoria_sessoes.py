@@ -0,0 +1,105 @@
+# utils/memoria_sessoes.py
+import sys
+import threading
+import time
+import streamlit as st
+
+# Intervalo mínimo entre duas medições da mesma sessão (a medição percorre todo o estado)
+INTERVALO_MEDICAO_SEGUNDOS = 30
+# Sessões sem rerun há mais tempo que isso saem do registro
+VALIDADE_REGISTRO_SEGUNDOS = 3600
+
+def tamanho_profundo(obj, vistos=None):
+    """Tamanho aproximado em bytes de um objeto e de tudo o que ele referencia"""
+    if vistos is None:
+        vistos = set()
+    if id(obj) in vistos:
+        return 0
+    vistos.add(id(obj))
+
+    # DataFrames e Series informam o próprio uso de memória (inclusive strings)
+    uso_memoria = getattr(obj, 'memory_usage', None)
+    if callable(uso_memoria) and hasattr(obj, 'dtypes'):
+        try:
+            total = uso_memoria(deep=True)
+            return int(total.sum() if hasattr(total, 'sum') else total)
+        except Exception:
+            pass
+
+    tamanho = sys.getsizeof(obj, 0)
+    if isinstance(obj, dict):
+        tamanho += sum(tamanho_profundo(k, vistos) + tamanho_profundo(v, vistos) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        tamanho += sum(tamanho_profundo(item, vistos) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        tamanho += tamanho_profundo(vars(obj), vistos)
+    return tamanho
+
+def relatorio_sessao(estado=None):
+    """Tabela com o tamanho de cada chave do estado da sessão (maiores primeiro)"""
+    import pandas as pd
+
+    itens = (estado if estado is not None else st.session_state.to_dict()).items()
+    linhas = [
+        {'Chave': str(chave), 'Tipo': type(valor).__name__, 'Bytes': tamanho_profundo(valor)}
+        for chave, valor in itens
+    ]
+    df = pd.DataFrame(linhas, columns=['Chave', 'Tipo', 'Bytes'])
+    return df.sort_values('Bytes', ascending=False).reset_index(drop=True)
+
+# ------------------------------------------------------------
+# Registro das sessões do processo
+# ------------------------------------------------------------
+@st.cache_resource
+def _estado_sessoes():
+    return {'lock': threading.Lock(), 'sessoes': {}}
+
+def registrar_memoria_sessao():
+    """Mede o estado da sessão atual (no máximo a cada INTERVALO_MEDICAO_SEGUNDOS) e guarda no registro"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    registro = _estado_sessoes()
+    agora = time.time()
+    anterior = registro['sessoes'].get(ctx.session_id)
+    if anterior is not None and agora - anterior['medido_em'] < INTERVALO_MEDICAO_SEGUNDOS:
+        anterior['visto_em'] = agora
+        return
+
+    estado = st.session_state.to_dict()
+    user_info = estado.get('user_info') or {}
+    medicao = {
+        'unidade': user_info.get('unidade'),
+        'pagina': estado.get('pagina_atual'),
+        'chaves': len(estado),
+        'bytes': sum(tamanho_profundo(valor) for valor in estado.values()),
+        'medido_em': agora,
+        'visto_em': agora,
+    }
+    with registro['lock']:
+        registro['sessoes'][ctx.session_id] = medicao
+        for sessao, dados in list(registro['sessoes'].items()):
+            if agora - dados['visto_em'] > VALIDADE_REGISTRO_SEGUNDOS:
+                del registro['sessoes'][sessao]
+
+def relatorio_sessoes():
+    """Tabela com a última medição de cada sessão ativa do processo"""
+    import pandas as pd
+
+    registro = _estado_sessoes()
+    with registro['lock']:
+        linhas = [
+            {
+                'Sessão': sessao[:8],
+                'Unidade': dados['unidade'],
+                'Página': dados['pagina'],
+                'Chaves': dados['chaves'],
+                'Memória (KB)': round(dados['bytes'] / 1024, 1),
+                'Medido há (s)': round(time.time() - dados['medido_em']),
+            }
+            for sessao, dados in registro['sessoes'].items()
+        ]
+    df = pd.DataFrame(linhas, columns=['Sessão', 'Unidade', 'Página', 'Chaves', 'Memória (KB)', 'Medido há (s)'])
+    return df.sort_values('Memória (KB)', ascending=False).reset_index(drop=True)
@@ -0,0 +1,189 @@
+# utils/metricas.py
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+# Limites (em segundos) dos buckets do histograma de latência das chamadas à API
+BUCKETS_LATENCIA = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Registro de métricas do processo (compartilhado entre sessões)
+_lock = threading.Lock()
+_chamadas = Counter()                 # (aba, operacao, pagina) -> quantidade
+_erros = Counter()                    # (aba, operacao, pagina) -> quantidade
+_duracao_total = Counter()            # (aba, operacao, pagina) -> segundos
+_histograma = defaultdict(Counter)    # (aba, operacao, pagina) -> {bucket: quantidade}
+_leituras_cache = Counter()           # (aba, 'chamada' | 'falha') -> quantidade
+_inicio_processo = time.time()
+
+def pagina_atual():
+    """Página que originou a chamada (lida da sessão; fora de uma sessão, 'segundo_plano')"""
+    try:
+        import streamlit as st
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        if get_script_run_ctx() is None:
+            return 'segundo_plano'
+        if not st.session_state.get('autenticado'):
+            return 'Login'
+        return st.session_state.get('pagina_atual', 'Cadastro')
+    except Exception:
+        return 'segundo_plano'
+
+def registrar_chamada_api(aba, operacao, duracao, pagina=None, erro=False):
+    """Contabiliza uma chamada à API do Google"""
+    chave = (aba, operacao, pagina or pagina_atual())
+    with _lock:
+        _chamadas[chave] += 1
+        _duracao_total[chave] += duracao
+        if erro:
+            _erros[chave] += 1
+        for limite in BUCKETS_LATENCIA:
+            if duracao <= limite:
+                _histograma[chave][limite] += 1
+                break
+        else:
+            _histograma[chave][float('inf')] += 1
+
+@contextmanager
+def medir_chamada_api(aba, operacao):
+    """Mede o tempo de um trecho que chama a API e registra o resultado (inclusive erros)"""
+    pagina = pagina_atual()
+    inicio = time.perf_counter()
+    erro = False
+    try:
+        yield
+    except Exception:
+        erro = True
+        raise
+    finally:
+        registrar_chamada_api(aba, operacao, time.perf_counter() - inicio, pagina, erro)
+
+def registrar_chamada_leitura(aba):
+    """Conta uma chamada a load_full_sheet_as_df (acertos = chamadas - falhas)"""
+    with _lock:
+        _leituras_cache[(aba, 'chamada')] += 1
+
+def registrar_falha_cache(aba):
+    """Conta uma leitura que não estava em cache e precisou ir à API"""
+    with _lock:
+        _leituras_cache[(aba, 'falha')] += 1
+
+def _leituras_consolidadas():
+    """Converte as contagens de chamadas/falhas em acertos/falhas por aba"""
+    resultado = {}
+    abas = {aba for aba, _ in _leituras_cache}
+    for aba in abas:
+        chamadas = _leituras_cache[(aba, 'chamada')]
+        falhas = _leituras_cache[(aba, 'falha')]
+        resultado[aba] = {'acertos': max(chamadas - falhas, 0), 'falhas': falhas}
+    return resultado
+
+def _rotulos(**valores):
+    """Formata os rótulos no padrão do Prometheus"""
+    partes = []
+    for nome, valor in valores.items():
+        texto = str(valor).replace('\\', '\\\\').replace('"', '\\"')
+        partes.append(f'{nome}="{texto}"')
+    return '{' + ','.join(partes) + '}'
+
+def exportar_prometheus():
+    """Gera as métricas no formato texto de exposição do Prometheus"""
+    with _lock:
+        chamadas = dict(_chamadas)
+        erros = dict(_erros)
+        duracoes = dict(_duracao_total)
+        histogramas = {chave: dict(buckets) for chave, buckets in _histograma.items()}
+        leituras = _leituras_consolidadas()
+
+    linhas = [
+        '# HELP interclasse_sheets_chamadas_total Chamadas à API do Google Sheets.',
+        '# TYPE interclasse_sheets_chamadas_total counter',
+    ]
+    for (aba, operacao, pagina), n in sorted(chamadas.items()):
+        linhas.append(f"interclasse_sheets_chamadas_total{_rotulos(aba=aba, operacao=operacao, pagina=pagina)} {n}")
+
+    linhas += [
+        '# HELP interclasse_sheets_erros_total Chamadas à API do Google Sheets que falharam.',
+        '# TYPE interclasse_sheets_erros_total counter',
+    ]
+    for (aba, operacao, pagina), n in sorted(erros.items()):
+        linhas.append(f"interclasse_sheets_erros_total{_rotulos(aba=aba, operacao=operacao, pagina=pagina)} {n}")
+
+    linhas += [
+        '# HELP interclasse_sheets_duracao_segundos Latência das chamadas à API do Google Sheets.',
+        '# TYPE interclasse_sheets_duracao_segundos histogram',
+    ]
+    for chave in sorted(chamadas):
+        aba, operacao, pagina = chave
+        acumulado = 0
+        for limite in BUCKETS_LATENCIA + (float('inf'),):
+            acumulado += histogramas.get(chave, {}).get(limite, 0)
+            le = '+Inf' if limite == float('inf') else f"{limite:g}"
+            linhas.append(
+                f"interclasse_sheets_duracao_segundos_bucket"
+                f"{_rotulos(aba=aba, operacao=operacao, pagina=pagina, le=le)} {acumulado}"
+            )
+        rotulos = _rotulos(aba=aba, operacao=operacao, pagina=pagina)
+        linhas.append(f"interclasse_sheets_duracao_segundos_sum{rotulos} {duracoes.get(chave, 0.0):.6f}")
+        linhas.append(f"interclasse_sheets_duracao_segundos_count{rotulos} {chamadas[chave]}")
+
+    linhas += [
+        '# HELP interclasse_cache_leituras_total Leituras de abas via load_full_sheet_as_df.',
+        '# TYPE interclasse_cache_leituras_total counter',
+    ]
+    for aba, dados in sorted(leituras.items()):
+        linhas.append(f"interclasse_cache_leituras_total{_rotulos(aba=aba, resultado='acerto')} {dados['acertos']}")
+        linhas.append(f"interclasse_cache_leituras_total{_rotulos(aba=aba, resultado='falha')} {dados['falhas']}")
+
+    linhas += [
+        '# HELP interclasse_processo_inicio_segundos Momento de início do processo (epoch).',
+        '# TYPE interclasse_processo_inicio_segundos gauge',
+        f"interclasse_processo_inicio_segundos {_inicio_processo:.0f}",
+    ]
+    return '\n'.join(linhas) + '\n'
+
+def resumo_chamadas_api():
+    """Tabela com chamadas, erros e latência média por aba, operação e página"""
+    import pandas as pd
+
+    with _lock:
+        linhas = [
+            {
+                'Aba': aba,
+                'Operação': operacao,
+                'Página': pagina,
+                'Chamadas': n,
+                'Erros': _erros.get((aba, operacao, pagina), 0),
+                'Tempo total (s)': round(_duracao_total[(aba, operacao, pagina)], 3),
+                'Tempo médio (ms)': round(_duracao_total[(aba, operacao, pagina)] / n * 1000, 1),
+            }
+            for (aba, operacao, pagina), n in _chamadas.items()
+        ]
+    return pd.DataFrame(linhas)
+
+def resumo_cache_leituras():
+    """Tabela com acertos e falhas de cache por aba"""
+    import pandas as pd
+
+    with _lock:
+        leituras = _leituras_consolidadas()
+    linhas = [
+        {
+            'Aba': aba,
+            'Acertos': dados['acertos'],
+            'Falhas': dados['falhas'],
+            'Taxa de acerto': dados['acertos'] / (dados['acertos'] + dados['falhas'])
+            if dados['acertos'] + dados['falhas'] else 0.0,
+        }
+        for aba, dados in sorted(leituras.items())
+    ]
+    return pd.DataFrame(linhas)
+
+def zerar_metricas():
+    """Zera todas as métricas do processo"""
+    with _lock:
+        _chamadas.clear()
+        _erros.clear()
+        _duracao_total.clear()
+        _histograma.clear()
+        _leituras_cache.clear()
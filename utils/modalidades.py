@@ -0,0 +1,157 @@
+# utils/modalidades.py
+import streamlit as st
+import pandas as pd
+import logging
+import os
+import threading
+import time
+from utils.sheets import *
+
+# Colunas da aba MODALIDADES (A até G)
+COLUNAS_MODALIDADES = ['Genero', 'Modalidade', 'Unidade', 'Tem_Vaga', 'Limite_Vagas', 'Inscritos', 'Vagas_Restantes']
+# Coluna opcional H: turmas que podem se inscrever (separadas por vírgula; vazia = todas)
+COLUNA_TURMAS_PERMITIDAS = 'Turmas_Permitidas'
+# Grava Inscritos/Vagas_Restantes calculados de volta na planilha (colunas F e G),
+# no máximo uma vez por intervalo, a partir da thread de envio do diário
+GRAVAR_CONTAGENS = os.environ.get('INTERCLASSE_VAGAS_GRAVAR', '0').lower() not in ('0', 'false', 'nao')
+INTERVALO_GRAVACAO_CONTAGENS = int(os.environ.get('INTERCLASSE_VAGAS_GRAVAR_INTERVALO', '30'))
+
+@st.cache_data(ttl=600)
+def carregar_modalidades_completas(versao):
+    """
+    Carrega todas as informações da aba MODALIDADES com tratamento robusto.
+    O parâmetro `versao` (de obter_versao_aba('MODALIDADES')) faz parte da chave do cache.
+    """
+    try:
+        df_modalidades = load_full_sheet_as_df('MODALIDADES')
+        
+        if df_modalidades.empty:
+            st.warning("Nenhuma modalidade encontrada na aba MODALIDADES")
+            return pd.DataFrame()
+        
+        # Verifica e padroniza os nomes das colunas
+        if len(df_modalidades.columns) >= 4:
+            # Usa apenas as primeiras 4 colunas essenciais
+            df_modalidades = df_modalidades.iloc[:, :8]  # Pega até 8 colunas se existirem
+            if len(df_modalidades.columns) >= 8:
+                df_modalidades.columns = COLUNAS_MODALIDADES + [COLUNA_TURMAS_PERMITIDAS]
+            elif len(df_modalidades.columns) == 7:
+                df_modalidades.columns = COLUNAS_MODALIDADES
+            else:
+                # Preenche colunas faltantes
+                colunas_base = ['Genero', 'Modalidade', 'Unidade', 'Tem_Vaga']
+                colunas_extras = ['Limite_Vagas', 'Inscritos', 'Vagas_Restantes'][:len(df_modalidades.columns)-4]
+                df_modalidades.columns = colunas_base + colunas_extras
+        
+        # Limpeza e tratamento dos dados
+        for col in ['Genero', 'Modalidade', 'Unidade', 'Tem_Vaga', COLUNA_TURMAS_PERMITIDAS]:
+            if col in df_modalidades.columns:
+                df_modalidades[col] = df_modalidades[col].astype(str).str.strip()
+        
+        # CORREÇÃO ADICIONAL: Converter colunas numéricas para o tipo correto
+        colunas_numericas = ['Limite_Vagas', 'Inscritos', 'Vagas_Restantes']
+        for col in colunas_numericas:
+            if col in df_modalidades.columns:
+                # Converte para numérico, forçando erros para NaN (coerce)
+                df_modalidades[col] = pd.to_numeric(df_modalidades[col], errors='coerce')
+                # Preenche NaN com 0
+                df_modalidades[col] = df_modalidades[col].fillna(0)
+        
+        # Remove linhas completamente vazias
+        df_modalidades = df_modalidades.dropna(how='all')
+        
+        return df_modalidades
+        
+    except Exception as e:
+        logging.exception("Erro ao carregar modalidades completas")
+        st.error("Falha ao carregar modalidades. Tente novamente.")
+        return pd.DataFrame()
+
+# ------------------------------------------------------------
+# Inscritos e vagas restantes calculados pela aplicação
+# ------------------------------------------------------------
+def aplicar_contagens_inscricoes(df_modalidades, contagens, reservadas=None):
+    """
+    Substitui Inscritos e Vagas_Restantes pelos valores calculados a partir das
+    contagens (unidade, modalidade, gênero) -> inscrições. As `reservadas` (ainda
+    no diário) descontam das vagas restantes, mas não entram em Inscritos.
+    Tem_Vaga não muda.
+    """
+    if df_modalidades.empty or 'Limite_Vagas' not in df_modalidades.columns:
+        return df_modalidades
+    df_modalidades = df_modalidades.copy()
+    chaves = list(zip(df_modalidades['Unidade'], df_modalidades['Modalidade'], df_modalidades['Genero']))
+    df_modalidades['Inscritos'] = [contagens.get(chave, 0) for chave in chaves]
+    ocupadas = df_modalidades['Inscritos'] + [(reservadas or {}).get(chave, 0) for chave in chaves]
+    df_modalidades['Vagas_Restantes'] = (df_modalidades['Limite_Vagas'] - ocupadas).clip(lower=0)
+    return df_modalidades
+
+def carregar_modalidades_atualizadas(versao=None):
+    """
+    Aba MODALIDADES com Inscritos e Vagas_Restantes em dia. Com VAGAS_CALCULADAS,
+    os valores vêm dos contadores de inscrições (utils/agregados.py), atualizados a
+    cada inclusão e exclusão, e as vagas descontam as inscrições ainda no diário;
+    senão, das fórmulas da planilha.
+    """
+    if versao is None:
+        versao = obter_versao_aba('MODALIDADES')
+    df_modalidades = carregar_modalidades_completas(versao)
+    if not VAGAS_CALCULADAS:
+        return df_modalidades
+    from utils.agregados import contagens_inscricoes
+    _, contagens = contagens_inscricoes()
+    _, reservadas = reservas_por_combinacao()
+    return aplicar_contagens_inscricoes(df_modalidades, contagens, reservadas)
+
+def gravar_contagens_modalidades():
+    """
+    Grava na aba MODALIDADES os Inscritos (F) e Vagas_Restantes (G) calculados,
+    em um único batch_update só com as linhas que mudaram. Retorna quantas
+    linhas foram gravadas.
+    """
+    df_planilha = carregar_modalidades_completas(obter_versao_aba('MODALIDADES'))
+    if df_planilha.empty or 'Vagas_Restantes' not in df_planilha.columns:
+        return 0
+    from utils.agregados import contagens_inscricoes
+    _, contagens = contagens_inscricoes()
+    df_calculado = aplicar_contagens_inscricoes(df_planilha, contagens)
+
+    mudou = ((df_planilha['Inscritos'] != df_calculado['Inscritos']) |
+             (df_planilha['Vagas_Restantes'] != df_calculado['Vagas_Restantes']))
+    if not mudou.any():
+        return 0
+    # Índice do DataFrame = linha da planilha - 2 (cabeçalho na linha 1)
+    atualizacoes = [
+        {'range': f"F{indice + 2}:G{indice + 2}", 'values': [[int(inscritos), int(vagas)]]}
+        for indice, inscritos, vagas in zip(df_calculado.index[mudou],
+                                            df_calculado.loc[mudou, 'Inscritos'],
+                                            df_calculado.loc[mudou, 'Vagas_Restantes'])
+    ]
+    ws = get_ws('MODALIDADES')
+    if ws is None:
+        return 0
+    ws.batch_update(atualizacoes, value_input_option='USER_ENTERED')
+    marcar_aba_alterada('MODALIDADES')
+    logging.info("Contagens gravadas na aba MODALIDADES", extra={'linhas': len(atualizacoes)})
+    return len(atualizacoes)
+
+_gravacao_contagens = {'lock': threading.Lock(), 'revisao': None, 'gravado_em': 0.0}
+
+def gravar_contagens_se_alteradas():
+    """
+    Chamado periodicamente em segundo plano: grava as contagens se os contadores
+    mudaram desde a última gravação e já passou INTERVALO_GRAVACAO_CONTAGENS
+    """
+    if not (GRAVAR_CONTAGENS and VAGAS_CALCULADAS):
+        return 0
+    from utils.agregados import revisao_agregados
+    with _gravacao_contagens['lock']:
+        if time.monotonic() - _gravacao_contagens['gravado_em'] < INTERVALO_GRAVACAO_CONTAGENS:
+            return 0
+        revisao = revisao_agregados()
+        if revisao == _gravacao_contagens['revisao']:
+            return 0
+        gravadas = gravar_contagens_modalidades()
+        _gravacao_contagens['revisao'] = revisao
+        _gravacao_contagens['gravado_em'] = time.monotonic()
+        return gravadas
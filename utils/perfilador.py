@@ -0,0 +1,182 @@
+# utils/perfilador.py
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime
+import streamlit as st
+
+# Ativa o perfil em todas as sessões pela variável de ambiente (ou pelo painel administrativo)
+PERFIL_AMBIENTE = os.environ.get('INTERCLASSE_PERFIL', '').lower() in ('1', 'true', 'sim')
+INTERVALO_AMOSTRAGEM = float(os.environ.get('INTERCLASSE_PERFIL_INTERVALO_MS', '5')) / 1000
+PERFIS_POR_PAGINA = int(os.environ.get('INTERCLASSE_PERFIS_POR_PAGINA', '10'))
+PROFUNDIDADE_MAXIMA = 128
+
+# Classificação dos quadros pelo pacote de origem, para o resumo por categoria
+CATEGORIAS = (
+    (('gspread', 'google', 'googleapiclient', 'httplib2', 'requests', 'urllib3', 'ssl', 'socket', 'http'),
+     'E/S Google Sheets'),
+    (('pandas', 'numpy', 'pyarrow'), 'pandas / numpy'),
+    (('streamlit', 'tornado', 'pydeck', 'altair'), 'Renderização Streamlit'),
+    (('utils',), 'Código da aplicação'),
+)
+
+class Perfil:
+    """Resultado de uma execução perfilada: pilhas amostradas e quantas vezes apareceram"""
+    def __init__(self, pagina, inicio, duracao, amostras, intervalo, unidade=None):
+        self.pagina = pagina
+        self.inicio = inicio
+        self.duracao = duracao
+        self.amostras = amostras
+        self.intervalo = intervalo
+        self.unidade = unidade
+
+    @property
+    def total_amostras(self):
+        return sum(self.amostras.values())
+
+class AmostradorPilha:
+    """Thread que amostra periodicamente a pilha de outra thread (o rerun da sessão)"""
+    def __init__(self, thread_id, intervalo=INTERVALO_AMOSTRAGEM):
+        self.thread_id = thread_id
+        self.intervalo = intervalo
+        self.amostras = Counter()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name="perfilador", daemon=True)
+
+    def iniciar(self):
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join()
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            quadro = sys._current_frames().get(self.thread_id)
+            if quadro is not None:
+                self.amostras[_pilha(quadro)] += 1
+
+def _rotulo_quadro(quadro):
+    """Nome legível do quadro: função (módulo:linha de definição)"""
+    codigo = quadro.f_code
+    modulo = quadro.f_globals.get('__name__', os.path.basename(codigo.co_filename))
+    return f"{codigo.co_name} ({modulo}:{codigo.co_firstlineno})"
+
+def _pilha(quadro):
+    """Pilha da raiz até o quadro atual, como tupla de rótulos"""
+    rotulos = []
+    while quadro is not None and len(rotulos) < PROFUNDIDADE_MAXIMA:
+        rotulos.append(_rotulo_quadro(quadro))
+        quadro = quadro.f_back
+    return tuple(reversed(rotulos))
+
+# ------------------------------------------------------------
+# Estado do processo: ativação global e últimos perfis por página
+# ------------------------------------------------------------
+@st.cache_resource
+def _estado_perfilador():
+    return {'lock': threading.Lock(), 'ativo': PERFIL_AMBIENTE, 'perfis': {}}
+
+def perfil_ativo():
+    return _estado_perfilador()['ativo']
+
+def definir_perfil_ativo(ativo):
+    _estado_perfilador()['ativo'] = bool(ativo)
+
+def _guardar_perfil(perfil):
+    estado = _estado_perfilador()
+    with estado['lock']:
+        estado['perfis'].setdefault(perfil.pagina, deque(maxlen=PERFIS_POR_PAGINA)).append(perfil)
+
+def listar_perfis(pagina=None):
+    """Perfis guardados (mais recentes primeiro), de uma página ou de todas"""
+    estado = _estado_perfilador()
+    with estado['lock']:
+        if pagina is not None:
+            perfis = list(estado['perfis'].get(pagina, ()))
+        else:
+            perfis = [p for fila in estado['perfis'].values() for p in fila]
+    return sorted(perfis, key=lambda p: p.inicio, reverse=True)
+
+@contextmanager
+def perfilar(pagina, unidade=None):
+    """Perfila o trecho (na thread atual) se o perfil estiver ativo; caso contrário não faz nada"""
+    if not perfil_ativo():
+        yield
+        return
+
+    amostrador = AmostradorPilha(threading.get_ident())
+    inicio = datetime.now()
+    inicio_relogio = time.perf_counter()
+    amostrador.iniciar()
+    try:
+        yield
+    finally:
+        amostrador.parar()
+        if amostrador.amostras:
+            _guardar_perfil(Perfil(pagina, inicio, time.perf_counter() - inicio_relogio,
+                                   amostrador.amostras, amostrador.intervalo, unidade))
+
+# ------------------------------------------------------------
+# Análise
+# ------------------------------------------------------------
+def _categoria(rotulo):
+    modulo = rotulo.rsplit('(', 1)[-1].split(':', 1)[0]
+    raiz = modulo.split('.', 1)[0]
+    for pacotes, nome in CATEGORIAS:
+        if raiz in pacotes:
+            return nome
+    return 'Outros'
+
+def pontos_quentes(perfil, limite=20):
+    """
+    Funções com mais amostras: 'Próprio' conta quando a função estava no topo
+    da pilha e 'Acumulado' quando estava em qualquer ponto da pilha.
+    """
+    import pandas as pd
+
+    proprio = Counter()
+    acumulado = Counter()
+    for pilha, n in perfil.amostras.items():
+        proprio[pilha[-1]] += n
+        for rotulo in set(pilha):
+            acumulado[rotulo] += n
+
+    total = perfil.total_amostras
+    linhas = [
+        {
+            'Função': rotulo,
+            'Categoria': _categoria(rotulo),
+            'Próprio (%)': round(100 * proprio[rotulo] / total, 1),
+            'Acumulado (%)': round(100 * acumulado[rotulo] / total, 1),
+            'Próprio (ms)': round(proprio[rotulo] * perfil.intervalo * 1000, 1),
+        }
+        for rotulo in acumulado
+    ]
+    df = pd.DataFrame(linhas)
+    if df.empty:
+        return df
+    return df.sort_values(['Próprio (%)', 'Acumulado (%)'], ascending=False).head(limite).reset_index(drop=True)
+
+def resumo_por_categoria(perfil):
+    """Distribuição do tempo próprio entre E/S, pandas, renderização e aplicação"""
+    import pandas as pd
+
+    por_categoria = Counter()
+    for pilha, n in perfil.amostras.items():
+        por_categoria[_categoria(pilha[-1])] += n
+    total = perfil.total_amostras
+    return pd.DataFrame(
+        [{'Categoria': nome, 'Tempo (%)': round(100 * n / total, 1)} for nome, n in por_categoria.most_common()]
+    )
+
+def exportar_flamegraph(perfil):
+    """Pilhas no formato 'collapsed' (flamegraph.pl, speedscope, inferno)"""
+    linhas = [
+        ';'.join(rotulo.replace(';', ',') for rotulo in pilha) + f" {n}"
+        for pilha, n in perfil.amostras.most_common()
+    ]
+    return '\n'.join(linhas) + '\n'
@@ -0,0 +1,134 @@
+# utils/relatorio_offline.py
+"""
+Relatórios de inscrições pela linha de comando, sem iniciar o Streamlit.
+
+Uso (a partir da raiz do projeto):
+    python -m utils.relatorio_offline --salvar-instantaneos instantaneos/
+    python -m utils.relatorio_offline --instantaneos instantaneos/ --saida relatorios/
+    python -m utils.relatorio_offline --formatos CSV XLSX      # lê direto da planilha
+    python -m utils.relatorio_offline --temporadas 2024 2025   # inclui temporadas arquivadas
+
+Os dados passam pelos mesmos carregadores da aplicação (load_full_sheet_as_df,
+agregados). Com --instantaneos, as abas vêm de arquivos CSV (um por aba, como
+os gravados por --salvar-instantaneos) e nenhuma chamada à API é feita.
+Com --temporadas, as inscrições vêm só das partições dessas temporadas (aba
+ativa e abas de arquivo); o resumo de vagas continua sendo o da temporada ativa.
+Em uma única passada são gerados, em cada formato:
+    unidades/<unidade>.<ext>        inscrições de cada unidade
+    modalidades/<modalidade>.<ext>  inscrições de cada modalidade (todas as unidades)
+    resumo_modalidades.<ext>        unidade × modalidade × gênero com vagas e preenchimento
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+# Abas usadas pelos relatórios
+ABAS_RELATORIO = ('INSCRITOS-UNIDADE', 'MODALIDADES')
+
+def _silenciar_streamlit():
+    """Fora do servidor, o Streamlit avisa a cada uso de cache que não há runtime"""
+    from streamlit import config
+    from streamlit.logger import set_log_level
+
+    config.set_option('logger.level', 'error')
+    set_log_level('error')
+
+def _nome_arquivo(texto):
+    """Nome seguro para arquivo a partir do nome da unidade ou modalidade"""
+    return re.sub(r'[^\w\-]+', '_', str(texto).strip()).strip('_') or 'sem_nome'
+
+def carregar_instantaneos(pasta):
+    """Lê <ABA>.csv da pasta e entrega os valores aos carregadores da aplicação"""
+    import pandas as pd
+    from utils.sheets import obter_versao_aba, semear_leitura
+
+    for aba in ABAS_RELATORIO:
+        caminho = Path(pasta) / f"{aba}.csv"
+        if not caminho.exists():
+            raise FileNotFoundError(f"Instantâneo não encontrado: {caminho}")
+        df = pd.read_csv(caminho, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+        semear_leitura(aba, obter_versao_aba(aba), [list(df.columns)] + df.values.tolist())
+
+def salvar_instantaneos(pasta):
+    """Grava as abas dos relatórios, lidas da planilha, como CSV na pasta"""
+    from utils.sheets import load_full_sheet_as_df
+
+    Path(pasta).mkdir(parents=True, exist_ok=True)
+    for aba in ABAS_RELATORIO:
+        df = load_full_sheet_as_df(aba)
+        if df.empty and len(df.columns) == 0:
+            raise RuntimeError(f"Não foi possível ler a aba {aba}")
+        df.to_csv(Path(pasta) / f"{aba}.csv", index=False, encoding='utf-8-sig')
+        print(f"{aba}: {len(df)} linha(s) -> {Path(pasta) / f'{aba}.csv'}")
+
+def _escrever(df, caminho, formato):
+    from utils.exportacao import ESCRITORES
+
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    with open(caminho, 'wb') as destino:
+        ESCRITORES[formato](df, destino)
+
+def gerar_relatorios(saida, formatos, temporadas=None):
+    """Gera todos os relatórios; retorna a quantidade de arquivos escritos"""
+    from utils.agregados import obter_resumo_inscricoes
+    from utils.exportacao import FORMATOS_EXPORTACAO
+    from utils.inscritos import carregar_inscritos_padronizados
+
+    df_inscritos = carregar_inscritos_padronizados(temporadas)
+    if df_inscritos.empty:
+        print("Nenhuma inscrição encontrada.")
+        return 0
+    resumo = obter_resumo_inscricoes()
+
+    # Os grupos são montados uma vez e escritos em todos os formatos
+    grupos = [('unidades', nome, df) for nome, df in df_inscritos.groupby('Unidade', sort=True)]
+    grupos += [('modalidades', nome, df) for nome, df in df_inscritos.groupby('Modalidade', sort=True)]
+
+    arquivos = 0
+    saida = Path(saida)
+    for formato in formatos:
+        extensao = FORMATOS_EXPORTACAO[formato]['extensao']
+        for pasta, nome, df in grupos:
+            _escrever(df.reset_index(drop=True), saida / pasta / f"{_nome_arquivo(nome)}.{extensao}", formato)
+            arquivos += 1
+        _escrever(resumo, saida / f"resumo_modalidades.{extensao}", formato)
+        arquivos += 1
+    return arquivos
+
+def main(argv=None):
+    _silenciar_streamlit()
+    from utils.exportacao import formatos_disponiveis
+
+    disponiveis = formatos_disponiveis()
+    parser = argparse.ArgumentParser(description="Relatórios de inscrições sem o Streamlit")
+    parser.add_argument('--instantaneos', help="Pasta com <ABA>.csv (sem chamadas à API)")
+    parser.add_argument('--salvar-instantaneos', metavar='PASTA',
+                        help="Lê as abas da planilha, grava como CSV na pasta e encerra")
+    parser.add_argument('--saida', default='relatorios', help="Pasta dos relatórios (padrão: relatorios)")
+    parser.add_argument('--formatos', nargs='+', choices=disponiveis, default=disponiveis)
+    parser.add_argument('--temporadas', nargs='+', type=int, metavar='ANO',
+                        help="Temporadas a incluir (padrão: só a ativa); lê as abas de arquivo da planilha")
+    args = parser.parse_args(argv)
+    if args.temporadas and args.instantaneos:
+        parser.error("--temporadas lê as abas de arquivo da planilha e não combina com --instantaneos")
+
+    if args.salvar_instantaneos:
+        salvar_instantaneos(args.salvar_instantaneos)
+        return 0
+
+    inicio = time.perf_counter()
+    if args.instantaneos:
+        carregar_instantaneos(args.instantaneos)
+    arquivos = gerar_relatorios(args.saida, args.formatos, args.temporadas)
+    print(f"{arquivos} arquivo(s) em {os.path.abspath(args.saida)} ({time.perf_counter() - inicio:.1f} s)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
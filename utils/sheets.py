@@ -1,18 +1,37 @@
 # utils/sheets.py
 import streamlit as st
-import gspread
 import pandas as pd
-from google.oauth2.service_account import Credentials
 from functools import lru_cache
+import hashlib
 import os
+import re
+import logging
+import threading
+import time
+from collections import Counter, deque
 from datetime import datetime
+from utils.metricas import medir_chamada_api, registrar_chamada_leitura, registrar_falha_cache
+from utils.cache_compartilhado import obter_cache_compartilhado
 
 # Configurações e credenciais
 CREDENCIAIS_JSON = "cred.json"
 SHEET_ID = '1Fje2R_qHXImbIJZ07eO2gCv9XllllFQkRa6Cdp1_wfc'
 
+# Com o vigia de alterações ligado (utils/vigia_planilha.py) as leituras só são
+# invalidadas quando a aba muda; a validade fixa vira apenas uma rede de segurança
+VIGIA_ATIVO = os.environ.get('INTERCLASSE_VIGIA', '1').lower() not in ('0', 'false', 'nao')
+VALIDADE_LEITURAS = 3600 if VIGIA_ATIVO else 600
+
+# Inscritos e Vagas_Restantes da aba MODALIDADES calculados pela aplicação a partir
+# das inscrições (utils/modalidades.py), em vez de lidos das fórmulas da planilha
+VAGAS_CALCULADAS = os.environ.get('INTERCLASSE_VAGAS_CALCULADAS', '1').lower() not in ('0', 'false', 'nao')
+
 @st.cache_resource
 def get_gspread_client():
+    # gspread e google-auth são importados só na primeira conexão (reduz o tempo de partida)
+    import gspread
+    from google.oauth2.service_account import Credentials
+    
     scope = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
     
     if os.path.exists(CREDENCIAIS_JSON):
@@ -44,24 +63,484 @@ def get_workbook():
         st.error(f"❌ Não foi possível abrir a planilha. Verifique o SHEET_ID e as permissões: {e}")
         return None
 
+# Métodos de gspread.Worksheet que chamam a API, agrupados por tipo de operação
+OPERACOES_API = {
+    'get_all_values': 'leitura', 'get_all_records': 'leitura', 'get': 'leitura',
+    'batch_get': 'leitura', 'row_values': 'leitura', 'col_values': 'leitura', 'acell': 'leitura',
+    'append_row': 'inclusao', 'append_rows': 'inclusao',
+    'update': 'atualizacao', 'update_cell': 'atualizacao', 'batch_update': 'atualizacao',
+    'delete_rows': 'exclusao',
+}
+
+class WorksheetInstrumentada:
+    """
+    Envolve um gspread.Worksheet medindo tempo e quantidade de cada chamada à
+    API por aba, operação e página de origem. Os demais atributos são repassados.
+    """
+    def __init__(self, ws):
+        self._ws = ws
+
+    def __getattr__(self, nome):
+        atributo = getattr(self._ws, nome)
+        operacao = OPERACOES_API.get(nome)
+        if operacao is None or not callable(atributo):
+            return atributo
+
+        def chamada_medida(*args, **kwargs):
+            with medir_chamada_api(self._ws.title, operacao):
+                resultado = atributo(*args, **kwargs)
+            if operacao != 'leitura':
+                registrar_escrita_propria(self._ws.title, _efeito_na_coluna_a(nome, args))
+            return resultado
+        return chamada_medida
+
+def _texto_da_celula(valor):
+    return '' if valor is None else str(valor)
+
+def _efeito_na_coluna_a(nome, args):
+    """
+    O que uma escrita faz com a coluna A da aba, para o vigia conferir o
+    conteúdo esperado depois dela: ('anexar', valores), ('excluir', inicio, fim),
+    ('atualizar', linha, valores), ('nenhum',) ou None quando não dá para saber.
+    """
+    try:
+        if nome == 'append_row':
+            return ('anexar', [_texto_da_celula(args[0][0]) if args[0] else ''])
+        if nome == 'append_rows':
+            return ('anexar', [_texto_da_celula(linha[0]) if linha else '' for linha in args[0]])
+        if nome == 'delete_rows':
+            inicio = int(args[0])
+            return ('excluir', inicio, int(args[1]) if len(args) > 1 and args[1] else inicio)
+        if nome == 'update_cell':
+            return ('atualizar', int(args[0]), [_texto_da_celula(args[2])]) if int(args[1]) == 1 else ('nenhum',)
+        if nome == 'update' and isinstance(args[0], str):
+            intervalo = args[0].split('!', 1)[-1].split(':', 1)[0]
+            coluna, linha = re.match(r'^([A-Za-z]*)(\d*)$', intervalo).groups()
+            if coluna.upper() != 'A':
+                return ('nenhum',)
+            return ('atualizar', int(linha or 1), [_texto_da_celula(valores[0]) if valores else '' for valores in args[1]])
+    except (IndexError, TypeError, ValueError, AttributeError):
+        pass
+    return None
+
 @lru_cache(maxsize=10)
 def get_ws(title: str):
+    import gspread
+    
     wb = get_workbook()
     if wb:
         try:
-            return wb.worksheet(title)
+            with medir_chamada_api(title, 'metadados'):
+                return WorksheetInstrumentada(wb.worksheet(title))
         except gspread.WorksheetNotFound:
             st.error(f"Aba da planilha com o nome '{title}' não foi encontrada.")
             return None
     return None
 
-@st.cache_data(ttl=600)
+# ------------------------------------------------------------
+# Versões das abas (mudam a cada escrita feita pela aplicação)
+# ------------------------------------------------------------
+# Efeitos de escrita guardados para o vigia; com mais escritas que isso entre
+# duas rodadas, ele relê as abas escritas
+MAXIMO_EFEITOS_ANOTADOS = 1000
+
+@st.cache_resource
+def _estado_versoes():
+    """
+    Contadores de versão por aba, instante da última escrita da aplicação em
+    cada aba e o efeito de cada escrita na coluna A (numerado em sequência),
+    compartilhados entre as sessões do processo
+    """
+    return {'lock': threading.Lock(), 'versoes': {}, 'escritas': {},
+            'efeitos': deque(maxlen=MAXIMO_EFEITOS_ANOTADOS), 'sequencia': 0}
+
+# Abas cujas fórmulas dependem de outra aba (mudam junto com ela). Com as vagas
+# calculadas pela aplicação, uma inscrição não obriga a reler MODALIDADES.
+ABAS_DEPENDENTES = {} if VAGAS_CALCULADAS else {
+    'INSCRITOS-UNIDADE': ('MODALIDADES',),
+}
+
+def obter_versao_aba(ws_title: str) -> int:
+    """
+    Retorna a versão atual dos dados de uma aba, para uso em chaves de cache.
+    Com o cache compartilhado ligado, a versão vem dele e é a mesma em todas as réplicas.
+    """
+    compartilhado = obter_cache_compartilhado()
+    if compartilhado is not None:
+        try:
+            return compartilhado.obter_versao(ws_title)
+        except Exception:
+            logging.warning("Falha ao ler a versão no cache compartilhado", exc_info=True, extra={'aba': ws_title})
+    return _estado_versoes()['versoes'].get(ws_title, 0)
+
+def marcar_aba_alterada(ws_title: str):
+    """Incrementa a versão da aba (e das abas que dependem dela) após uma escrita"""
+    estado = _estado_versoes()
+    compartilhado = obter_cache_compartilhado()
+    for aba in (ws_title,) + ABAS_DEPENDENTES.get(ws_title, ()):
+        with estado['lock']:
+            estado['versoes'][aba] = estado['versoes'].get(aba, 0) + 1
+        if compartilhado is not None:
+            try:
+                compartilhado.incrementar_versao(aba)
+            except Exception:
+                logging.warning("Falha ao atualizar a versão no cache compartilhado", exc_info=True, extra={'aba': aba})
+
+def registrar_escrita_propria(ws_title: str, efeito=None):
+    """
+    Anota o instante (depois da resposta da API) de uma escrita feita por esta
+    aplicação e o efeito dela na coluna A (None: desconhecido)
+    """
+    estado = _estado_versoes()
+    with estado['lock']:
+        estado['escritas'][ws_title] = time.time()
+        estado['sequencia'] += 1
+        estado['efeitos'].append((estado['sequencia'], ws_title, efeito))
+
+def efeitos_proprios_desde(sequencia: int):
+    """
+    Efeitos na coluna A das escritas da aplicação depois de `sequencia`, por aba.
+    Retorna (efeitos, sequência atual, completo); completo é False quando parte
+    deles já saiu da lista e o conteúdo esperado das abas escritas é desconhecido.
+    """
+    estado = _estado_versoes()
+    with estado['lock']:
+        efeitos = {}
+        for numero, aba, efeito in estado['efeitos']:
+            if numero > sequencia:
+                efeitos.setdefault(aba, []).append(efeito)
+        primeiro = estado['efeitos'][0][0] if estado['efeitos'] else estado['sequencia'] + 1
+        return efeitos, estado['sequencia'], primeiro <= sequencia + 1
+
+def escritas_proprias_desde(instante: float) -> dict:
+    """Abas escritas por esta aplicação a partir de `instante` (aba -> instante da escrita)"""
+    estado = _estado_versoes()
+    with estado['lock']:
+        return {aba: quando for aba, quando in estado['escritas'].items() if quando >= instante}
+
+# ------------------------------------------------------------
+# Observadores de escrita na aba INSCRITOS-UNIDADE
+# ------------------------------------------------------------
+_OBSERVADORES_INSCRITOS = {}
+
+def registrar_observador_inscritos(nome: str, callback):
+    """
+    Registra uma função chamada a cada inclusão ou exclusão em INSCRITOS-UNIDADE.
+    A assinatura é callback(evento, dados, linha), com evento 'inclusao' ou
+    'exclusao', dados sendo a linha da planilha (lista) e linha o número da
+    linha na planilha, quando conhecido. Registrar de novo o mesmo nome substitui.
+    """
+    _OBSERVADORES_INSCRITOS[nome] = callback
+
+def notificar_observadores_inscritos(evento: str, dados: list, linha=None):
+    """Repassa a escrita aos observadores; falhas de um observador não interrompem a escrita"""
+    for nome, callback in list(_OBSERVADORES_INSCRITOS.items()):
+        try:
+            callback(evento, dados, linha)
+        except Exception:
+            logging.exception(f"Erro no observador de inscritos '{nome}'")
+
+def linha_da_resposta(resposta):
+    """Extrai o número da primeira linha escrita a partir da resposta de um append"""
+    try:
+        intervalo = resposta['updates']['updatedRange']
+        return int(re.search(r'![A-Z]+(\d+)', intervalo).group(1))
+    except Exception:
+        return None
+
+# ------------------------------------------------------------
+# Chaves estáveis das inscrições (chave -> linha na planilha)
+# ------------------------------------------------------------
+# Posições de RA, Modalidade e Data/Hora na linha de INSCRITOS-UNIDADE
+COLUNAS_CHAVE_INSCRICAO = (2, 5, 7)
+
+def chave_inscricao(dados, ocorrencia=0) -> str:
+    """
+    Identificador estável de uma inscrição: hash de RA, modalidade e data/hora.
+    Linhas repetidas (mesmos três campos) recebem o número da ocorrência na
+    ordem da aba como sufixo, a partir da segunda.
+    """
+    texto = '|'.join(str(dados[i]).strip() if i < len(dados) else '' for i in COLUNAS_CHAVE_INSCRICAO)
+    chave = hashlib.sha1(texto.encode('utf-8')).hexdigest()[:16]
+    return f"{chave}-{ocorrencia}" if ocorrencia else chave
+
+def base_da_chave(chave: str) -> str:
+    """Chave sem o sufixo de ocorrência (o que dá para conferir lendo uma única linha)"""
+    return chave.split('-', 1)[0]
+
+def chaves_inscricoes(linhas):
+    """Chaves de linhas na ordem da aba, com as repetidas diferenciadas pela ocorrência"""
+    ocorrencias = Counter()
+    chaves = []
+    for linha in linhas:
+        base = chave_inscricao(linha)
+        chaves.append(chave_inscricao(linha, ocorrencias[base]))
+        ocorrencias[base] += 1
+    return chaves
+
+@st.cache_resource
+def _estado_chaves_inscricoes():
+    """
+    Mapa chave -> linha da planilha, compartilhado entre as sessões (None = reconstruir),
+    e a versão da aba em que ele foi conferido pela última vez
+    """
+    return {'lock': threading.Lock(), 'mapa': None, 'versao': None}
+
+def _mapa_de_linhas(linhas, primeira_linha=2):
+    """Monta o mapa chave -> número da linha a partir das linhas de dados da aba"""
+    return {chave: primeira_linha + i for i, chave in enumerate(chaves_inscricoes(linhas))}
+
+def _mapa_chaves_inscricoes():
+    """Mapa atual; na primeira vez é montado a partir da leitura em cache (sem chamadas à API)"""
+    estado = _estado_chaves_inscricoes()
+    with estado['lock']:
+        if estado['mapa'] is None:
+            estado['versao'] = obter_versao_aba('INSCRITOS-UNIDADE')
+            df = load_full_sheet_as_df('INSCRITOS-UNIDADE')
+            estado['mapa'] = _mapa_de_linhas(df.values.tolist()) if len(df.columns) > max(COLUNAS_CHAVE_INSCRICAO) else {}
+        return estado['mapa']
+
+def _reconstruir_chaves_da_planilha(ws):
+    """Relê apenas as colunas da chave (uma chamada batch_get) e refaz o mapa"""
+    letras = [chr(ord('A') + i) for i in COLUNAS_CHAVE_INSCRICAO]
+    versao = obter_versao_aba('INSCRITOS-UNIDADE')
+    colunas = ws.batch_get([f"{letra}2:{letra}" for letra in letras])
+    total = max((len(coluna) for coluna in colunas), default=0)
+    linhas = []
+    for i in range(total):
+        linha = [''] * (max(COLUNAS_CHAVE_INSCRICAO) + 1)
+        for posicao, coluna in zip(COLUNAS_CHAVE_INSCRICAO, colunas):
+            if i < len(coluna) and coluna[i]:
+                linha[posicao] = coluna[i][0]
+        linhas.append(linha)
+    estado = _estado_chaves_inscricoes()
+    with estado['lock']:
+        estado['mapa'] = _mapa_de_linhas(linhas)
+        estado['versao'] = versao
+        return estado['mapa']
+
+def localizar_linha_inscricao(chave: str):
+    """
+    Retorna a linha atual da inscrição na planilha, ou None se ela não existe mais.
+    A posição do mapa é conferida com uma leitura da própria linha; se não
+    confere (a aba mudou por outra via), o mapa é refeito a partir das colunas da chave.
+    Chave ausente de um mapa em dia com a versão da aba é inscrição já excluída: refazer
+    o mapa aí renumeraria as ocorrências de linhas repetidas.
+    """
+    ws = get_ws('INSCRITOS-UNIDADE')
+    if not ws:
+        return None
+    linha = _mapa_chaves_inscricoes().get(chave)
+    if linha is not None and chave_inscricao(ws.row_values(linha)) == base_da_chave(chave):
+        return linha
+    if linha is None and _estado_chaves_inscricoes()['versao'] == obter_versao_aba('INSCRITOS-UNIDADE'):
+        return None
+    return _reconstruir_chaves_da_planilha(ws).get(chave)
+
+def _atualizar_chaves_inscricoes(evento, dados, linha):
+    """Observador: mantém o mapa de chaves em dia com as escritas da aplicação"""
+    estado = _estado_chaves_inscricoes()
+    with estado['lock']:
+        mapa = estado['mapa']
+        if mapa is None:
+            return
+        if linha is None:
+            estado['mapa'] = None
+        elif evento == 'inclusao':
+            # Linha repetida: próxima ocorrência livre
+            ocorrencia = 0
+            while chave_inscricao(dados, ocorrencia) in mapa:
+                ocorrencia += 1
+            mapa[chave_inscricao(dados, ocorrencia)] = linha
+        elif evento == 'exclusao':
+            # Pela linha excluída: as chaves das demais (inclusive repetidas) não mudam
+            estado['mapa'] = {
+                chave: linha_atual - 1 if linha_atual > linha else linha_atual
+                for chave, linha_atual in mapa.items() if linha_atual != linha
+            }
+        # Escrita da própria aplicação (a versão já foi incrementada): o mapa segue em dia
+        estado['versao'] = obter_versao_aba('INSCRITOS-UNIDADE')
+
+registrar_observador_inscritos('chaves', _atualizar_chaves_inscricoes)
+
+# ------------------------------------------------------------
+# Guarda de inscrições na escrita (duplicidade e limite por aluno)
+# ------------------------------------------------------------
+LIMITE_MODALIDADES_POR_ALUNO = 3
+
+@st.cache_resource
+def _estado_guarda_inscricoes():
+    """
+    Pares (RA, Modalidade) já gravados e reservados, compartilhados entre as sessões.
+    'pares' conta as linhas da planilha por par; 'reservas' são inscrições aceitas
+    que ainda não chegaram à planilha (par -> (unidade, modalidade, gênero), ou None
+    fora da temporada ativa), com 'revisao_reservas' mudando a cada alteração;
+    'modalidades_por_ra' conta pares distintos.
+    """
+    return {'lock': threading.Lock(), 'pares': None, 'versao': None, 'reservas': {},
+            'revisao_reservas': 0, 'modalidades_por_ra': Counter()}
+
+def _par_inscricao(dados):
+    return str(dados[2]).strip(), str(dados[5]).strip()
+
+def _combinacao_reservada(dados):
+    """(unidade, modalidade, gênero) em que a reserva ocupa vaga: só na temporada ativa"""
+    if aba_da_inscricao(dados) != ABA_INSCRICOES_ATIVA:
+        return None
+    return str(dados[0]).strip(), str(dados[5]).strip(), str(dados[4]).strip()
+
+def reservas_por_combinacao():
+    """
+    (revisão, Counter (unidade, modalidade, gênero) -> inscrições reservadas):
+    aceitas na temporada ativa que ainda não chegaram à planilha (diário pendente)
+    """
+    estado = _estado_guarda_inscricoes()
+    with estado['lock']:
+        combinacoes = Counter(c for c in estado['reservas'].values() if c is not None)
+        return estado['revisao_reservas'], combinacoes
+
+def _garantir_guarda(estado):
+    """
+    Monta a guarda a partir das colunas RA e Modalidade (uma chamada batch_get).
+    É refeita quando a versão da aba muda sem passar pelos observadores deste
+    processo (escrita em outra réplica ou edição manual detectada).
+    """
+    versao = obter_versao_aba('INSCRITOS-UNIDADE')
+    if estado['pares'] is not None and estado['versao'] == versao:
+        return
+    ws = get_ws('INSCRITOS-UNIDADE')
+    if not ws:
+        raise RuntimeError("Não foi possível acessar a aba INSCRITOS-UNIDADE")
+    coluna_ra, coluna_modalidade = ws.batch_get(['C2:C', 'F2:F'])
+    pares = Counter()
+    for i in range(max(len(coluna_ra), len(coluna_modalidade))):
+        ra = coluna_ra[i][0].strip() if i < len(coluna_ra) and coluna_ra[i] else ''
+        modalidade = coluna_modalidade[i][0].strip() if i < len(coluna_modalidade) and coluna_modalidade[i] else ''
+        if ra and modalidade:
+            pares[(ra, modalidade)] += 1
+    estado['pares'] = pares
+    estado['versao'] = versao
+    estado['modalidades_por_ra'] = Counter(ra for ra, _ in set(pares) | {p for p in estado['reservas'] if p not in pares})
+    if any(p in pares for p in estado['reservas']):
+        estado['reservas'] = {p: c for p, c in estado['reservas'].items() if p not in pares}
+        estado['revisao_reservas'] += 1
+
+def reservar_inscricoes(linhas):
+    """
+    Confere as novas inscrições contra a guarda e reserva as aceitas, de forma
+    atômica entre as sessões. Retorna (aceitas, rejeitadas), onde rejeitadas
+    é uma lista de (dados, motivo). Cada reserva termina quando a linha chega à
+    planilha (observador) ou é liberada com liberar_reservas.
+    """
+    estado = _estado_guarda_inscricoes()
+    aceitas, rejeitadas = [], []
+    with estado['lock']:
+        _garantir_guarda(estado)
+        for dados in linhas:
+            par = _par_inscricao(dados)
+            ra = par[0]
+            if par in estado['pares'] or par in estado['reservas']:
+                rejeitadas.append((dados, f"{dados[1]} já está inscrito(a) em {par[1]}"))
+            elif estado['modalidades_por_ra'][ra] >= LIMITE_MODALIDADES_POR_ALUNO:
+                rejeitadas.append((dados, f"{dados[1]} já atingiu o limite de "
+                                          f"{LIMITE_MODALIDADES_POR_ALUNO} modalidades"))
+            else:
+                estado['reservas'][par] = _combinacao_reservada(dados)
+                estado['revisao_reservas'] += 1
+                estado['modalidades_por_ra'][ra] += 1
+                aceitas.append(dados)
+    if rejeitadas:
+        logging.warning("Inscrições recusadas pela guarda", extra={'recusadas': len(rejeitadas)})
+    return aceitas, rejeitadas
+
+def pares_ja_gravados(linhas):
+    """
+    (RA, Modalidade) das linhas que já estão na aba INSCRITOS-UNIDADE, conferidos
+    na guarda (que só relê as colunas da aba quando a versão dela muda)
+    """
+    estado = _estado_guarda_inscricoes()
+    with estado['lock']:
+        _garantir_guarda(estado)
+        return {par for par in map(_par_inscricao, linhas) if par in estado['pares']}
+
+def liberar_reservas(linhas):
+    """Desfaz reservas de inscrições que não serão gravadas"""
+    estado = _estado_guarda_inscricoes()
+    with estado['lock']:
+        for dados in linhas:
+            par = _par_inscricao(dados)
+            if par in estado['reservas']:
+                del estado['reservas'][par]
+                estado['revisao_reservas'] += 1
+                if estado['pares'] is None or par not in estado['pares']:
+                    estado['modalidades_por_ra'][par[0]] -= 1
+
+def _atualizar_guarda_inscricoes(evento, dados, linha):
+    """Observador: converte reservas em pares gravados e remove pares excluídos"""
+    estado = _estado_guarda_inscricoes()
+    par = _par_inscricao(dados)
+    with estado['lock']:
+        if estado['pares'] is None:
+            return
+        if evento == 'inclusao':
+            if par in estado['reservas']:
+                del estado['reservas'][par]
+                estado['revisao_reservas'] += 1
+            elif par not in estado['pares']:
+                estado['modalidades_por_ra'][par[0]] += 1
+            estado['pares'][par] += 1
+        elif evento == 'exclusao' and estado['pares'][par] > 0:
+            estado['pares'][par] -= 1
+            if estado['pares'][par] == 0:
+                del estado['pares'][par]
+                if par not in estado['reservas']:
+                    estado['modalidades_por_ra'][par[0]] -= 1
+        estado['versao'] = obter_versao_aba('INSCRITOS-UNIDADE')
+
+registrar_observador_inscritos('guarda', _atualizar_guarda_inscricoes)
+
 def load_full_sheet_as_df(ws_title: str):
+    """Carrega a aba inteira como DataFrame (com cache por versão); conta acertos e falhas de cache"""
+    registrar_chamada_leitura(ws_title)
+    return _load_full_sheet_as_df_cached(ws_title, obter_versao_aba(ws_title))
+
+# Leituras já feitas pelo vigia para a versão atual de cada aba: aba -> (versao, valores)
+_LEITURAS_SEMEADAS = {}
+
+def semear_leitura(ws_title: str, versao: int, valores: list):
+    """Guarda valores já lidos da aba para que a próxima falha de cache nesta versão não chame a API"""
+    _LEITURAS_SEMEADAS[ws_title] = (versao, valores)
+
+def leitura_em_memoria(ws_title: str, versao: int):
+    """Valores da aba já lidos pelo vigia nesta versão, ou None (não chama a API)"""
+    semeada = _LEITURAS_SEMEADAS.get(ws_title)
+    if semeada is not None and semeada[0] == versao:
+        return semeada[1]
+    return None
+
+def _ler_valores_aba(ws_title: str):
     ws = get_ws(ws_title)
     if not ws:
-        return pd.DataFrame()
-    
-    values = ws.get_all_values()
+        return []
+    return ws.get_all_values()
+
+@st.cache_data(ttl=VALIDADE_LEITURAS)
+def _load_full_sheet_as_df_cached(ws_title: str, versao: int):
+    # Só executa quando a aba não está em cache nesta versão
+    registrar_falha_cache(ws_title)
+    compartilhado = obter_cache_compartilhado()
+    semeada = _LEITURAS_SEMEADAS.get(ws_title)
+    if semeada is not None and semeada[0] == versao:
+        values = semeada[1]
+    elif compartilhado is not None:
+        try:
+            values = compartilhado.obter_ou_carregar(ws_title, versao, lambda: _ler_valores_aba(ws_title))
+        except Exception:
+            logging.warning("Falha no cache compartilhado; lendo a aba diretamente", exc_info=True,
+                            extra={'aba': ws_title})
+            values = _ler_valores_aba(ws_title)
+    else:
+        values = _ler_valores_aba(ws_title)
     if not values:
         return pd.DataFrame()
     
@@ -71,14 +550,25 @@ def load_full_sheet_as_df(ws_title: str):
         return pd.DataFrame(values[1:], columns=values[0])
 
 def append_row_and_clear_cache(ws_title: str, row_data: list):
-    """Adiciona uma nova linha e limpa os caches de dados para forçar a releitura."""
+    """Adiciona uma nova linha; a nova versão da aba faz os caches a releitura."""
     ws = get_ws(ws_title)
     if ws:
+        if ws_title == 'INSCRITOS-UNIDADE':
+            _, rejeitadas = reservar_inscricoes([row_data])
+            if rejeitadas:
+                st.error(f"Inscrição recusada: {rejeitadas[0][1]}.")
+                return False
         try:
-            ws.append_row(row_data, value_input_option="USER_ENTERED")
-            st.cache_data.clear()
+            resposta = ws.append_row(row_data, value_input_option="USER_ENTERED")
+            marcar_aba_alterada(ws_title)
+            if ws_title == 'INSCRITOS-UNIDADE':
+                notificar_observadores_inscritos('inclusao', row_data, linha_da_resposta(resposta))
+            logging.info("Linha incluída na planilha", extra={'aba': ws_title})
             return True
         except Exception as e:
+            if ws_title == 'INSCRITOS-UNIDADE':
+                liberar_reservas([row_data])
+            logging.exception("Falha ao salvar na planilha", extra={'aba': ws_title})
             st.error(f"Falha ao salvar na planilha '{ws_title}': {e}")
             return False
     return False
@@ -138,27 +628,280 @@ def registrar_exclusao(dados_registro, usuario_responsavel):
         st.error(f"Erro ao registrar exclusão: {e}")
         return False
 
-def excluir_registro_inscricao(linha_index, dados_registro, usuario_responsavel):
-    """Exclui um registro da aba INSCRITOS-UNIDADE e registra na aba de exclusões"""
+# Localizar, registrar, excluir e avisar os observadores é uma operação só entre
+# as sessões do processo: outra exclusão não desloca a linha no meio do caminho
+_lock_exclusoes = threading.Lock()
+
+def excluir_registro_inscricao(chave, dados_registro, usuario_responsavel):
+    """Exclui a inscrição identificada pela chave da aba INSCRITOS-UNIDADE e registra na aba de exclusões"""
     try:
         ws_inscritos = get_ws('INSCRITOS-UNIDADE')
         if not ws_inscritos:
             st.error("Não foi possível acessar a aba INSCRITOS-UNIDADE")
             return False
         
-        # Primeiro registra a exclusão
-        if registrar_exclusao(dados_registro, usuario_responsavel):
+        with _lock_exclusoes:
+            # Localiza a linha atual pela chave (a posição na lista em cache pode estar desatualizada)
+            linha_planilha = localizar_linha_inscricao(chave)
+            if linha_planilha is None:
+                st.warning(f"Inscrição de {dados_registro[1]} em {dados_registro[5]} não foi encontrada; "
+                           "ela pode já ter sido excluída.")
+                return False
+            
+            # Primeiro registra a exclusão
+            if not registrar_exclusao(dados_registro, usuario_responsavel):
+                return False
             # Depois exclui a linha da planilha original
-            # A linha_index vem do DataFrame, então adicionamos 2 (cabeçalho + índice 0-based)
-            linha_planilha = linha_index + 2
             ws_inscritos.delete_rows(linha_planilha)
-            
-            # Limpa o cache para forçar atualização
-            st.cache_data.clear()
-            return True
-        else:
-            return False
+            marcar_aba_alterada('INSCRITOS-UNIDADE')
+            notificar_observadores_inscritos('exclusao', dados_registro, linha_planilha)
+        logging.info("Inscrição excluída", extra={'aba': 'INSCRITOS-UNIDADE', 'linha_planilha': linha_planilha,
+                                                  'responsavel': usuario_responsavel})
+        return True
             
     except Exception as e:
         st.error(f"Erro ao excluir registro: {e}")
-        return False
\ No newline at end of file
+        return False
+
+# ------------------------------------------------------------
+# Partições de INSCRITOS-UNIDADE por temporada
+# ------------------------------------------------------------
+# A aba INSCRITOS-UNIDADE guarda só a temporada (edição) ativa; as encerradas
+# ficam em abas de arquivo, uma por temporada. As leituras da aplicação carregam
+# apenas a aba ativa; quem precisa do histórico pede as temporadas que quer.
+ABA_INSCRICOES_ATIVA = 'INSCRITOS-UNIDADE'
+PREFIXO_ARQUIVO_INSCRICOES = 'ARQUIVO-INSCRITOS-'
+# Posição da coluna Data/Hora, que define a temporada da inscrição
+COLUNA_DATA_INSCRICAO = 7
+
+def temporada_ativa():
+    """Temporada em andamento (INTERCLASSE_TEMPORADA ou o ano atual), conferida a cada chamada"""
+    return int(os.environ.get('INTERCLASSE_TEMPORADA', datetime.now().year))
+
+def temporada_da_inscricao(dados):
+    """Ano da Data/Hora (dd/mm/aaaa ...) da linha de inscrição, ou None se não dá para ler"""
+    texto = str(dados[COLUNA_DATA_INSCRICAO]).strip() if len(dados) > COLUNA_DATA_INSCRICAO else ''
+    encontrado = re.match(r'\d{1,2}/\d{1,2}/(\d{4})', texto)
+    return int(encontrado.group(1)) if encontrado else None
+
+def aba_da_temporada(temporada):
+    """Partição da temporada (a ativa, as futuras e as linhas sem data ficam na aba ativa)"""
+    if temporada is None or temporada >= temporada_ativa():
+        return ABA_INSCRICOES_ATIVA
+    return f"{PREFIXO_ARQUIVO_INSCRICOES}{temporada}"
+
+def temporada_da_aba(aba):
+    """Temporada de uma aba de arquivo (ARQUIVO-INSCRITOS-2024 -> 2024)"""
+    return int(aba[len(PREFIXO_ARQUIVO_INSCRICOES):])
+
+def aba_da_inscricao(dados):
+    """Roteador: aba onde a linha de inscrição deve ficar (usado no envio do diário e no arquivamento)"""
+    return aba_da_temporada(temporada_da_inscricao(dados))
+
+def temporadas_arquivadas():
+    """Temporadas que já têm aba de arquivo na planilha (uma consulta de metadados)"""
+    wb = get_workbook()
+    if not wb:
+        return []
+    with medir_chamada_api('*', 'metadados'):
+        titulos = [ws.title for ws in wb.worksheets()]
+    sufixos = [t[len(PREFIXO_ARQUIVO_INSCRICOES):] for t in titulos if t.startswith(PREFIXO_ARQUIVO_INSCRICOES)]
+    return sorted(int(sufixo) for sufixo in sufixos if sufixo.isdigit())
+
+def abas_das_temporadas(temporadas=None):
+    """Partições a ler para as temporadas pedidas (None = só a temporada ativa)"""
+    if temporadas is None:
+        return [ABA_INSCRICOES_ATIVA]
+    arquivadas = set(temporadas_arquivadas())
+    abas = []
+    for temporada in temporadas:
+        aba = aba_da_temporada(temporada)
+        if (aba == ABA_INSCRICOES_ATIVA or temporada in arquivadas) and aba not in abas:
+            abas.append(aba)
+    return abas
+
+def abrir_aba_de_arquivo(aba, cabecalho, linhas_previstas=0, existentes=None):
+    """
+    Aba de arquivo de uma temporada encerrada; se ainda não existe, é criada já
+    com o cabeçalho. `existentes` evita consultar de novo as temporadas arquivadas.
+    """
+    if temporada_da_aba(aba) in (temporadas_arquivadas() if existentes is None else existentes):
+        return get_ws(aba)
+    wb = get_workbook()
+    if not wb:
+        return None
+    with medir_chamada_api(aba, 'metadados'):
+        ws = WorksheetInstrumentada(wb.add_worksheet(title=aba, rows=linhas_previstas + 1, cols=len(cabecalho)))
+    registrar_escrita_propria(aba)
+    ws.append_rows([cabecalho], value_input_option="USER_ENTERED")
+    return ws
+
+def _blocos_contiguos(numeros):
+    """Agrupa números de linha ordenados em intervalos [início, fim]"""
+    blocos = []
+    for numero in numeros:
+        if blocos and blocos[-1][1] == numero - 1:
+            blocos[-1][1] = numero
+        else:
+            blocos.append([numero, numero])
+    return blocos
+
+def arquivar_temporadas_encerradas():
+    """
+    Move as inscrições de temporadas anteriores à ativa para as abas de arquivo:
+    um append por partição e, na aba ativa, uma única chamada que exclui os
+    blocos contíguos de baixo para cima (inclusões simultâneas vão para o fim e
+    não são afetadas).
+    Linhas que já estão no arquivo não são copiadas de novo, então uma execução
+    interrompida pode ser repetida. Retorna temporada -> linhas movidas.
+    """
+    wb = get_workbook()
+    ws_ativa = get_ws(ABA_INSCRICOES_ATIVA)
+    if not wb or not ws_ativa:
+        raise RuntimeError(f"Não foi possível acessar a aba {ABA_INSCRICOES_ATIVA}")
+
+    valores = ws_ativa.get_all_values()
+    if len(valores) < 2:
+        return {}
+    cabecalho, linhas = valores[0], valores[1:]
+    por_aba = {}
+    for i, dados in enumerate(linhas):
+        aba = aba_da_inscricao(dados)
+        if aba != ABA_INSCRICOES_ATIVA:
+            por_aba.setdefault(aba, []).append(i + 2)
+    if not por_aba:
+        return {}
+
+    existentes = set(temporadas_arquivadas())
+    chaves_linhas = chaves_inscricoes(linhas)
+    movidas = {}
+    for aba, numeros in por_aba.items():
+        temporada = temporada_da_aba(aba)
+        ws_arquivo = abrir_aba_de_arquivo(aba, cabecalho, len(numeros), existentes)
+        valores_arquivo = ws_arquivo.get_all_values() if temporada in existentes else [cabecalho]
+        ja_arquivadas = set(chaves_inscricoes(valores_arquivo[1:]))
+        novas = [linhas[n - 2] for n in numeros if chaves_linhas[n - 2] not in ja_arquivadas]
+        if novas:
+            ws_arquivo.append_rows(novas, value_input_option="USER_ENTERED")
+        marcar_aba_alterada(aba)
+        movidas[temporada] = len(numeros)
+
+    try:
+        # Confere as linhas antes de excluir: se a aba mudou desde a leitura, para
+        numeros = sorted(n for ns in por_aba.values() for n in ns)
+        atuais = ws_ativa.get_all_values()
+        if any(n > len(atuais) or chave_inscricao(atuais[n - 1]) != chave_inscricao(linhas[n - 2]) for n in numeros):
+            raise RuntimeError("A aba de inscrições mudou durante o arquivamento; execute novamente")
+        # Todos os blocos em uma chamada, de baixo para cima (índices começam em 0)
+        pedidos = [
+            {'deleteDimension': {'range': {'sheetId': ws_ativa.id, 'dimension': 'ROWS',
+                                           'startIndex': inicio - 1, 'endIndex': fim}}}
+            for inicio, fim in reversed(_blocos_contiguos(numeros))
+        ]
+        with medir_chamada_api(ABA_INSCRICOES_ATIVA, 'exclusao'):
+            wb.batch_update({'requests': pedidos})
+        for inicio, fim in reversed(_blocos_contiguos(numeros)):
+            registrar_escrita_propria(ABA_INSCRICOES_ATIVA, ('excluir', inicio, fim))
+    finally:
+        # Contadores, guarda e mapa de chaves são refeitos a partir da nova versão da aba
+        marcar_aba_alterada(ABA_INSCRICOES_ATIVA)
+        estado_chaves = _estado_chaves_inscricoes()
+        with estado_chaves['lock']:
+            estado_chaves['mapa'] = None
+    logging.info("Temporadas arquivadas", extra={'movidas': movidas})
+    return movidas
+
+# ------------------------------------------------------------
+# Índice de faixas de linhas por unidade (leituras só da unidade)
+# ------------------------------------------------------------
+# Com as inscrições das unidades intercaladas, uma unidade pode ter centenas de
+# faixas; as mais próximas são unidas (trazendo poucas linhas de outras unidades,
+# descartadas na leitura) para que um batch_get não passe deste número de intervalos
+MAXIMO_FAIXAS_LEITURA = 60
+
+@st.cache_resource
+def _estado_faixas_unidades():
+    """
+    Unidade -> faixas [início, fim] de linhas da aba ativa de inscrições, em
+    ordem, compartilhadas entre as sessões. 'ultima_linha' é a última linha com dados.
+    """
+    return {'lock': threading.Lock(), 'faixas': None, 'versao': None, 'ultima_linha': 1}
+
+def _montar_faixas(coluna_unidade):
+    """Faixas por unidade a partir dos valores da coluna A (a partir da linha 2)"""
+    linhas_por_unidade = {}
+    for i, celula in enumerate(coluna_unidade):
+        unidade = str(celula[0]).strip() if celula else ''
+        if unidade:
+            linhas_por_unidade.setdefault(unidade, []).append(i + 2)
+    return {unidade: _blocos_contiguos(linhas) for unidade, linhas in linhas_por_unidade.items()}
+
+def faixas_da_unidade(unidade):
+    """
+    Faixas de linhas da unidade na versão atual da aba. Quando a versão muda sem
+    passar pelos observadores deste processo, o índice é refeito lendo só a coluna A.
+    """
+    estado = _estado_faixas_unidades()
+    versao = obter_versao_aba(ABA_INSCRICOES_ATIVA)
+    with estado['lock']:
+        if estado['faixas'] is None or estado['versao'] != versao:
+            ws = get_ws(ABA_INSCRICOES_ATIVA)
+            if not ws:
+                raise RuntimeError(f"Não foi possível acessar a aba {ABA_INSCRICOES_ATIVA}")
+            coluna_unidade, = ws.batch_get(['A2:A'])
+            estado['faixas'] = _montar_faixas(coluna_unidade)
+            estado['ultima_linha'] = len(coluna_unidade) + 1
+            estado['versao'] = versao
+        return [list(faixa) for faixa in estado['faixas'].get(str(unidade).strip(), [])]
+
+def agrupar_faixas(faixas, maximo=MAXIMO_FAIXAS_LEITURA):
+    """Une as faixas separadas pelas menores lacunas até sobrarem no máximo `maximo`"""
+    if len(faixas) <= maximo:
+        return faixas
+    lacunas = sorted(faixas[i + 1][0] - faixas[i][1] for i in range(len(faixas) - 1))
+    limite = lacunas[len(faixas) - maximo - 1]
+    agrupadas = [list(faixas[0])]
+    for inicio, fim in faixas[1:]:
+        if inicio - agrupadas[-1][1] <= limite:
+            agrupadas[-1][1] = fim
+        else:
+            agrupadas.append([inicio, fim])
+    return agrupadas
+
+def _atualizar_faixas_unidades(evento, dados, linha):
+    """Observador: estende ou desloca as faixas a cada inclusão/exclusão da aplicação"""
+    estado = _estado_faixas_unidades()
+    with estado['lock']:
+        if estado['faixas'] is None:
+            return
+        # Sem a linha, ou inclusão fora do fim da aba: o índice é refeito na próxima leitura
+        if linha is None or (evento == 'inclusao' and linha <= estado['ultima_linha']):
+            estado['faixas'] = None
+            return
+        if evento == 'inclusao':
+            faixas = estado['faixas'].setdefault(str(dados[0]).strip(), [])
+            if faixas and faixas[-1][1] == linha - 1:
+                faixas[-1][1] = linha
+            else:
+                faixas.append([linha, linha])
+            estado['ultima_linha'] = linha
+        elif evento == 'exclusao':
+            for unidade, faixas in estado['faixas'].items():
+                ajustadas = []
+                for inicio, fim in faixas:
+                    if inicio > linha:
+                        inicio, fim = inicio - 1, fim - 1
+                    elif fim >= linha:
+                        fim -= 1
+                    if fim < inicio:
+                        continue
+                    # A linha removida pode ter separado duas faixas da mesma unidade
+                    if ajustadas and ajustadas[-1][1] + 1 == inicio:
+                        ajustadas[-1][1] = fim
+                    else:
+                        ajustadas.append([inicio, fim])
+                estado['faixas'][unidade] = ajustadas
+            estado['ultima_linha'] -= 1
+        estado['versao'] = obter_versao_aba(ABA_INSCRICOES_ATIVA)
+
+registrar_observador_inscritos('faixas', _atualizar_faixas_unidades)
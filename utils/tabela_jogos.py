@@ -0,0 +1,255 @@
+# utils/tabela_jogos.py
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.sheets import *
+from utils.inscritos import carregar_inscritos_padronizados
+
+# Tabela de jogos do interclasse montada a partir das inscrições: chaves por
+# modalidade × gênero (equipes por unidade ou por turma), horários sem choque
+# para nenhum aluno e exportação como tabela.
+FORMATOS_DISPUTA = ('Automático', 'Pontos corridos', 'Eliminatória')
+AGRUPAMENTOS_EQUIPE = ('Unidade', 'Turma')
+# No formato automático, grupos com até esse número de equipes jogam em pontos corridos
+LIMITE_PONTOS_CORRIDOS = 6
+# Horários testados de uma vez na busca do primeiro horário livre de um jogo
+BLOCO_HORARIOS = 64
+HORARIOS_PADRAO = ('08:00', '09:00', '10:00', '11:00', '13:00', '14:00', '15:00', '16:00')
+
+COLUNAS_AGENDA = ['Jogo', 'Dia', 'Horario', 'Quadra', 'Modalidade', 'Genero', 'Formato', 'Fase',
+                  'Equipe A', 'Equipe B']
+COLUNAS_EQUIPES = ['Modalidade', 'Genero', 'Equipe', 'Atletas']
+COLUNAS_CONFLITOS = ['RA', 'Dia', 'Horario', 'Jogos']
+
+def montar_equipes(df_inscritos, agrupar_por='Unidade'):
+    """
+    Equipes por modalidade × gênero: uma por unidade ou uma por turma de cada unidade.
+    Retorna (equipes, membros, ras): a tabela de equipes, os códigos dos alunos de
+    cada equipe (arrays numpy) e o RA correspondente a cada código.
+    """
+    df = pd.DataFrame({
+        'Modalidade': df_inscritos['Modalidade'].astype(str).str.strip(),
+        'Genero': df_inscritos['Genero Modalidade'].astype(str).str.strip(),
+        'Equipe': df_inscritos['Unidade'].astype(str).str.strip(),
+        'RA': df_inscritos['RA Aluno'].astype(str).str.strip(),
+    })
+    if agrupar_por == 'Turma':
+        df['Equipe'] = df['Equipe'] + ' - ' + df_inscritos['Turma Aluno'].astype(str).str.strip()
+    df = df[(df['Modalidade'] != '') & (df['RA'] != '')].drop_duplicates()
+
+    codigos, ras = pd.factorize(df['RA'])
+    colunas_equipe = ['Modalidade', 'Genero', 'Equipe']
+    id_equipe = df.groupby(colunas_equipe, sort=True).ngroup().to_numpy()
+
+    # Códigos dos alunos agrupados por equipe (uma ordenação, sem laço por linha)
+    ordem = np.argsort(id_equipe, kind='stable')
+    inicios = np.flatnonzero(np.diff(id_equipe[ordem], prepend=-1))
+    membros = np.split(codigos[ordem], inicios[1:])
+
+    equipes = df.groupby(colunas_equipe, sort=True).size().reset_index(name='Atletas')
+    return equipes, membros, np.asarray(ras)
+
+def _rodadas_pontos_corridos(n):
+    """Pares de cada rodada pelo método do círculo; com n ímpar uma equipe folga por rodada"""
+    posicoes = list(range(n)) + ([None] if n % 2 else [])
+    m = len(posicoes)
+    rodadas = []
+    for _ in range(m - 1):
+        rodadas.append([
+            (posicoes[k], posicoes[m - 1 - k]) for k in range(m // 2)
+            if posicoes[k] is not None and posicoes[m - 1 - k] is not None
+        ])
+        posicoes = [posicoes[0], posicoes[-1]] + posicoes[1:-1]
+    return rodadas
+
+def _nome_fase(vagas, rodada):
+    return {2: 'Final', 4: 'Semifinal', 8: 'Quartas de final', 16: 'Oitavas de final'}.get(vagas, f"{rodada}ª fase")
+
+def gerar_jogos(equipes, formato='Automático'):
+    """
+    Lista de jogos de todos os grupos (modalidade × gênero). Cada jogo guarda as
+    equipes que podem ocupar cada lado: na eliminatória, a partir da segunda fase
+    são todas as possíveis vencedoras, para que nenhum resultado gere choque de horário.
+    """
+    jogos = []
+
+    def novo_jogo(grupo, modalidade, genero, formato_grupo, rodada, fase, lado_a, lado_b):
+        jogos.append({
+            'Jogo': len(jogos) + 1, 'grupo': grupo, 'rodada': rodada,
+            'Modalidade': modalidade, 'Genero': genero, 'Formato': formato_grupo, 'Fase': fase,
+            'Equipe A': lado_a[0], 'Equipe B': lado_b[0], 'equipes': lado_a[1] + lado_b[1],
+        })
+        return len(jogos)
+
+    for grupo, ((modalidade, genero), df_grupo) in enumerate(equipes.groupby(['Modalidade', 'Genero'], sort=True)):
+        # Sementes: equipes com mais atletas primeiro (folgam na eliminatória)
+        df_grupo = df_grupo.sort_values(['Atletas', 'Equipe'], ascending=[False, True])
+        entradas = [(nome, (int(i),)) for i, nome in zip(df_grupo.index, df_grupo['Equipe'])]
+        n = len(entradas)
+        if n < 2:
+            continue
+
+        formato_grupo = formato
+        if formato == 'Automático':
+            formato_grupo = 'Pontos corridos' if n <= LIMITE_PONTOS_CORRIDOS else 'Eliminatória'
+
+        if formato_grupo == 'Pontos corridos':
+            for rodada, pares in enumerate(_rodadas_pontos_corridos(n), start=1):
+                for a, b in pares:
+                    novo_jogo(grupo, modalidade, genero, formato_grupo, rodada, f"Rodada {rodada}",
+                              entradas[a], entradas[b])
+            continue
+
+        # Eliminatória: completa a chave até a próxima potência de 2 com folgas
+        vagas = 1 << (n - 1).bit_length()
+        folgas = vagas - n
+        classificados, disputam = entradas[:folgas], entradas[folgas:]
+        pares = [(disputam[k], disputam[-1 - k]) for k in range(len(disputam) // 2)]
+        rodada = 1
+        while True:
+            vencedores = []
+            for lado_a, lado_b in pares:
+                numero = novo_jogo(grupo, modalidade, genero, formato_grupo, rodada,
+                                   _nome_fase(vagas, rodada), lado_a, lado_b)
+                vencedores.append((f"Vencedor J{numero}", lado_a[1] + lado_b[1]))
+            entradas_fase = classificados + vencedores
+            classificados = []
+            if len(entradas_fase) < 2:
+                break
+            pares = [(entradas_fase[k], entradas_fase[-1 - k]) for k in range(len(entradas_fase) // 2)]
+            vagas //= 2
+            rodada += 1
+    return jogos
+
+def distribuir_horarios(jogos, membros, n_alunos, n_quadras):
+    """
+    Aloca cada jogo no primeiro horário em que há quadra livre, nenhum dos seus
+    atletas já joga e a rodada anterior do mesmo grupo já terminou.
+    A ocupação é uma matriz horários × alunos (bool); o teste de todos os horários
+    candidatos de um jogo é uma única operação sobre as colunas dos seus atletas.
+    Retorna (horario_jogos, alunos_jogos).
+    """
+    alunos_jogos = [np.unique(np.concatenate([membros[e] for e in jogo['equipes']])) for jogo in jogos]
+    # A grade guarda só a janela a partir do primeiro horário com quadra livre:
+    # os horários lotados do início não recebem mais jogos e são descartados
+    linhas_grade = max(-(-len(jogos) // n_quadras), 1) + 1
+    ocupacao = np.zeros((linhas_grade, n_alunos), dtype=bool)
+    uso = np.zeros(linhas_grade, dtype=np.int32)
+    base = 0
+    primeiro_livre = 0
+    horario_jogos = np.full(len(jogos), -1, dtype=np.int64)
+    fim_rodada = {}
+
+    # Rodadas em ordem (entre grupos intercaladas); jogos com mais atletas primeiro
+    ordem = sorted(range(len(jogos)), key=lambda j: (jogos[j]['rodada'], -len(alunos_jogos[j]), j))
+    for j in ordem:
+        jogo = jogos[j]
+        inicio = max(fim_rodada.get((jogo['grupo'], jogo['rodada'] - 1), -1) + 1, primeiro_livre) - base
+        alunos = alunos_jogos[j]
+        # Testa os horários em blocos: quase sempre o primeiro bloco já tem vaga
+        linha = None
+        while linha is None:
+            for bloco in range(inicio, len(uso), BLOCO_HORARIOS):
+                fim = bloco + BLOCO_HORARIOS
+                livres = (uso[bloco:fim] < n_quadras) & ~ocupacao[bloco:fim, alunos].any(axis=1)
+                candidatos = np.flatnonzero(livres)
+                if candidatos.size:
+                    linha = bloco + int(candidatos[0])
+                    break
+            else:
+                # Sem horário livre na janela: dobra a grade
+                ocupacao = np.vstack([ocupacao, np.zeros_like(ocupacao)])
+                uso = np.concatenate([uso, np.zeros_like(uso)])
+
+        ocupacao[linha, alunos] = True
+        uso[linha] += 1
+        horario_jogos[j] = base + linha
+        chave = (jogo['grupo'], jogo['rodada'])
+        fim_rodada[chave] = max(fim_rodada.get(chave, -1), base + linha)
+
+        while primeiro_livre - base < len(uso) and uso[primeiro_livre - base] >= n_quadras:
+            primeiro_livre += 1
+        descartar = primeiro_livre - base
+        if descartar > len(uso) // 2:
+            ocupacao = ocupacao[descartar:].copy()
+            uso = uso[descartar:].copy()
+            base = primeiro_livre
+    return horario_jogos, alunos_jogos
+
+def detectar_conflitos(horario_jogos, alunos_jogos, n_alunos):
+    """
+    Matriz horários × alunos com quantos jogos cada aluno tem em cada horário.
+    Retorna os pares (horário, código do aluno) com mais de um jogo e a matriz.
+    """
+    n_horarios = int(horario_jogos.max()) + 1 if len(horario_jogos) else 0
+    contagem = np.zeros((n_horarios, n_alunos), dtype=np.int16)
+    if len(alunos_jogos):
+        linhas = np.repeat(horario_jogos, [len(alunos) for alunos in alunos_jogos])
+        np.add.at(contagem, (linhas, np.concatenate(alunos_jogos)), 1)
+    horarios, alunos = np.nonzero(contagem > 1)
+    return list(zip(horarios.tolist(), alunos.tolist())), contagem
+
+def montar_tabela_jogos(df_inscritos, agrupar_por='Unidade', formato='Automático', n_quadras=4,
+                        horarios=HORARIOS_PADRAO):
+    """
+    Monta a tabela completa a partir das inscrições (sem cache, usável fora do Streamlit).
+    Retorna {'agenda', 'equipes', 'conflitos'} como DataFrames.
+    """
+    vazio = {
+        'agenda': pd.DataFrame(columns=COLUNAS_AGENDA),
+        'equipes': pd.DataFrame(columns=COLUNAS_EQUIPES),
+        'conflitos': pd.DataFrame(columns=COLUNAS_CONFLITOS),
+    }
+    if df_inscritos.empty:
+        return vazio
+
+    equipes, membros, ras = montar_equipes(df_inscritos, agrupar_por)
+    jogos = gerar_jogos(equipes, formato)
+    if not jogos:
+        vazio['equipes'] = equipes
+        return vazio
+
+    horarios = list(horarios) or list(HORARIOS_PADRAO)
+    horario_jogos, alunos_jogos = distribuir_horarios(jogos, membros, len(ras), n_quadras)
+
+    agenda = pd.DataFrame(jogos)
+    agenda['horario_indice'] = horario_jogos
+    agenda['Dia'] = horario_jogos // len(horarios) + 1
+    agenda['Horario'] = [horarios[h % len(horarios)] for h in horario_jogos]
+    agenda['Quadra'] = agenda.groupby('horario_indice').cumcount() + 1
+    agenda = agenda.sort_values(['horario_indice', 'Quadra'])[COLUNAS_AGENDA].reset_index(drop=True)
+
+    # Conferência independente da alocação (deve sair vazia)
+    pares, _ = detectar_conflitos(horario_jogos, alunos_jogos, len(ras))
+    conflitos = [
+        {
+            'RA': ras[aluno],
+            'Dia': horario // len(horarios) + 1,
+            'Horario': horarios[horario % len(horarios)],
+            'Jogos': ', '.join(
+                f"J{jogos[j]['Jogo']}" for j in np.flatnonzero(horario_jogos == horario)
+                if aluno in alunos_jogos[j]
+            ),
+        }
+        for horario, aluno in pares
+    ]
+    return {
+        'agenda': agenda,
+        'equipes': equipes,
+        'conflitos': pd.DataFrame(conflitos, columns=COLUNAS_CONFLITOS),
+    }
+
+@st.cache_data(ttl=600, max_entries=8, show_spinner="Montando a tabela de jogos...")
+def gerar_tabela_jogos(versao, agrupar_por='Unidade', formato='Automático', n_quadras=4,
+                       horarios=HORARIOS_PADRAO):
+    """Tabela de jogos das inscrições atuais, em cache por parâmetros + versão da aba"""
+    return montar_tabela_jogos(carregar_inscritos_padronizados(), agrupar_por, formato, n_quadras, horarios)
+
+@st.cache_data(ttl=600, max_entries=16, show_spinner=False)
+def gerar_arquivo_tabela_jogos(formato, tabela, versao, agrupar_por='Unidade', formato_disputa='Automático',
+                               n_quadras=4, horarios=HORARIOS_PADRAO):
+    """Arquivo de exportação de uma das tabelas ('agenda' ou 'equipes'), em cache como a própria tabela"""
+    from utils.exportacao import gerar_arquivo
+
+    tabela_jogos = gerar_tabela_jogos(versao, agrupar_por, formato_disputa, n_quadras, horarios)
+    return gerar_arquivo(tabela_jogos[tabela], formato)
@@ -0,0 +1,188 @@
+# utils/vigia_planilha.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+import streamlit as st
+from utils.sheets import *
+from utils.metricas import medir_chamada_api
+
+# Vigia de alterações: consulta a data de modificação da planilha (metadado do
+# Drive, barato) e só relê as abas quando ela muda. Uma leitura leve (coluna A
+# de cada aba) escolhe quais abas reler por inteiro: as que a aplicação não
+# escreveu têm de estar iguais à rodada anterior, e as que ela escreveu, iguais
+# à coluna anterior com as escritas dela aplicadas (as versões dessas já foram
+# incrementadas na escrita). Só as abas cujo conteúdo mudou têm a versão
+# incrementada, e os valores lidos já ficam no cache.
+ABAS_VIGIADAS = ('INSCRITOS-UNIDADE', 'MODALIDADES', 'INSCRITOS-ECOMMERCE', 'AUTORIZADOS')
+INTERVALO_VIGIA = float(os.environ.get('INTERCLASSE_VIGIA_INTERVALO', '5'))
+# Edições que não mexem na coluna A não aparecem na leitura leve; de tempos em
+# tempos uma alteração externa faz reler todas as abas
+INTERVALO_VERIFICACAO_COMPLETA = float(os.environ.get('INTERCLASSE_VIGIA_COMPLETA', '300'))
+# Diferença tolerada entre o relógio do Drive e o do servidor
+FOLGA_RELOGIO = 2.0
+
+def _completar_linhas(valores):
+    """Iguala o tamanho das linhas, como get_all_values faz (a API omite células vazias no final)"""
+    largura = max((len(linha) for linha in valores), default=0)
+    return [linha + [''] * (largura - len(linha)) for linha in valores]
+
+def _assinatura(valores):
+    return hashlib.sha1(json.dumps(valores, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def _instante(modificado_em):
+    """Converte o lastUpdateTime do Drive ('2025-03-01T12:00:00.000Z') em segundos"""
+    return datetime.fromisoformat(modificado_em.replace('Z', '+00:00')).timestamp()
+
+def _colunas_a(wb):
+    """Coluna A de cada aba vigiada (uma chamada)"""
+    with medir_chamada_api('*', 'leitura'):
+        resposta = wb.values_batch_get([f"'{aba}'!A:A" for aba in ABAS_VIGIADAS])
+    return {aba: intervalo.get('values', [])
+            for aba, intervalo in zip(ABAS_VIGIADAS, resposta.get('valueRanges', []))}
+
+def _leve(coluna):
+    """Quantidade de linhas e assinatura da coluna A"""
+    return (len(coluna), _assinatura(coluna))
+
+def _coluna_esperada(coluna, efeitos):
+    """
+    Coluna A depois das escritas da aplicação, no formato da API (célula vazia
+    é linha vazia, linhas vazias no final omitidas). None se algum efeito é desconhecido.
+    """
+    if coluna is None:
+        return None
+    coluna = [list(linha) for linha in coluna]
+    for efeito in efeitos:
+        if efeito is None:
+            return None
+        if efeito[0] == 'anexar':
+            coluna.extend([valor] if valor else [] for valor in efeito[1])
+        elif efeito[0] == 'excluir':
+            del coluna[efeito[1] - 1:efeito[2]]
+        elif efeito[0] == 'atualizar':
+            linha, valores = efeito[1], efeito[2]
+            while len(coluna) < linha - 1 + len(valores):
+                coluna.append([])
+            coluna[linha - 1:linha - 1 + len(valores)] = [[valor] if valor else [] for valor in valores]
+    while coluna and not any(coluna[-1]):
+        coluna.pop()
+    return coluna
+
+def _alteracao_propria(estado, modificado_em, escritas):
+    """A nova data de modificação é explicada pelas escritas da aplicação desde a rodada anterior"""
+    if estado['modificado_em'] is None or not escritas:
+        return False
+    try:
+        return _instante(modificado_em) <= max(escritas.values()) + FOLGA_RELOGIO
+    except (TypeError, ValueError):
+        return False
+
+def verificar_alteracoes(estado):
+    """
+    Uma rodada do vigia. Retorna as abas invalidadas. Na primeira rodada só
+    registra as assinaturas (e aproveita a leitura para adiantar o cache).
+    """
+    wb = get_workbook()
+    if wb is None:
+        return []
+
+    inicio_rodada = time.time()
+    with medir_chamada_api('*', 'metadados'):
+        modificado_em = wb.get_lastUpdateTime()
+    if modificado_em == estado['modificado_em']:
+        return []
+
+    escritas = escritas_proprias_desde(estado['rodada_anterior'])
+    efeitos, estado['efeitos_ate'], efeitos_completos = efeitos_proprios_desde(estado['efeitos_ate'])
+    estado['rodada_anterior'] = inicio_rodada
+    colunas = _colunas_a(wb)
+    leves = {aba: _leve(coluna) for aba, coluna in colunas.items()}
+
+    # Abas cuja coluna A não é a esperada: mudaram por fora (ou o esperado é desconhecido)
+    abas_lidas = []
+    for aba in ABAS_VIGIADAS:
+        if aba in efeitos or (aba in escritas and not efeitos_completos):
+            esperada = _coluna_esperada(estado['colunas_a'].get(aba),
+                                        efeitos.get(aba, [None]) if efeitos_completos else [None])
+            confere = esperada is not None and _leve(esperada) == leves.get(aba)
+        else:
+            confere = aba in estado['leves'] and leves.get(aba) == estado['leves'][aba]
+        if not confere:
+            abas_lidas.append(aba)
+    estado['leves'] = leves
+    estado['colunas_a'] = colunas
+
+    completa = (estado['modificado_em'] is None
+                or inicio_rodada - estado['verificacao_completa_em'] >= INTERVALO_VERIFICACAO_COMPLETA)
+    if not completa and not abas_lidas and _alteracao_propria(estado, modificado_em, escritas):
+        # A mudança é explicada pelas escritas da aplicação: nada a invalidar
+        estado['modificado_em'] = modificado_em
+        return []
+    if completa or not abas_lidas:
+        # Sem mudança na leitura leve a aba alterada não é conhecida: relê todas
+        abas_lidas = list(ABAS_VIGIADAS)
+        estado['verificacao_completa_em'] = inicio_rodada
+
+    with medir_chamada_api('*', 'leitura'):
+        resposta = wb.values_batch_get([f"'{aba}'" for aba in abas_lidas])
+    valores_por_aba = {
+        aba: _completar_linhas(intervalo.get('values', []))
+        for aba, intervalo in zip(abas_lidas, resposta.get('valueRanges', []))
+    }
+
+    alteradas = []
+    for aba, valores in valores_por_aba.items():
+        assinatura = _assinatura(valores)
+        anterior = estado['assinaturas'].get(aba)
+        estado['assinaturas'][aba] = assinatura
+        # Aba escrita pela aplicação desde a última leitura completa: a assinatura anterior
+        # é de antes da escrita, e a versão é incrementada por segurança
+        if anterior is not None and anterior != assinatura:
+            alteradas.append(aba)
+
+    for aba in alteradas:
+        marcar_aba_alterada(aba)
+
+    # A leitura já feita serve para a versão atual de cada aba (inclusive as recém-invalidadas)
+    compartilhado = obter_cache_compartilhado()
+    for aba, valores in valores_por_aba.items():
+        versao = obter_versao_aba(aba)
+        semear_leitura(aba, versao, valores)
+        if compartilhado is not None and aba in alteradas:
+            try:
+                compartilhado.gravar_snapshot(aba, versao, valores)
+            except Exception:
+                logging.warning("Falha ao gravar cópia no cache compartilhado", exc_info=True, extra={'aba': aba})
+
+    estado['modificado_em'] = modificado_em
+    if alteradas:
+        logging.info("Abas alteradas detectadas pelo vigia", extra={'abas': alteradas})
+    return alteradas
+
+@st.cache_resource
+def iniciar_vigia_planilha():
+    """
+    Inicia (uma vez por processo) a thread do vigia. Com o cache compartilhado,
+    a cada rodada só a réplica que obtém o bloqueio consulta a planilha.
+    """
+    estado = {'modificado_em': None, 'assinaturas': {}, 'leves': {}, 'colunas_a': {},
+              'rodada_anterior': 0.0, 'efeitos_ate': 0, 'verificacao_completa_em': 0.0, 'ativo': VIGIA_ATIVO}
+    if not VIGIA_ATIVO:
+        return estado
+
+    def executar():
+        while True:
+            try:
+                compartilhado = obter_cache_compartilhado()
+                if compartilhado is None or compartilhado.tentar_bloquear('vigia', max(int(INTERVALO_VIGIA), 1)):
+                    verificar_alteracoes(estado)
+            except Exception:
+                logging.exception("Erro no vigia de alterações da planilha")
+            time.sleep(INTERVALO_VIGIA)
+
+    threading.Thread(target=executar, name="vigia-planilha", daemon=True).start()
+    return estado